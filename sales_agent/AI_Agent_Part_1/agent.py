@@ -1,13 +1,20 @@
 import os
 import sys
+import asyncio
 from pathlib import Path
 import warnings
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from langchain.agents import create_agent
 from dotenv import load_dotenv
 import logging
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple, Union
+from contextlib import nullcontext
+from contextvars import copy_context
 from langchain_cohere import ChatCohere
-from langchain_core.messages import HumanMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain.agents.middleware import AgentMiddleware
 CURRENT_DIR = Path(__file__).resolve().parent
 if str(CURRENT_DIR) not in sys.path:
     sys.path.insert(0, str(CURRENT_DIR))
@@ -16,7 +23,13 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 from prompt import SYSTEM_PROMPT_V3
 from guardrails import Guardrails
-from tools import get_subscription_tool, create_dataframe_preamble, get_dataframe_info
+from lru_cache import LRUCache
+from output_budget import DEFAULT_MAX_OUTPUT_CHARS
+from answer_cache import SemanticAnswerCache, key_terms_from_dataframe, prompt_hash
+from fast_path import FastPathRouter
+from sandbox_pool import SandboxPool
+from dataset_registry import DatasetRegistry
+from tools import get_subscription_tool, get_metrics_tool, get_structured_query_tool, SubscriptionDataStore, SUBSCRIPTION_TOOL_NAME, DEFAULT_PREAMBLE_TOKENS
 load_dotenv()
 
 # Suppress LangSmith UUID v7 warning
@@ -25,6 +38,8 @@ warnings.filterwarnings("ignore", message="LangSmith now uses UUID v7", category
 # Suppress Python REPL warning from langchain_experimental
 logging.getLogger("langchain_experimental.utilities.python").setLevel(logging.ERROR)
 
+REJECTION_RESPONSE = "I cannot fulfill this request PII Detected."
+
 #Setup logging
 # logging.basicConfig(
 #     level=logging.DEBUG,
@@ -32,66 +47,248 @@ logging.getLogger("langchain_experimental.utilities.python").setLevel(logging.ER
 #     handlers=[logging.StreamHandler()]
 # )
 
+def _message_text(message) -> str:
+    """
+    Text of a message or message chunk, whether content is a string or a list of blocks.
+    """
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+
+class SnapshotMiddleware(AgentMiddleware):
+    """
+    Builds the system prompt and subscription tool schema for every model call
+    from the snapshot pinned by the running query, so a data reload never
+    mixes old and new schema text within one agent run.
+    """
+
+    def __init__(self, data_store: SubscriptionDataStore, system_prompt: str):
+        super().__init__()
+        self.data_store = data_store
+        self.system_prompt = system_prompt
+
+    def _apply_snapshot(self, request):
+        snapshot = self.data_store.active()
+        tools = [
+            tool.model_copy(update={
+                "description": snapshot.tool_description,
+                "args_schema": snapshot.args_schema,
+            }) if getattr(tool, "name", None) == SUBSCRIPTION_TOOL_NAME else tool
+            for tool in request.tools
+        ]
+        return request.override(
+            system_message=SystemMessage(content=self.system_prompt + "\n\n" + snapshot.preamble),
+            tools=tools,
+        )
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._apply_snapshot(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._apply_snapshot(request))
+
+
 class SalesSupportAgent:
     
-    def __init__(self, csv_path: str, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        csv_path: str,
+        api_key: Optional[str] = None,
+        auto_reload: bool = False,
+        speculative_guardrails: bool = False,
+        llm: Optional[BaseChatModel] = None,
+        guardrail_cache: Optional[LRUCache] = None,
+        data_store: Optional[Union[SubscriptionDataStore, DatasetRegistry]] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        fast_path: bool = False,
+        sandbox_workers: int = 0,
+        code_result_cache: Optional[LRUCache] = None,
+        max_tool_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS,
+        preamble_tokens: Optional[int] = DEFAULT_PREAMBLE_TOKENS,
+    ):
         """
         Initialize the agent.
         Args:
             csv_path: Path to the subscription data CSV file
             api_key: Cohere API key.
+            auto_reload: Check the CSV before each query and reload it if it changed.
+            speculative_guardrails: Run the guardrail LLM check and the agent in parallel,
+                discarding the agent run if the guardrail rejects the query.
+            llm: Chat model to use instead of Cohere (e.g. a local stub for tests).
+            guardrail_cache: Cache for guardrail LLM verdicts (in-memory LRU by default).
+            data_store: Existing data snapshot store to share (e.g. across a pool of agents), or a
+                DatasetRegistry to serve several named datasets (pick one per query with dataset_id).
+                csv_path may then be None.
+            answer_cache: Reuse answers for near-duplicate questions (off by default). Answers
+                are invalidated when the CSV content or system prompt changes, and every
+                query still passes through guardrails before the cache is consulted.
+            fast_path: Answer common metric questions (plan counts, MRR by status, churned
+                revenue, low seat utilization) directly from the DataFrame without LLM calls
+                (off by default). Routed questions skip the LLM guardrail, and the templates
+                follow the evaluation questions, so only enable it where that is acceptable.
+            sandbox_workers: Run generated pandas code in this many worker processes with
+                time and memory limits (0 runs it in-process).
+            code_result_cache: Memo of subscription tool outputs keyed by the normalized code
+                and the CSV content hash (in-memory LRU of 256 entries by default).
+            max_tool_output_chars: Character budget for subscription tool output returned to the
+                model; large printed tables are summarized and longer output truncated (None for no limit).
+            preamble_tokens: Token budget of the compact schema preamble in the system prompt
+                (None for the full preamble, repeated in the tool schema). Ignored with data_store.
         """
         # Get API key
         self.api_key = api_key or os.getenv("COHERE_PROD_API_KEY")
-        if not self.api_key:
+        if llm is None and not self.api_key:
             raise ValueError(
                 "Cohere API key not found."
             )
         
-        self.llm = ChatCohere(
+        self.llm = llm or ChatCohere(
             model="command-a-03-2025",
             cohere_api_key=self.api_key,
             temperature=0.1,
         )
         
         # Initialize guardrails with LLM
-        self.guardrails = Guardrails(self.llm)
+        self.guardrails = Guardrails(self.llm, verdict_cache=guardrail_cache)
         
         # Convert csv_path to string if it's a Path object
         csv_path = str(csv_path) if isinstance(csv_path, Path) else csv_path
+        if csv_path is None and data_store is not None:
+            csv_path = data_store.csv_path
         
-        # Get DataFrame information once - reuse for all purposes
-        df_info = get_dataframe_info(csv_path)
+        # Load the data snapshot once - reused by the tool and the preamble, swapped on reload()
+        self.auto_reload = auto_reload
+        self.speculative_guardrails = speculative_guardrails
+        self._executor = ThreadPoolExecutor(thread_name_prefix="speculative-agent") if speculative_guardrails else None
+        self.data_store = data_store or SubscriptionDataStore(csv_path, preamble_tokens=preamble_tokens)
+        self.datasets = data_store if isinstance(data_store, DatasetRegistry) else None
         
-        # Get PythonREPL tool for querying subscription data
-        self.tools = [get_subscription_tool(csv_path)]
+        # PythonREPL tool for querying subscription data, plus a cheap lookup of precomputed
+        # metrics and a structured query tool that runs without code execution
+        self.sandbox = None
+        if sandbox_workers > 0:
+            fingerprint = self.data_store.current.df_info.get('fingerprint') or {}
+            self.sandbox = SandboxPool(
+                csv_path,
+                size=sandbox_workers,
+                data_version=fingerprint.get('sha256'),
+                max_output_chars=max_tool_output_chars,
+            )
+        self.code_result_cache = code_result_cache if code_result_cache is not None else LRUCache(max_size=256)
+        self.tools = [
+            get_subscription_tool(
+                csv_path,
+                data_store=self.data_store,
+                max_workers=max(4, sandbox_workers),
+                sandbox=self.sandbox,
+                result_cache=self.code_result_cache,
+                max_output_chars=max_tool_output_chars,
+            ),
+            get_metrics_tool(self.data_store, max_output_chars=max_tool_output_chars),
+            get_structured_query_tool(self.data_store, max_output_chars=max_tool_output_chars),
+        ]
         
-        # Create DataFrame preamble with schema information (using csv_path)
-        df_preamble = create_dataframe_preamble(csv_path)
+        # System prompt and tool schema are combined with the DataFrame preamble per query
+        snapshot_middleware = SnapshotMiddleware(self.data_store, SYSTEM_PROMPT_V3)
         
-        # Combine system prompt with DataFrame preamble
-        enhanced_prompt = SYSTEM_PROMPT_V3 + "\n\n" + df_preamble
+        self.answer_cache = answer_cache
+        self._prompt_hash = prompt_hash(SYSTEM_PROMPT_V3)
+        # Answer caches and data key terms per dataset, when serving a DatasetRegistry
+        self._answer_caches: Dict[str, SemanticAnswerCache] = {}
+        self._key_terms: Dict[str, frozenset] = {}
+        self.fast_path = FastPathRouter() if fast_path else None
 
-        self.agent = create_agent(model = self.llm, tools = self.tools, system_prompt = enhanced_prompt)
+        self.agent = create_agent(model = self.llm, tools = self.tools, middleware = [snapshot_middleware])
+
+    def close(self) -> None:
+        """
+        Stop sandbox worker processes and background threads.
+        """
+        if self.sandbox is not None:
+            self.sandbox.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the subscription data if the CSV changed, without rebuilding
+        the LLM client, guardrails or agent graph.
+        
+        Queries already running keep the snapshot they started with.
+        
+        Args:
+            force: Reload even if the CSV fingerprint is unchanged
+            
+        Returns:
+            True if a new data snapshot was swapped in
+        """
+        return self.data_store.reload(force=force)
 
     
-    def query(self, user_query: str) -> str:
+    def query(self, user_query: str, dataset_id: Optional[str] = None) -> str:
         """
         Process a user query and return a response.
         
         Args:
             user_query: The user's question or request
+            dataset_id: Dataset to answer from, when data_store is a DatasetRegistry
             
         Returns:
             Agent's response as a string
         """
-        # Check guardrails first
-        should_reject, reason = self.guardrails.should_reject(user_query)
+        with self._use_dataset(dataset_id):
+            fast_answer = self._fast_path_answer(user_query)
+            if fast_answer is not None:
+                return fast_answer
         
+            if self.speculative_guardrails:
+                return self._query_speculative(user_query)
+        
+            # Check guardrails first
+            should_reject, reason = self.guardrails.should_reject(user_query)
+        
+            if should_reject:
+                return REJECTION_RESPONSE
+        
+            # Handle empty queries
+            if not user_query or not user_query.strip():
+                return (
+                    "I'm here to help you with questions about subscription data. "
+                )
+        
+            return self._run_agent(user_query)
+
+    def _fast_path_answer(self, user_query: str) -> Optional[str]:
+        """
+        Answer the query from the fast-path router, or return None to run the agent.
+        
+        Routed questions match fixed aggregate templates in full, so they can't
+        ask for anything else; the regex guardrail still runs, but the LLM
+        guardrail call is skipped along with the agent.
+        """
+        if self.fast_path is None or not user_query or not user_query.strip():
+            return None
+        if self.guardrails._check_regex(user_query)[0]:
+            return None
+        if self.auto_reload:
+            self.reload()
+        routed = self.fast_path.route(user_query, self.data_store.current.df)
+        return routed[1] if routed else None
+
+    def _query_speculative(self, user_query: str) -> str:
+        """
+        Run the guardrail LLM check and the agent at the same time.
+        
+        The regex check still runs first. If the LLM guardrail rejects the
+        query, the agent run is cancelled at its next step and its output is
+        never returned, so latency for allowed queries is roughly
+        max(guardrail, agent) instead of their sum.
+        """
+        should_reject, reason = self.guardrails._check_regex(user_query)
         if should_reject:
-            return (
-                f"I cannot fulfill this request PII Detected."
-            )
+            return REJECTION_RESPONSE
         
         # Handle empty queries
         if not user_query or not user_query.strip():
@@ -99,23 +296,310 @@ class SalesSupportAgent:
                 "I'm here to help you with questions about subscription data. "
             )
         
+        cancel_event = threading.Event()
+        guardrail_verdict = Future()
+        # The agent thread keeps this query's context (selected dataset)
+        agent_future = self._executor.submit(copy_context().run, self._run_agent, user_query, cancel_event, guardrail_verdict)
+        
+        try:
+            should_reject, reason = self.guardrails._check_llm(user_query)
+        except BaseException as e:
+            guardrail_verdict.set_exception(e)
+            raise
+        guardrail_verdict.set_result((should_reject, reason))
+        if should_reject:
+            cancel_event.set()
+            return REJECTION_RESPONSE
+        
+        return agent_future.result()
+
+    def _answer_cache_args(self, snapshot) -> Tuple[str, frozenset]:
+        """
+        Answer cache namespace (CSV content hash + system prompt hash) and data key terms for a snapshot.
+        """
+        fingerprint = snapshot.df_info.get('fingerprint') or {}
+        namespace = f"{fingerprint.get('sha256')}:{self._prompt_hash}"
+        if namespace not in self._key_terms:
+            if len(self._key_terms) >= 32:
+                self._key_terms.clear()
+            self._key_terms[namespace] = key_terms_from_dataframe(snapshot.df)
+        return namespace, self._key_terms[namespace]
+
+    def _use_dataset(self, dataset_id: Optional[str]):
+        """
+        Select the dataset for a query (no-op with a single data store).
+        """
+        if self.datasets is not None:
+            return self.datasets.use(dataset_id)
+        if dataset_id is not None:
+            raise ValueError("dataset_id needs a DatasetRegistry as data_store")
+        return nullcontext()
+
+    def _dataset_answer_cache(self) -> Optional[SemanticAnswerCache]:
+        """
+        The answer cache of the selected dataset: answer_cache itself for the
+        default dataset, and a cache with the same settings for each other one.
+        """
+        if self.answer_cache is None or self.datasets is None:
+            return self.answer_cache
+        dataset_id = self.datasets.selected_id
+        if dataset_id == self.datasets.default_id:
+            return self.answer_cache
+        if dataset_id not in self._answer_caches:
+            self._answer_caches[dataset_id] = SemanticAnswerCache(
+                threshold=self.answer_cache.threshold,
+                max_entries=self.answer_cache.max_entries,
+                ttl_seconds=self.answer_cache.ttl_seconds,
+            )
+        return self._answer_caches[dataset_id]
+
+    def _cached_answer(self, user_query: str, snapshot) -> Optional[str]:
+        answer_cache = self._dataset_answer_cache()
+        if answer_cache is None:
+            return None
+        answer = answer_cache.get(user_query, *self._answer_cache_args(snapshot))
+        if answer is not None:
+            logging.info("Answer cache hit")
+        return answer
+
+    def _cache_answer(self, user_query: str, answer, snapshot, guardrail: Optional[Future] = None) -> None:
+        """
+        Cache an answer; with a pending guardrail verdict (speculative mode), only once it allows the query.
+        """
+        answer_cache = self._dataset_answer_cache()
+        if answer_cache is None or not isinstance(answer, str) or not answer:
+            return
+        if guardrail is not None and guardrail.result()[0]:
+            return
+        answer_cache.put(user_query, answer, *self._answer_cache_args(snapshot))
+
+    def _run_agent(
+        self, user_query: str, cancel_event: Optional[threading.Event] = None, guardrail: Optional[Future] = None
+    ) -> Optional[str]:
+        """
+        Run the agent on a query that passed the guardrails.
+        
+        Args:
+            user_query: The user's question or request
+            cancel_event: When set, the run stops at the next graph step and returns None
+            guardrail: Pending LLM guardrail verdict (speculative mode); the answer is cached only if it allows the query
+            
+        Returns:
+            Agent's response as a string, or None if cancelled
+        """
         # Process the query through the agent
         try:
-            user_query ={"messages": [HumanMessage(content=user_query)]}
-            response = self.agent.invoke(input=user_query)
-            return response['messages'][-1].content
+            if self.auto_reload:
+                self.reload()
+            agent_input ={"messages": [HumanMessage(content=user_query)]}
+            with self.data_store.pin() as snapshot:
+                cached = self._cached_answer(user_query, snapshot)
+                if cached is not None:
+                    return cached
+                if cancel_event is None:
+                    response = self.agent.invoke(input=agent_input)
+                else:
+                    response = None
+                    for state in self.agent.stream(input=agent_input, stream_mode="values"):
+                        if cancel_event.is_set():
+                            logging.info("Agent run cancelled by guardrail")
+                            return None
+                        response = state
+                answer = response['messages'][-1].content
+                self._cache_answer(user_query, answer, snapshot, guardrail)
+            return answer
         except Exception as e:
-            # Handle edge cases and errors gracefully
-            error_msg = str(e)
-            if "parsing" in error_msg.lower() or "tool" in error_msg.lower():
-                return (
-                    "I encountered an issue processing your query. Could you please rephrase it? "
-                )
+            return self._format_error(e)
+
+    def stream_query(self, user_query: str, dataset_id: Optional[str] = None) -> Iterator[dict]:
+        """
+        Process a user query, yielding events as the agent works.
+        
+        The guardrail decision is always made before any event is shown. Events:
+            {"type": "token", "text": ...}                 model text as it is generated
+            {"type": "tool_start", "name": ..., "args": ...}
+            {"type": "tool_end", "name": ..., "output": ...}
+            {"type": "final", "content": ...}              full answer, always last
+        
+        Args:
+            user_query: The user's question or request
+            dataset_id: Dataset to answer from, when data_store is a DatasetRegistry
+            
+        Yields:
+            Event dicts
+        """
+        with self._use_dataset(dataset_id):
+            fast_answer = self._fast_path_answer(user_query)
+            if fast_answer is not None:
+                yield {"type": "final", "content": fast_answer}
+                return
+        
+            if self.speculative_guardrails:
+                should_reject, reason = self.guardrails._check_regex(user_query)
             else:
+                should_reject, reason = self.guardrails.should_reject(user_query)
+        
+            if should_reject:
+                yield {"type": "final", "content": REJECTION_RESPONSE}
+                return
+        
+            # Handle empty queries
+            if not user_query or not user_query.strip():
+                yield {"type": "final", "content": "I'm here to help you with questions about subscription data. "}
+                return
+        
+            if not self.speculative_guardrails:
+                yield from self._stream_agent(user_query)
+                return
+        
+            # Speculative mode: the agent starts streaming while the LLM guardrail runs,
+            # but its events are held back until the guardrail allows the query
+            guardrail_future = self._executor.submit(self.guardrails._check_llm, user_query)
+            held_events = []
+            agent_events = self._stream_agent(user_query, guardrail_future)
+            try:
+                for event in agent_events:
+                    if held_events is not None:
+                        held_events.append(event)
+                        if not guardrail_future.done():
+                            continue
+                        if guardrail_future.result()[0]:
+                            yield {"type": "final", "content": REJECTION_RESPONSE}
+                            return
+                        yield from held_events
+                        held_events = None
+                    else:
+                        yield event
+            finally:
+                agent_events.close()
+        
+            if held_events is not None:
+                if guardrail_future.result()[0]:
+                    yield {"type": "final", "content": REJECTION_RESPONSE}
+                    return
+                yield from held_events
+
+    def _stream_agent(self, user_query: str, guardrail: Optional[Future] = None) -> Iterator[dict]:
+        """
+        Stream the agent on a query that passed the guardrails (see stream_query for events).
+        With a pending guardrail verdict, the answer is cached only if it allows the query.
+        """
+        final_content = ""
+        try:
+            if self.auto_reload:
+                self.reload()
+            agent_input = {"messages": [HumanMessage(content=user_query)]}
+            with self.data_store.pin() as snapshot:
+                cached = self._cached_answer(user_query, snapshot)
+                if cached is not None:
+                    yield {"type": "final", "content": cached}
+                    return
+                for mode, data in self.agent.stream(input=agent_input, stream_mode=["messages", "updates"]):
+                    if mode == "messages":
+                        chunk, metadata = data
+                        text = _message_text(chunk)
+                        if metadata.get("langgraph_node") == "model" and text:
+                            yield {"type": "token", "text": text}
+                        continue
+                    
+                    for node, update in data.items():
+                        messages = (update or {}).get("messages", []) if isinstance(update, dict) else []
+                        for message in messages:
+                            if isinstance(message, ToolMessage):
+                                yield {"type": "tool_end", "name": message.name, "output": _message_text(message)}
+                            elif isinstance(message, AIMessage) and message.tool_calls:
+                                for tool_call in message.tool_calls:
+                                    yield {"type": "tool_start", "name": tool_call["name"], "args": tool_call["args"]}
+                            elif isinstance(message, AIMessage):
+                                final_content = _message_text(message)
+                self._cache_answer(user_query, final_content, snapshot, guardrail)
+        except Exception as e:
+            final_content = self._format_error(e)
+        
+        yield {"type": "final", "content": final_content}
+
+    @staticmethod
+    def _format_error(e: Exception) -> str:
+        """
+        Turn an agent failure into a user-facing message.
+        """
+        # Handle edge cases and errors gracefully
+        error_msg = str(e)
+        if "parsing" in error_msg.lower() or "tool" in error_msg.lower():
+            return (
+                "I encountered an issue processing your query. Could you please rephrase it? "
+            )
+        else:
+            return (
+                f"I encountered an error: {error_msg}. "
+                "Please try rephrasing your question or contact support if the issue persists."
+            )
+
+    async def aquery(self, user_query: str, dataset_id: Optional[str] = None) -> str:
+        """
+        Async version of query for serving many questions on one event loop.
+        
+        LLM calls use the chat model's async API and pandas tool execution runs
+        on the tool's bounded thread pool, so concurrent queries don't block each other.
+        
+        Args:
+            user_query: The user's question or request
+            dataset_id: Dataset to answer from, when data_store is a DatasetRegistry
+            
+        Returns:
+            Agent's response as a string
+        """
+        with self._use_dataset(dataset_id):
+            fast_answer = self._fast_path_answer(user_query)
+            if fast_answer is not None:
+                return fast_answer
+        
+            if self.speculative_guardrails:
+                should_reject, reason = self.guardrails._check_regex(user_query)
+            else:
+                should_reject, reason = await self.guardrails.ashould_reject(user_query)
+        
+            if should_reject:
+                return REJECTION_RESPONSE
+        
+            # Handle empty queries
+            if not user_query or not user_query.strip():
                 return (
-                    f"I encountered an error: {error_msg}. "
-                    "Please try rephrasing your question or contact support if the issue persists."
+                    "I'm here to help you with questions about subscription data. "
                 )
+        
+            if not self.speculative_guardrails:
+                return await self._arun_agent(user_query)
+        
+            # Speculative mode: the agent task is cancelled if the LLM guardrail rejects
+            guardrail_task = asyncio.ensure_future(self.guardrails._acheck_llm(user_query))
+            agent_task = asyncio.create_task(self._arun_agent(user_query, guardrail_task))
+            should_reject, reason = await guardrail_task
+            if should_reject:
+                agent_task.cancel()
+                return REJECTION_RESPONSE
+            return await agent_task
+
+    async def _arun_agent(self, user_query: str, guardrail: Optional[asyncio.Future] = None) -> str:
+        """
+        Async version of _run_agent.
+        """
+        try:
+            if self.auto_reload:
+                await asyncio.get_running_loop().run_in_executor(None, self.reload)
+            agent_input = {"messages": [HumanMessage(content=user_query)]}
+            with self.data_store.pin() as snapshot:
+                cached = self._cached_answer(user_query, snapshot)
+                if cached is not None:
+                    return cached
+                response = await self.agent.ainvoke(input=agent_input)
+                answer = response['messages'][-1].content
+                if guardrail is not None and (await guardrail)[0]:
+                    return answer
+                self._cache_answer(user_query, answer, snapshot)
+            return answer
+        except Exception as e:
+            return self._format_error(e)
 
 
 def main():
@@ -138,9 +622,21 @@ def main():
             if not user_input:
                 continue
             
-            print("\nAgent: ", end="")
-            response = agent.query(user_input)
-            print(response)
+            print("\nAgent: ", end="", flush=True)
+            streamed_text = False
+            for event in agent.stream_query(user_input):
+                if event["type"] == "token":
+                    print(event["text"], end="", flush=True)
+                    streamed_text = True
+                elif event["type"] == "tool_start":
+                    print(f"\n  [running {event['name']}...]", flush=True)
+                    streamed_text = False
+                elif event["type"] == "tool_end":
+                    print(f"  [{event['name']} finished]", flush=True)
+                elif event["type"] == "final" and not streamed_text:
+                    # Nothing was streamed for the answer (refusal, error or non-streaming model)
+                    print(event["content"], end="")
+            print("\n")
             
     except KeyboardInterrupt:
         print("\n\nSession interrupted. Goodbye!")
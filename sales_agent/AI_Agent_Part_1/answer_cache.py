@@ -0,0 +1,247 @@
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Words plus comparison operators, which change a question as much as "above"/"below" do
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[<>!=]=|[<>=≤≥≠]")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+# Words that change what a question asks for while barely changing its text
+# ("above" vs "below", "MRR" vs "ARR", "next" vs "last"), mapped to a canonical
+# meaning: filters, aggregations, grouping, measures and time direction.
+# Questions must agree on these to share an answer.
+QUESTION_MODIFIERS = {
+    "above": ("above",), "over": ("above",), "more": ("above",), "greater": ("above",), "exceeding": ("above",),
+    "below": ("below",), "under": ("below",), "less": ("below",), "fewer": ("below",),
+    "most": ("max",), "highest": ("max",), "largest": ("max",), "max": ("max",), "maximum": ("max",), "top": ("max",),
+    "least": ("min",), "lowest": ("min",), "smallest": ("min",), "min": ("min",), "minimum": ("min",),
+    "total": ("total",), "sum": ("total",), "combined": ("total",),
+    "average": ("average",), "avg": ("average",), "mean": ("average",), "median": ("median",),
+    "many": ("count",), "count": ("count",), "number": ("count",),
+    "percent": ("ratio",), "percentage": ("ratio",), "share": ("ratio",), "ratio": ("ratio",), "rate": ("ratio",),
+    "by": ("group",), "per": ("group",), "each": ("group",), "which": ("group",), "breakdown": ("group",),
+    "not": ("not",), "no": ("not",), "without": ("not",), "excluding": ("not",), "except": ("not",),
+    "mrr": ("monthly", "revenue"), "arr": ("annual", "revenue"), "acv": ("annual", "revenue"),
+    "monthly": ("monthly",), "annual": ("annual",), "annually": ("annual",), "yearly": ("annual",),
+    "revenue": ("revenue",), "balance": ("balance",), "outstanding": ("balance",), "owed": ("balance",),
+    "unpaid": ("balance",), "overdue": ("balance",), "cost": ("cost",), "price": ("cost",),
+    "seat": ("seats",), "utilization": ("utilization",), "usage": ("utilization",),
+    "next": ("future",), "upcoming": ("future",), "coming": ("future",), "future": ("future",),
+    "last": ("past",), "past": ("past",), "previous": ("past",), "recent": ("past",), "recently": ("past",), "ago": ("past",),
+    "start": ("start",), "started": ("start",), "starting": ("start",), "began": ("start",), "begin": ("start",),
+    "signed": ("start",), "joined": ("start",),
+    "end": ("end",), "ended": ("end",), "ending": ("end",), "expire": ("end",), "expired": ("end",),
+    "expiring": ("end",), "expiry": ("end",), "expiration": ("end",),
+    "renew": ("renewal",), "renewal": ("renewal",), "renewed": ("renewal",), "renewing": ("renewal",),
+    ">": ("above",), ">=": ("above", "inclusive"), "≥": ("above", "inclusive"),
+    "<": ("below",), "<=": ("below", "inclusive"), "≤": ("below", "inclusive"),
+    "=": ("equal",), "==": ("equal",), "!=": ("not",), "≠": ("not",),
+}
+# Column-name words that say nothing about which column a question is about
+GENERIC_COLUMN_WORDS = frozenset({"id", "name", "company", "subscription", "date"})
+# Questions whose answer depends on today's date ("renewing next month", "in the
+# last 30 days"); they are never cached, since the data hash doesn't change with the date
+DATE_RELATIVE_PATTERN = re.compile(
+    r"\b(?:today|tomorrow|yesterday|now|ago|upcoming|overdue)\b"
+    r"|\b(?:this|next|last|past|coming|previous|current)\s+(?:\d+\s+)?(?:day|week|month|quarter|year)s?\b"
+)
+
+
+def stem(word: str) -> str:
+    """Crude singular form, so "renewals" and "renewal" compare equal."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+def is_date_relative(question: str) -> bool:
+    """Whether a question is about a period relative to today (see DATE_RELATIVE_PATTERN)."""
+    return DATE_RELATIVE_PATTERN.search(question.casefold()) is not None
+
+
+def prompt_hash(prompt: str) -> str:
+    """Short stable hash of a prompt, used to invalidate answers when it changes."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def key_terms_from_dataframe(df: pd.DataFrame, max_uniques: int = 1000) -> frozenset:
+    """
+    Words that appear in the column names (industry, plan tier, ...) and text
+    values (plan tiers, statuses, industries, company names, ...) of the DataFrame.
+
+    Two questions only share a cached answer if they mention the same key terms,
+    so "How many Enterprise customers?" never answers "How many Starter customers?"
+    and "MRR by industry" never answers "MRR by plan tier".
+
+    Args:
+        df: Subscription DataFrame
+        max_uniques: Skip text columns with more distinct values than this
+    """
+    terms = set()
+    for col in df.columns:
+        terms.update(word for word in WORD_PATTERN.findall(str(col).casefold()) if word not in GENERIC_COLUMN_WORDS)
+        series = df[col]
+        if not (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+        uniques = series.dropna().astype(str).unique()
+        if len(uniques) > max_uniques:
+            continue
+        for value in uniques:
+            terms.update(WORD_PATTERN.findall(value.casefold()))
+    # Modifier words are compared by their canonical meaning instead
+    terms = {stem(term) for term in terms}
+    return frozenset(term for term in terms if term not in QUESTION_MODIFIERS)
+
+
+class SemanticAnswerCache:
+    """
+    Cache of agent answers that also matches paraphrased questions.
+
+    Questions are compared by TF-IDF cosine similarity (character n-grams, so
+    "subs" still matches "subscriptions"). A cached answer is reused only when
+    the similarity reaches `threshold` and both questions mention exactly the
+    same numbers, columns, data values and modifiers (aggregation, grouping,
+    measure, comparison operator and time direction, see QUESTION_MODIFIERS).
+    Entries belong to a namespace (data content hash + prompt hash); a new
+    namespace drops all older entries. Entries expire after `ttl_seconds`, and
+    questions relative to today's date are not cached at all.
+    """
+
+    def __init__(self, threshold: float = 0.75, max_entries: int = 512, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Args:
+            threshold: Minimum cosine similarity (0-1) for a cached answer to be reused
+            max_entries: Maximum number of cached answers before the least recently used is evicted
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._namespace: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[str, frozenset, Optional[float]]]" = OrderedDict()
+        self._vectorizer: Optional[TfidfVectorizer] = None
+        self._matrix = None
+        self._questions: list = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return " ".join(TOKEN_PATTERN.findall(question.casefold()))
+
+    @staticmethod
+    def signature(question: str, key_terms: Iterable[str] = ()) -> frozenset:
+        """Numbers, data key terms, question modifiers and comparison operators mentioned in a question."""
+        normalized = question.casefold()
+        words = {stem(word) for word in TOKEN_PATTERN.findall(normalized)}
+        modifiers = {meaning for word in words for meaning in QUESTION_MODIFIERS.get(word, ())}
+        return frozenset(NUMBER_PATTERN.findall(normalized)) | (words & set(key_terms)) | modifiers
+
+    def _use_namespace(self, namespace: str) -> None:
+        if namespace != self._namespace:
+            if self._entries:
+                logging.info("Answer cache invalidated (data or prompt changed)")
+            self._namespace = namespace
+            self._entries.clear()
+            self._vectorizer = None
+
+    def _drop_expired(self) -> None:
+        now = time.time()
+        expired = [question for question, entry in self._entries.items() if entry[2] is not None and entry[2] <= now]
+        for question in expired:
+            del self._entries[question]
+        if expired:
+            self._vectorizer = None
+
+    def _build_index(self) -> None:
+        self._questions = list(self._entries)
+        self._vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True)
+        self._matrix = self._vectorizer.fit_transform(self._questions)
+
+    def get(self, question: str, namespace: str, key_terms: Iterable[str] = ()) -> Optional[str]:
+        """
+        Return the cached answer for the most similar question, if any qualifies.
+
+        Args:
+            question: The user's question
+            namespace: Data/prompt version the answer must belong to
+            key_terms: Data key terms that must match (see key_terms_from_dataframe)
+        """
+        normalized = self.normalize(question)
+        with self._lock:
+            self._use_namespace(namespace)
+            self._drop_expired()
+            if not self._entries or not normalized:
+                self.misses += 1
+                return None
+
+            signature = self.signature(normalized, key_terms)
+            if normalized in self._entries and self._entries[normalized][1] == signature:
+                match = normalized
+            else:
+                if self._vectorizer is None:
+                    self._build_index()
+                similarities = linear_kernel(self._vectorizer.transform([normalized]), self._matrix)[0]
+                match = None
+                for idx in similarities.argsort()[::-1]:
+                    if similarities[idx] < self.threshold:
+                        break
+                    candidate = self._questions[idx]
+                    if self._entries[candidate][1] == signature:
+                        match = candidate
+                        break
+
+            if match is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(match)
+            self.hits += 1
+            return self._entries[match][0]
+
+    def put(self, question: str, answer: str, namespace: str, key_terms: Iterable[str] = ()) -> None:
+        """
+        Cache an answer for a question under a namespace.
+        """
+        normalized = self.normalize(question)
+        if not normalized or is_date_relative(question):
+            return
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._use_namespace(namespace)
+            self._entries[normalized] = (answer, self.signature(normalized, key_terms), expires_at)
+            self._entries.move_to_end(normalized)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._vectorizer = None
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._vectorizer = None
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
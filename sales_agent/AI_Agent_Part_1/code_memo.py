@@ -0,0 +1,57 @@
+import ast
+import hashlib
+from functools import lru_cache
+from typing import Optional
+
+from langchain_experimental.utilities import PythonREPL
+
+# Outputs longer than this are not memoized, so the memo's memory stays
+# bounded by max_size * MAX_MEMO_OUTPUT_CHARS
+MAX_MEMO_OUTPUT_CHARS = 64 * 1024
+# Code touching these can print something different on the same data
+NONDETERMINISTIC_NAMES = {"now", "today", "utcnow", "time", "perf_counter", "random", "sample", "uuid4", "input", "open"}
+
+
+def _is_nondeterministic(tree: ast.AST) -> bool:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in NONDETERMINISTIC_NAMES:
+            return True
+        if isinstance(node, ast.Attribute) and node.attr in NONDETERMINISTIC_NAMES:
+            return True
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names] + [getattr(node, "module", None) or ""]
+            if any(name.split(".")[0] in {"random", "time", "uuid", "os", "sys", "subprocess"} for name in modules):
+                return True
+        # pd.Timestamp('now'), pd.to_datetime('today')
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.strip().lower() in {"now", "today"}:
+            return True
+    return False
+
+
+@lru_cache(maxsize=1024)
+def code_memo_key(code: str, data_version: Optional[str]) -> Optional[str]:
+    """
+    Memo key for a code snippet run against one version of the data.
+
+    The code is normalized through its AST, so formatting, comments and
+    quote style don't change the key. Keys for recently seen strings are
+    cached, so a repeated snippet is not re-parsed.
+
+    Args:
+        code: Python code as sent to the subscription tool
+        data_version: Content hash of the DataFrame the code runs against
+
+    Returns:
+        Hex digest, or None if the result must not be memoized (unknown data
+        version, code that doesn't parse, or code whose output depends on the
+        clock, randomness or the environment)
+    """
+    if not data_version:
+        return None
+    try:
+        tree = ast.parse(PythonREPL.sanitize_input(code))
+    except (SyntaxError, ValueError):
+        return None
+    if _is_nondeterministic(tree):
+        return None
+    return hashlib.sha256(f"{data_version}\n{ast.dump(tree)}".encode("utf-8")).hexdigest()
@@ -0,0 +1,566 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - columnar cache is optional
+    feather = None
+
+# Bump when the profile or columnar layout changes so stale cache files are ignored
+PROFILE_VERSION = 4
+COLUMNAR_VERSION = 4
+MAX_UNIQUE_SAMPLES = 10
+
+# String columns at or below these limits are stored as categoricals
+CATEGORICAL_MAX_UNIQUES = 50
+CATEGORICAL_MAX_RATIO = 0.5
+
+# Comma-separated list columns, expanded into one bool column per item (prefix + item)
+MULTI_VALUE_COLUMNS = {"custom_features": "feature_"}
+DEFAULT_CHUNK_ROWS = 200_000
+# Integers are not narrowed below int32: generated code such as seats_used * 100
+# would silently overflow an int16 column
+MIN_INTEGER_DTYPE = np.int32
+
+# Copy-on-write is always on from pandas 3; older versions need the option
+_COPY_ON_WRITE_BUILTIN = int(pd.__version__.split('.')[0]) >= 3
+_copy_on_write_lock = threading.Lock()
+_copy_on_write_users = 0
+_copy_on_write_previous = None
+
+
+@contextmanager
+def copy_on_write():
+    """
+    Enable pandas copy-on-write while user code runs on a shallow view of a
+    shared DataFrame, so it cannot mutate the shared data.
+
+    The option is process-wide, so it stays on until the last overlapping
+    caller (other tool threads) leaves, then the previous value is restored.
+    """
+    global _copy_on_write_users, _copy_on_write_previous
+    if _COPY_ON_WRITE_BUILTIN:
+        yield
+        return
+    with _copy_on_write_lock:
+        if _copy_on_write_users == 0:
+            _copy_on_write_previous = pd.get_option("mode.copy_on_write")
+            pd.set_option("mode.copy_on_write", True)
+        _copy_on_write_users += 1
+    try:
+        yield
+    finally:
+        with _copy_on_write_lock:
+            _copy_on_write_users -= 1
+            if _copy_on_write_users == 0:
+                pd.set_option("mode.copy_on_write", _copy_on_write_previous)
+
+
+def default_cache_dir(csv_path: str) -> Path:
+    """
+    Return the cache directory used for a dataset: a .cache folder next to the CSV.
+    """
+    return Path(csv_path).resolve().parent / ".cache"
+
+
+def cache_file_path(csv_path: str, suffix: str, cache_dir: Optional[Path] = None) -> Path:
+    """
+    Build the cache file path for a dataset, unique per absolute CSV path.
+    """
+    path = Path(csv_path).resolve()
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(csv_path)
+    path_key = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:12]
+    return cache_dir / f"{path.stem}-{path_key}{suffix}"
+
+
+def compute_content_hash(csv_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file, streamed in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_stat_key(csv_path: str) -> dict:
+    """
+    Cheap identity of a file (path, size, mtime) used to skip content hashing.
+    """
+    path = Path(csv_path).resolve()
+    stat = path.stat()
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def resolve_fingerprint(csv_path: str, cached_fingerprint: Optional[dict]) -> Tuple[dict, bool]:
+    """
+    Compare a file against a previously recorded fingerprint.
+
+    A matching path/size/mtime is trusted without reading the file. Otherwise
+    the content hash is computed, so a touched but unchanged file still matches.
+
+    Returns:
+        Tuple of (current fingerprint, unchanged)
+    """
+    stat_key = file_stat_key(csv_path)
+    cached_fingerprint = cached_fingerprint or {}
+    if cached_fingerprint.get("sha256") and all(cached_fingerprint.get(k) == v for k, v in stat_key.items()):
+        return cached_fingerprint, True
+
+    fingerprint = {**stat_key, "sha256": compute_content_hash(csv_path)}
+    return fingerprint, fingerprint["sha256"] == cached_fingerprint.get("sha256")
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def apply_subscription_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert date columns to datetime64, True/False columns to bool and
+    low-cardinality string columns to categoricals.
+    """
+    # Convert date columns automatically
+    for col in df.columns:
+        if 'date' in col.lower():
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Convert boolean columns
+    for col in df.columns:
+        if not pd.api.types.is_bool_dtype(df[col].dtype) and _is_bool_values(df[col].dropna().unique().tolist()):
+            df[col] = _to_bool(df[col])
+
+    # Convert low-cardinality string columns (plan_tier, status, industry, ...)
+    for col in df.columns:
+        if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+            n_unique = df[col].nunique(dropna=True)
+            if n_unique <= CATEGORICAL_MAX_UNIQUES and n_unique <= CATEGORICAL_MAX_RATIO * len(df):
+                df[col] = df[col].astype('category')
+
+    return df
+
+
+def _is_bool_values(uniques: list) -> bool:
+    """
+    Whether the distinct values of a column are True/False, either as bools or
+    as the literal strings "true"/"false". Integers 0/1 are not: 1 == True in
+    Python, but a column of ints is numeric.
+    """
+    return bool(uniques) and all(
+        isinstance(value, (bool, np.bool_)) or (isinstance(value, str) and value.strip().lower() in ('true', 'false'))
+        for value in uniques
+    )
+
+
+def _to_bool(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    return series.map(lambda value: value.strip().lower() == 'true' if isinstance(value, str) else bool(value)).astype(bool)
+
+
+def _is_categorical(n_unique: int, n_rows: int) -> bool:
+    return n_unique <= CATEGORICAL_MAX_UNIQUES and n_unique <= CATEGORICAL_MAX_RATIO * n_rows
+
+
+def _plan_dtypes(sample: pd.DataFrame) -> Dict[str, str]:
+    """
+    Choose a target kind per column of one chunk: datetime, bool, category,
+    integer, float or text (same rules as apply_subscription_dtypes).
+
+    Text with few distinct values becomes a category whatever the chunk size;
+    _combine_chunks makes the final choice over all chunks.
+    """
+    plan = {}
+    for col in sample.columns:
+        series = sample[col]
+        uniques = series.dropna().unique().tolist()
+        if 'date' in col.lower():
+            plan[col] = 'datetime'
+        elif pd.api.types.is_bool_dtype(series.dtype) or _is_bool_values(uniques):
+            plan[col] = 'bool'
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            plan[col] = 'integer'
+        elif pd.api.types.is_float_dtype(series.dtype):
+            plan[col] = 'float'
+        elif len(uniques) <= CATEGORICAL_MAX_UNIQUES:
+            plan[col] = 'category'
+        else:
+            plan[col] = 'text'
+    return plan
+
+
+def _feature_column(prefix: str, item: str) -> str:
+    return prefix + re.sub(r"\W+", "_", item.strip().lower()).strip("_")
+
+
+def _convert_chunk(chunk: pd.DataFrame, plan: Dict[str, str]) -> pd.DataFrame:
+    """
+    Apply the dtype plan to one chunk and add multi-hot columns for list columns.
+    """
+    columns = {}
+    for col in chunk.columns:
+        series, kind = chunk[col], plan.get(col, 'text')
+        if kind == 'datetime':
+            series = pd.to_datetime(series, errors='coerce')
+        elif kind == 'bool':
+            series = _to_bool(series)
+        elif kind == 'category':
+            series = series.astype('category')
+        elif kind == 'integer' or (kind == 'float' and series.notna().all() and (series % 1 == 0).all()):
+            narrowed = pd.to_numeric(series, downcast='integer')
+            series = narrowed if narrowed.dtype.itemsize >= np.dtype(MIN_INTEGER_DTYPE).itemsize else series.astype(MIN_INTEGER_DTYPE)
+        columns[col] = series
+
+        if col in MULTI_VALUE_COLUMNS:
+            # Split each distinct list once, then gather rows by their code (missing -> last, all False)
+            codes, uniques = pd.factorize(chunk[col])
+            dummies = pd.Series(uniques, dtype=object).str.get_dummies(sep=",")
+            flags = np.vstack([dummies.to_numpy(dtype=bool), np.zeros((1, dummies.shape[1]), dtype=bool)])
+            for i, item in enumerate(dummies.columns):
+                name = _feature_column(MULTI_VALUE_COLUMNS[col], item)
+                if name != MULTI_VALUE_COLUMNS[col]:
+                    hot = pd.Series(flags[codes, i], index=chunk.index)
+                    columns[name] = columns[name] | hot if name in columns else hot
+    return pd.DataFrame(columns, index=chunk.index)
+
+
+def _finalize_column(series: pd.Series) -> pd.Series:
+    """
+    Settle a column whose chunks were converted to different kinds: numbers
+    in one chunk and text in another become text (a category when few
+    distinct values), and integers are narrowed again after the concatenation.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+    if pd.api.types.is_object_dtype(series.dtype):
+        series = series.where(series.isna(), series.astype(str)).astype("str")
+        n_unique = series.nunique(dropna=True)
+        return series.astype('category') if _is_categorical(n_unique, len(series)) else series
+    if pd.api.types.is_integer_dtype(series.dtype) or (
+        pd.api.types.is_float_dtype(series.dtype) and series.notna().all() and (series % 1 == 0).all()
+    ):
+        narrowed = pd.to_numeric(series, downcast='integer')
+        return narrowed if narrowed.dtype.itemsize >= np.dtype(MIN_INTEGER_DTYPE).itemsize else series.astype(MIN_INTEGER_DTYPE)
+    return series
+
+
+def _combine_chunks(chunks: List[pd.DataFrame], source_columns: List[str]) -> pd.DataFrame:
+    """
+    Concatenate converted chunks and decide the final dtypes over all of them.
+
+    Each chunk was typed on its own, so a later chunk may widen a column:
+    categories are united and kept only if the whole column passes the
+    categorical limits, and columns whose chunks disagree (an integer column
+    with a non-numeric value further down) are settled by _finalize_column.
+    Multi-hot columns missing from a chunk are False there. The result does
+    not depend on the chunk size: categories are sorted and multi-hot
+    columns follow the CSV columns in sorted order.
+    """
+    derived = sorted({col for chunk in chunks for col in chunk.columns} - set(source_columns))
+    columns = list(source_columns) + derived
+    n_rows = sum(len(chunk) for chunk in chunks)
+    mixed = []
+    for col in columns:
+        present = [chunk[col] for chunk in chunks if col in chunk.columns]
+        if len(present) < len(chunks):
+            # Item missing from some chunks
+            for chunk in chunks:
+                if col not in chunk.columns:
+                    chunk[col] = False
+            continue
+        categorical = [isinstance(series.dtype, pd.CategoricalDtype) for series in present]
+        if all(categorical):
+            categories = pd.Index(sorted({c for series in present for c in series.cat.categories}))
+            for chunk in chunks:
+                if _is_categorical(len(categories), n_rows):
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+                else:
+                    chunk[col] = chunk[col].astype(chunk[col].cat.categories.dtype)
+        elif any(categorical):
+            for chunk in chunks:
+                if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    chunk[col] = chunk[col].astype(object)
+            mixed.append(col)
+        elif len({str(series.dtype) for series in present}) > 1:
+            mixed.append(col)
+    df = chunks[0][columns] if len(chunks) == 1 else pd.concat([chunk[columns] for chunk in chunks], ignore_index=True)
+    for col in mixed:
+        df[col] = _finalize_column(df[col])
+    return df
+
+
+def ingest_subscription_csv(
+    csv_path: str,
+    chunk_rows: Optional[int] = None,
+    memory_budget_mb: Optional[float] = None,
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Read the subscription CSV in chunks into a memory-optimized typed frame.
+
+    Each chunk is converted before the next is read: dates to datetime64,
+    True/False to bool, low-cardinality text to categoricals, integers
+    downcast (to int32 at the narrowest), whole-number floats without gaps to
+    integers, and list columns (custom_features) expanded into one bool column
+    per item next to the original.
+
+    Args:
+        csv_path: Path to the subscription data CSV file
+        chunk_rows: Rows per chunk (sized from memory_budget_mb, or DEFAULT_CHUNK_ROWS)
+        memory_budget_mb: Memory allowed for the converted frame plus one raw chunk
+            and the final concatenation
+
+    Returns:
+        Tuple of (DataFrame, memory report: rows, chunks, chunk_rows and per
+        column raw/optimized dtype and bytes)
+
+    Raises:
+        MemoryError: The data does not fit memory_budget_mb
+    """
+    path = Path(csv_path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"CSV file not found: {path}")
+    budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+
+    if chunk_rows is None:
+        chunk_rows = DEFAULT_CHUNK_ROWS
+        if budget:
+            sample = pd.read_csv(path, nrows=1000)
+            row_bytes = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+            chunk_rows = max(1000, min(DEFAULT_CHUNK_ROWS, int(budget / 4 / row_bytes)))
+
+    source_columns, chunks, kept = None, [], 0
+    raw: Dict[str, list] = {}
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        if source_columns is None:
+            source_columns = list(chunk.columns)
+        # Planned per chunk; _combine_chunks widens columns that later chunks contradict
+        plan = _plan_dtypes(chunk)
+        for col, size in chunk.memory_usage(deep=True, index=False).items():
+            entry = raw.setdefault(col, [str(chunk[col].dtype), 0])
+            entry[1] += int(size)
+        raw_chunk_bytes = int(chunk.memory_usage(deep=True).sum())
+        converted = _convert_chunk(chunk, plan)
+        del chunk
+        kept += int(converted.memory_usage(deep=True).sum())
+        chunks.append(converted)
+        if budget and kept + raw_chunk_bytes > budget:
+            raise MemoryError(
+                f"Subscription data exceeds the {memory_budget_mb:g} MB ingestion budget "
+                f"after {sum(len(c) for c in chunks)} rows"
+            )
+    if source_columns is None:
+        chunks = [pd.read_csv(path)]
+    if budget and len(chunks) > 1 and 2 * kept > budget:
+        raise MemoryError(f"Combining the subscription data needs more than the {memory_budget_mb:g} MB ingestion budget")
+
+    df = _combine_chunks(chunks, source_columns or list(chunks[0].columns))
+    optimized = df.memory_usage(deep=True, index=False)
+    report = {
+        "rows": len(df),
+        "chunks": len(chunks),
+        "chunk_rows": chunk_rows,
+        "columns": [
+            {
+                "name": col,
+                "raw_dtype": raw.get(col, ["derived", 0])[0],
+                "dtype": str(df[col].dtype),
+                "raw_bytes": raw.get(col, ["derived", 0])[1],
+                "bytes": int(optimized[col]),
+            }
+            for col in df.columns
+        ],
+    }
+    return df, report
+
+
+def format_memory_report(report: dict) -> str:
+    """
+    Per-column memory table for an ingestion report.
+    """
+    lines = [f"{'column':<32} {'raw dtype':>10} {'raw MB':>8} {'dtype':>16} {'MB':>8}"]
+    for col in report["columns"]:
+        lines.append(
+            f"{col['name']:<32} {col['raw_dtype']:>10} {col['raw_bytes'] / 2**20:>8.2f} "
+            f"{col['dtype']:>16} {col['bytes'] / 2**20:>8.2f}"
+        )
+    raw_total = sum(col["raw_bytes"] for col in report["columns"])
+    total = sum(col["bytes"] for col in report["columns"])
+    lines.append(
+        f"{'total':<32} {'':>10} {raw_total / 2**20:>8.2f} {'':>16} {total / 2**20:>8.2f}"
+        f"  ({report['rows']} rows, {report['chunks']} chunk(s) of {report['chunk_rows']})"
+    )
+    return "\n".join(lines)
+
+
+def read_subscription_csv(csv_path: str, chunk_rows: Optional[int] = None, memory_budget_mb: Optional[float] = None) -> pd.DataFrame:
+    """
+    Parse the subscription CSV in chunks into the typed, memory-optimized
+    frame (see ingest_subscription_csv) and log its memory report.
+    """
+    df, report = ingest_subscription_csv(csv_path, chunk_rows=chunk_rows, memory_budget_mb=memory_budget_mb)
+    logging.info(f"Subscription data memory report:\n{format_memory_report(report)}")
+    return df
+
+
+def load_subscription_dataframe(csv_path: str, use_columnar_cache: bool = True, cache_dir: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Load the typed subscription DataFrame.
+
+    The first load materializes the typed frame as an uncompressed Feather
+    file next to the CSV; later loads memory-map that file instead of parsing
+    the CSV, and it is rebuilt only when the CSV fingerprint changes.
+
+    Args:
+        csv_path: Path to the subscription data CSV file
+        use_columnar_cache: Read/write the Feather cache (needs pyarrow)
+        cache_dir: Override for the cache directory
+    """
+    path = Path(csv_path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"CSV file not found: {path}")
+
+    if not use_columnar_cache or feather is None:
+        if use_columnar_cache:
+            logging.warning("pyarrow is not installed, loading subscription data from CSV")
+        df = read_subscription_csv(csv_path)
+        logging.info(f"DataFrame loaded successfully with shape: {df.shape}")
+        return df
+
+    data_path = cache_file_path(csv_path, ".feather", cache_dir)
+    meta_path = cache_file_path(csv_path, ".feather.json", cache_dir)
+    meta = _read_json(meta_path)
+    cached_fingerprint = meta.get("fingerprint") if isinstance(meta, dict) and meta.get("version") == COLUMNAR_VERSION else None
+    fingerprint, unchanged = resolve_fingerprint(csv_path, cached_fingerprint)
+
+    if unchanged and data_path.exists():
+        try:
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+            if fingerprint is not cached_fingerprint:
+                _write_json_atomic(meta_path, {"version": COLUMNAR_VERSION, "fingerprint": fingerprint})
+            logging.info(f"DataFrame loaded from columnar cache with shape: {df.shape}")
+            return df
+        except Exception as e:
+            logging.warning(f"Could not read columnar cache {data_path}, rebuilding: {e}")
+
+    df = read_subscription_csv(csv_path)
+    try:
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = data_path.with_name(f"{data_path.name}.{os.getpid()}.tmp")
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, data_path)
+        _write_json_atomic(meta_path, {"version": COLUMNAR_VERSION, "fingerprint": fingerprint})
+    except Exception as e:
+        logging.warning(f"Could not write columnar cache {data_path}: {e}")
+
+    logging.info(f"DataFrame loaded successfully with shape: {df.shape}")
+    return df
+
+
+def _to_json_value(value):
+    """
+    Convert a pandas/numpy scalar into a JSON-serializable Python value.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def profile_dataframe(df: pd.DataFrame, max_uniques: int = MAX_UNIQUE_SAMPLES) -> dict:
+    """
+    Profile a DataFrame in one pass over its columns.
+
+    Returns:
+        Dict with 'columns' (name, dtype, null_count, unique_count, unique_values
+        capped at max_uniques, and min/max for numeric and date columns),
+        'total_rows' and 'column_names'.
+    """
+    columns_info = []
+    for col in df.columns:
+        series = df[col]
+        uniques = series.dropna().unique()
+        col_info = {
+            'name': col,
+            'dtype': str(series.dtype),
+            'null_count': int(series.isna().sum()),
+            'unique_count': int(len(uniques)),
+            'unique_values': [_to_json_value(v) for v in uniques[:max_uniques]],
+        }
+        ranged = pd.api.types.is_datetime64_any_dtype(series.dtype) or (
+            pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+        )
+        if ranged and len(uniques):
+            col_info['min'] = _to_json_value(series.min())
+            col_info['max'] = _to_json_value(series.max())
+        columns_info.append(col_info)
+
+    return {
+        'columns': columns_info,
+        'total_rows': len(df),
+        'column_names': list(df.columns),
+    }
+
+
+def get_cached_profile(csv_path: str, df: Optional[pd.DataFrame] = None, cache_dir: Optional[Path] = None) -> dict:
+    """
+    Return the schema profile of a CSV, reusing the on-disk cache when the data is unchanged.
+
+    The cache is keyed by path, size, mtime and content hash. A matching
+    path/size/mtime is trusted without reading the file; otherwise the content
+    hash decides whether the cached profile still applies.
+
+    Args:
+        csv_path: Path to the subscription data CSV file
+        df: Already loaded DataFrame to profile on a cache miss (avoids a re-read)
+        cache_dir: Override for the cache directory
+
+    Returns:
+        Profile dict (see profile_dataframe) plus a 'fingerprint' entry
+    """
+    cache_path = cache_file_path(csv_path, ".profile.json", cache_dir)
+    cached = _read_json(cache_path)
+    if not isinstance(cached, dict) or cached.get("version") != PROFILE_VERSION or not isinstance(cached.get("profile"), dict):
+        cached = None
+
+    fingerprint, unchanged = resolve_fingerprint(csv_path, cached.get("fingerprint") if cached else None)
+    if unchanged:
+        logging.info(f"Schema profile cache hit for {fingerprint['path']}")
+        if fingerprint is cached["fingerprint"]:
+            return {**cached["profile"], "fingerprint": fingerprint}
+        # File was touched but its content is the same, refresh the stat key only
+        profile = cached["profile"]
+    else:
+        logging.info(f"Profiling {fingerprint['path']}")
+        if df is None:
+            df = load_subscription_dataframe(csv_path, cache_dir=cache_dir)
+        profile = profile_dataframe(df)
+
+    try:
+        _write_json_atomic(cache_path, {"version": PROFILE_VERSION, "fingerprint": fingerprint, "profile": profile})
+    except OSError as e:
+        logging.warning(f"Could not write schema profile cache {cache_path}: {e}")
+
+    return {**profile, "fingerprint": fingerprint}
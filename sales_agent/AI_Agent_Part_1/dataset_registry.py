@@ -0,0 +1,188 @@
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from tools import DEFAULT_PREAMBLE_TOKENS, SubscriptionDataStore, SubscriptionSnapshot
+
+
+class DatasetRegistry:
+    """
+    Named subscription datasets (e.g. one export per region or business unit)
+    served by one agent.
+
+    Each dataset gets its own SubscriptionDataStore (DataFrame, preamble,
+    metrics), loaded on first use. When the loaded DataFrames exceed
+    max_memory_mb, the least recently used datasets are unloaded and loaded
+    again on their next query.
+
+    The registry offers the SubscriptionDataStore interface (current, active,
+    pin, reload, csv_path) for the dataset selected with use(), so the agent's
+    tools and middleware work on whichever dataset the running query asked for.
+    """
+
+    def __init__(
+        self,
+        datasets: Optional[Dict[str, str]] = None,
+        default_id: Optional[str] = None,
+        max_memory_mb: Optional[float] = 2048,
+        preamble_tokens: Optional[int] = DEFAULT_PREAMBLE_TOKENS,
+    ):
+        """
+        Args:
+            datasets: Dataset ID -> CSV path
+            default_id: Dataset used when a query names none (the first registered by default)
+            max_memory_mb: Memory ceiling for loaded DataFrames (None for no limit)
+            preamble_tokens: Schema preamble budget for every dataset (see SubscriptionDataStore)
+        """
+        self.default_id = default_id
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
+        self.preamble_tokens = preamble_tokens
+        self._paths: Dict[str, str] = {}
+        self._stores: "OrderedDict[str, SubscriptionDataStore]" = OrderedDict()
+        self._sizes: Dict[str, tuple] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._selected = ContextVar(f"dataset_id_{id(self)}", default=None)
+        self._pinned = ContextVar(f"dataset_snapshot_{id(self)}", default=None)
+        self.loads = 0
+        self.evictions = 0
+        for dataset_id, csv_path in (datasets or {}).items():
+            self.register(dataset_id, csv_path)
+
+    def register(self, dataset_id: str, csv_path: str) -> None:
+        """Add a dataset, or point an existing ID at a new CSV."""
+        with self._lock:
+            if self._paths.get(dataset_id) not in (None, str(csv_path)):
+                self._stores.pop(dataset_id, None)
+                self._sizes.pop(dataset_id, None)
+            self._paths[dataset_id] = str(csv_path)
+            if self.default_id is None:
+                self.default_id = dataset_id
+
+    @property
+    def dataset_ids(self) -> list:
+        return list(self._paths)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._paths
+
+    def _memory_bytes(self, dataset_id: str) -> int:
+        snapshot = self._stores[dataset_id].current
+        measured = self._sizes.get(dataset_id)
+        if measured is None or measured[0] != id(snapshot):
+            measured = (id(snapshot), int(snapshot.df.memory_usage(deep=True).sum()))
+            self._sizes[dataset_id] = measured
+        return measured[1]
+
+    def _evict(self, keep: str) -> None:
+        """Unload least recently used datasets until the loaded ones fit the ceiling."""
+        if self.max_memory_bytes is None:
+            return
+        total = sum(self._memory_bytes(dataset_id) for dataset_id in self._stores)
+        for dataset_id in list(self._stores):
+            if total <= self.max_memory_bytes:
+                break
+            if dataset_id == keep:
+                continue
+            total -= self._memory_bytes(dataset_id)
+            del self._stores[dataset_id]
+            self._sizes.pop(dataset_id, None)
+            self.evictions += 1
+            logging.info(f"Dataset '{dataset_id}' unloaded to stay under {self.max_memory_bytes // (1024 * 1024)} MB")
+
+    def store(self, dataset_id: Optional[str] = None) -> SubscriptionDataStore:
+        """
+        The data store of a dataset (the selected one by default), loading it if needed.
+
+        Raises:
+            ValueError: Unknown dataset ID
+        """
+        dataset_id = dataset_id or self.selected_id
+        with self._lock:
+            if dataset_id not in self._paths:
+                raise ValueError(f"Unknown dataset '{dataset_id}'. Available datasets: {sorted(self._paths)}")
+            if dataset_id in self._stores:
+                self._stores.move_to_end(dataset_id)
+                return self._stores[dataset_id]
+            load_lock = self._load_locks.setdefault(dataset_id, threading.Lock())
+
+        # Load outside the registry lock, so other datasets stay available meanwhile
+        with load_lock:
+            with self._lock:
+                if dataset_id in self._stores:
+                    self._stores.move_to_end(dataset_id)
+                    return self._stores[dataset_id]
+                csv_path = self._paths[dataset_id]
+            logging.info(f"Loading dataset '{dataset_id}' from {csv_path}")
+            store = SubscriptionDataStore(csv_path, preamble_tokens=self.preamble_tokens)
+            with self._lock:
+                self._stores[dataset_id] = store
+                self.loads += 1
+                self._evict(keep=dataset_id)
+            return store
+
+    @property
+    def selected_id(self) -> Optional[str]:
+        """The dataset chosen by the running query, or the default."""
+        return self._selected.get() or self.default_id
+
+    @contextmanager
+    def use(self, dataset_id: Optional[str]):
+        """
+        Select a dataset for the duration of a query (the default if None).
+
+        Raises:
+            ValueError: Unknown dataset ID
+        """
+        if dataset_id is not None and dataset_id not in self._paths:
+            raise ValueError(f"Unknown dataset '{dataset_id}'. Available datasets: {sorted(self._paths)}")
+        token = self._selected.set(dataset_id or self.default_id)
+        try:
+            yield self.selected_id
+        finally:
+            self._selected.reset(token)
+
+    # SubscriptionDataStore interface, for the selected dataset
+
+    @property
+    def csv_path(self) -> str:
+        return self._paths[self.selected_id]
+
+    @property
+    def current(self) -> SubscriptionSnapshot:
+        return self.store().current
+
+    def active(self) -> SubscriptionSnapshot:
+        return self._pinned.get() or self.current
+
+    @contextmanager
+    def pin(self, snapshot: Optional[SubscriptionSnapshot] = None):
+        """
+        Pin a snapshot of the selected dataset for the duration of a query.
+        The pin is held here, so it survives the dataset being unloaded mid-query.
+        """
+        token = self._pinned.set(snapshot or self.current)
+        try:
+            yield self._pinned.get()
+        finally:
+            self._pinned.reset(token)
+
+    def reload(self, force: bool = False) -> bool:
+        return self.store().reload(force=force)
+
+    def stats(self) -> dict:
+        """Registered and loaded datasets, their memory use, loads and evictions."""
+        with self._lock:
+            sizes = {dataset_id: self._memory_bytes(dataset_id) for dataset_id in self._stores}
+        return {
+            "datasets": sorted(self._paths),
+            "loaded": {dataset_id: round(size / (1024 * 1024), 2) for dataset_id, size in sizes.items()},
+            "memory_bytes": sum(sizes.values()),
+            "memory_mb": round(sum(sizes.values()) / (1024 * 1024), 2),
+            "max_memory_mb": self.max_memory_bytes / (1024 * 1024) if self.max_memory_bytes else None,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
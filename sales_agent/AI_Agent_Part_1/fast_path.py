@@ -0,0 +1,159 @@
+import re
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+# Questions are matched in full (after normalize_question), so a question that
+# adds anything to a known template - another clause, a request for contact
+# details - is never answered here and goes to the agent instead.
+PLAN_COUNT_PATTERNS = [
+    re.compile(r"how many (?:customers|companies|subscriptions) (?:are |do we have )?(?:currently )?(?:on|in) (?:the |our )?(?P<value>[a-z_ ]+?) (?:plan|tier)"),
+    re.compile(r"how many (?P<value>[a-z_ ]+?) (?:plan |tier )?(?:customers|companies|subscriptions) (?:are there|do we have)(?: currently)?"),
+]
+STATUS_MRR_PATTERNS = [
+    re.compile(r"what is (?:our |the )?total (?:mrr|monthly recurring revenue(?: mrr)?|monthly revenue) (?:from|for|of) (?P<value>[a-z_ ]+?) (?:subscriptions|customers)(?: only)?"),
+]
+CHURNED_PATTERNS = [
+    re.compile(r"which (?:companies|customers) have churned(?: and what (?:was|is) their (?:combined|total) (?:monthly revenue|mrr))?"),
+]
+SEAT_UTILIZATION_PATTERNS = [
+    re.compile(r"which (?:customers|companies) have (?:a )?seat utilization (?:below|under|less than|lower than) (?P<value>\d+(?:\.\d+)?) ?%"),
+]
+# Answers name at most this many companies, then "and N more", so their
+# length does not grow with the dataset
+MAX_LISTED_COMPANIES = 10
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercase a question, drop punctuation (except % and _) and collapse whitespace.
+    """
+    text = question.casefold().replace("what's", "what is").replace("’", "'")
+    text = re.sub(r"[^a-z0-9%_. ]+", " ", text)
+    text = re.sub(r"\.(?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def _money(value: float) -> str:
+    return f"${value:,.2f}" if value != int(value) else f"${value:,.0f}"
+
+
+def _percent(value: float) -> str:
+    # Round half up (56.25 -> 56.3), as people do when reading a report
+    return f"{Decimal(str(value)).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)}%"
+
+
+def _join(items: List[str], limit: Optional[int] = MAX_LISTED_COMPANIES) -> str:
+    if limit is not None and len(items) > limit:
+        items = items[:limit] + [f"{len(items) - limit} more"]
+    if len(items) <= 2:
+        return " and ".join(items)
+    return ", ".join(items[:-1]) + f", and {items[-1]}"
+
+
+def _match_value(series: pd.Series, value: str) -> Optional[str]:
+    """
+    The column value a question refers to ("pending renewal" -> "pending_renewal"), if any.
+    """
+    wanted = value.strip().replace(" ", "_")
+    for candidate in series.dropna().unique():
+        if str(candidate).casefold() == wanted:
+            return str(candidate)
+    return None
+
+
+def plan_tier_count(df: pd.DataFrame, match: re.Match) -> Optional[str]:
+    tier = _match_value(df['plan_tier'], match['value'])
+    if tier is None:
+        return None
+    rows = df.loc[df['plan_tier'] == tier].sort_values('monthly_revenue', ascending=False, kind='stable')
+    names = rows['company_name'].tolist()
+    if not names:
+        return f"There are no customers on the {tier} plan."
+    noun = "customer" if len(names) == 1 else "customers"
+    verb = "is" if len(names) == 1 else "are"
+    return f"There {verb} {len(names)} {noun} on the {tier} plan: {_join(names)}."
+
+
+def status_mrr(df: pd.DataFrame, match: re.Match) -> Optional[str]:
+    status = _match_value(df['status'], match['value'])
+    if status is None:
+        return None
+    rows = df.loc[df['status'] == status, ['company_name', 'monthly_revenue']]
+    rows = rows.sort_values('monthly_revenue', ascending=False, kind='stable')
+    total = rows['monthly_revenue'].sum()
+    breakdown = [f"{name} ({_money(revenue)})" for name, revenue in rows.itertuples(index=False)]
+    answer = f"The total MRR from {status.replace('_', ' ')} subscriptions is {_money(total)}."
+    if breakdown:
+        answer += f" This includes: {_join(breakdown)}."
+    return answer
+
+
+def churned_revenue(df: pd.DataFrame, match: re.Match) -> Optional[str]:
+    rows = df.loc[df['status'] == 'churned', ['company_name', 'monthly_revenue']]
+    rows = rows.sort_values('monthly_revenue', ascending=False, kind='stable')
+    if rows.empty:
+        return "No companies have churned."
+    breakdown = [f"{name} ({_money(revenue)}/month)" for name, revenue in rows.itertuples(index=False)]
+    noun = "company has" if len(rows) == 1 else "companies have"
+    return (
+        f"{len(rows)} {noun} churned: {_join(breakdown)}. "
+        f"Their combined monthly revenue was {_money(rows['monthly_revenue'].sum())}."
+    )
+
+
+def seat_utilization_below(df: pd.DataFrame, match: re.Match) -> Optional[str]:
+    threshold = float(match['value'])
+    utilization = df['seats_used'] / df['seats_purchased'] * 100
+    below = utilization[utilization < threshold].sort_values(kind='stable')
+    if below.empty:
+        return f"No customers have seat utilization below {threshold:g}%."
+    items = [f"{df.at[idx, 'company_name']} ({_percent(pct)})" for idx, pct in below.items()]
+    return f"The customers below {threshold:g}% seat utilization are: {_join(items)}."
+
+
+class FastPathRouter:
+    """
+    Answers a fixed set of common metric questions straight from the DataFrame,
+    without any LLM call. Anything it does not recognize returns None so the
+    caller can fall back to the agent. Company lists in answers are capped at
+    MAX_LISTED_COMPANIES (highest revenue, or lowest utilization, first).
+    """
+
+    def __init__(self):
+        self.intents: List[Tuple[str, List[re.Pattern], Callable[[pd.DataFrame, re.Match], Optional[str]]]] = [
+            ("plan_tier_count", PLAN_COUNT_PATTERNS, plan_tier_count),
+            ("status_mrr", STATUS_MRR_PATTERNS, status_mrr),
+            ("churned_revenue", CHURNED_PATTERNS, churned_revenue),
+            ("seat_utilization_below", SEAT_UTILIZATION_PATTERNS, seat_utilization_below),
+        ]
+
+    def route(self, question: str, df: pd.DataFrame) -> Optional[Tuple[str, str]]:
+        """
+        Answer a question if it matches a known intent.
+
+        Args:
+            question: The user's question
+            df: Subscription DataFrame to compute the answer from
+
+        Returns:
+            Tuple of (intent name, answer), or None to fall back to the agent
+        """
+        normalized = normalize_question(question)
+        for name, patterns, handler in self.intents:
+            for pattern in patterns:
+                match = pattern.fullmatch(normalized)
+                if match is None:
+                    continue
+                try:
+                    answer = handler(df, match)
+                except (KeyError, ValueError, ZeroDivisionError) as e:
+                    logging.warning(f"Fast path intent {name} failed, falling back to the agent: {e}")
+                    return None
+                if answer is not None:
+                    logging.info(f"Fast path answered intent {name}")
+                    return name, answer
+                return None
+        return None
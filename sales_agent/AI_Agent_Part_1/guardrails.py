@@ -1,6 +1,15 @@
 import re
-from typing import Optional, Tuple
+import hashlib
+from typing import List, Optional, Tuple
 from prompt import GUARDRAIL_PROMPT
+from lru_cache import LRUCache
+
+# Cache keys include this, so editing GUARDRAIL_PROMPT invalidates old verdicts
+GUARDRAIL_PROMPT_HASH = hashlib.sha256(GUARDRAIL_PROMPT.encode("utf-8")).hexdigest()[:16]
+LLM_REJECT_REASON = "LLM detected sensitive information request"
+# Non-ASCII characters that re.IGNORECASE matches to an ASCII letter even after
+# str.lower() (dotless i, long s); the keyword prefilter maps them to that letter
+IGNORECASE_ASCII_EQUIVALENTS = str.maketrans({"\u0131": "i", "\u017f": "s"})
 
 class Guardrails:
     """
@@ -8,14 +17,18 @@ class Guardrails:
     Multi-layered approach for detecting sensitive information requests.
     """
     
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, verdict_cache: Optional[LRUCache] = None):
         """
         Initialize Guardrails with detection methods.
         
         Args:
             llm: Optional LLM instance for LLM-based detection
+            verdict_cache: Cache of LLM verdicts keyed by normalized query.
+                Defaults to an in-memory LRU of 1024 entries with a 24h TTL;
+                pass an LRUCache with persist_path to keep verdicts across restarts.
         """
         self.llm = llm
+        self.verdict_cache = verdict_cache if verdict_cache is not None else LRUCache(max_size=1024, ttl_seconds=24 * 3600)
         
         # Regex patterns for sensitive information detection
         self.sensitive_patterns = [
@@ -51,8 +64,36 @@ class Guardrails:
             r'\bsecurity\s*code\b',
         ]
         
+        # Every pattern above contains at least one of these keywords, so a query
+        # without any of them cannot match and skips the regex engine entirely
+        self.prefilter_keywords = (
+            'card', 'cc', 'bank', 'account', 'ssn', 'social', 'passport', 'driver',
+            'address', 'email', 'phone', 'contact', 'password', 'pin', 'security',
+        )
+        
         # Compile regex patterns for efficiency
         self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.sensitive_patterns]
+        
+        # All patterns merged into one alternation; the named group tells which rule fired
+        self.combined_pattern = self._build_combined_pattern(self.sensitive_patterns)
+    
+    @staticmethod
+    def _build_combined_pattern(patterns: List[str]) -> re.Pattern:
+        """
+        Merge patterns into a single regex with one named group per rule.
+        
+        When every pattern starts with \\b and a literal word (or group of words),
+        the \\b is hoisted out and a lookahead on the possible first letters lets
+        the engine skip most positions without trying each alternative.
+        """
+        leading = [re.match(r'\\b\(?([a-z|]+)', pattern) for pattern in patterns]
+        if all(leading):
+            first_letters = sorted({word[0] for match in leading for word in match.group(1).split('|')})
+            alternatives = '|'.join(f'(?P<rule{idx}>{pattern[2:]})' for idx, pattern in enumerate(patterns))
+            combined = rf'\b(?=[{"".join(first_letters)}])(?:{alternatives})'
+        else:
+            combined = '|'.join(f'(?P<rule{idx}>{pattern})' for idx, pattern in enumerate(patterns))
+        return re.compile(combined, re.IGNORECASE)
     
     def _check_regex(self, query: str) -> Tuple[bool, Optional[str]]:
         """
@@ -64,18 +105,41 @@ class Guardrails:
         Returns:
             Tuple of (should_reject, reason)
         """
-        query_lower = query.lower()  # Use lowercase for consistency
+        # Patterns run on the lowercased query; the prefilter also folds the
+        # characters IGNORECASE treats as ASCII letters, so it never skips a match
+        query_lower = query.lower()
+        query_folded = query_lower.translate(IGNORECASE_ASCII_EQUIVALENTS) if not query_lower.isascii() else query_lower
+        if not any(keyword in query_folded for keyword in self.prefilter_keywords):
+            return False, None
         
-        for pattern in self.compiled_patterns:
-            if pattern.search(query_lower):  # Use query_lower instead of query
-                matched_pattern = pattern.pattern
-                return True, f"Query matches sensitive pattern: {matched_pattern}"
+        match = self.combined_pattern.search(query_lower)
+        if match:
+            matched_pattern = self.sensitive_patterns[int(match.lastgroup[len('rule'):])]
+            return True, f"Query matches sensitive pattern: {matched_pattern}"
         
         return False, None
     
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Fold case, whitespace and punctuation so trivially different phrasings
+        of the same question share a verdict ("What's our MRR?" == "whats our mrr").
+        """
+        query = query.casefold().replace("'", "").replace("\u2019", "")
+        query = re.sub(r"[^\w\s]", " ", query)
+        return " ".join(query.split())
+    
+    def _verdict_key(self, query: str) -> str:
+        return f"{GUARDRAIL_PROMPT_HASH}:{self.normalize_query(query)}"
+    
+    @staticmethod
+    def _parse_verdict(response) -> bool:
+        return "REJECT" in response.content.strip().upper()
+    
     def _check_llm(self, query: str) -> Tuple[bool, Optional[str]]:
         """
         Use LLM to analyze query intent for sensitive information.
+        Verdicts are cached, so a repeated query skips the LLM call.
         
         Args:
             query: User query to check
@@ -86,18 +150,91 @@ class Guardrails:
         if not self.llm:
             return False, None
         
-        try:
-            guardrail_prompt = GUARDRAIL_PROMPT.format(query=query)
-            response = self.llm.invoke(guardrail_prompt)
-            response_text = response.content.strip().upper()
+        key = self._verdict_key(query)
+        rejected = self.verdict_cache.get(key)
+        if rejected is None:
+            try:
+                guardrail_prompt = GUARDRAIL_PROMPT.format(query=query)
+                response = self.llm.invoke(guardrail_prompt)
+                rejected = self._parse_verdict(response)
+            except Exception as e:
+                # If LLM check fails, don't reject (fail open) and don't cache
+                print(f"Warning: Guardrail LLM check failed: {e}")
+                return False, None
+            self.verdict_cache.put(key, rejected)
+        
+        if rejected:
+            return True, LLM_REJECT_REASON
+        return False, None
+    
+    async def _acheck_llm(self, query: str) -> Tuple[bool, Optional[str]]:
+        """
+        Async version of _check_llm, using the LLM's async API and the same verdict cache.
+        
+        Args:
+            query: User query to check
             
-            if "REJECT" in response_text:
-                return True, "LLM detected sensitive information request"
-            return False, None
-        except Exception as e:
-            # If LLM check fails, don't reject (fail open)
-            print(f"Warning: Guardrail LLM check failed: {e}")
+        Returns:
+            Tuple of (should_reject, reason)
+        """
+        if not self.llm:
             return False, None
+        
+        key = self._verdict_key(query)
+        rejected = self.verdict_cache.get(key)
+        if rejected is None:
+            try:
+                guardrail_prompt = GUARDRAIL_PROMPT.format(query=query)
+                response = await self.llm.ainvoke(guardrail_prompt)
+                rejected = self._parse_verdict(response)
+            except Exception as e:
+                # If LLM check fails, don't reject (fail open) and don't cache
+                print(f"Warning: Guardrail LLM check failed: {e}")
+                return False, None
+            self.verdict_cache.put(key, rejected)
+        
+        if rejected:
+            return True, LLM_REJECT_REASON
+        return False, None
+    
+    def _check_llm_batch(self, queries: List[str], max_concurrency: int = 8) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Batched version of _check_llm, sending the uncached guardrail prompts concurrently.
+        
+        Args:
+            queries: User queries to check
+            max_concurrency: Maximum number of guardrail LLM calls in flight
+            
+        Returns:
+            List of (should_reject, reason) tuples in the same order as queries
+        """
+        if not self.llm or not queries:
+            return [(False, None) for _ in queries]
+        
+        keys = [self._verdict_key(query) for query in queries]
+        verdicts = [self.verdict_cache.get(key) for key in keys]
+        
+        # Each distinct uncached query goes to the LLM once
+        pending = {}
+        for query, key, rejected in zip(queries, keys, verdicts):
+            if rejected is None and key not in pending:
+                pending[key] = query
+        
+        if pending:
+            prompts = [GUARDRAIL_PROMPT.format(query=query) for query in pending.values()]
+            responses = self.llm.batch(prompts, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+            fresh = {}
+            for key, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    # If LLM check fails, don't reject (fail open) and don't cache
+                    print(f"Warning: Guardrail LLM check failed: {response}")
+                    fresh[key] = False
+                else:
+                    fresh[key] = self._parse_verdict(response)
+                    self.verdict_cache.put(key, fresh[key])
+            verdicts = [fresh[key] if rejected is None else rejected for key, rejected in zip(keys, verdicts)]
+        
+        return [(True, LLM_REJECT_REASON) if rejected else (False, None) for rejected in verdicts]
     
     def should_reject(self, query: str) -> Tuple[bool, Optional[str]]:
         """
@@ -124,4 +261,44 @@ class Guardrails:
             return True, reason
         
         return False, None
-
+    
+    async def ashould_reject(self, query: str) -> Tuple[bool, Optional[str]]:
+        """
+        Async version of should_reject: regex check, then the LLM check without blocking the event loop.
+        
+        Args:
+            query: User query to check
+            
+        Returns:
+            Tuple of (should_reject: bool, reason: Optional[str])
+        """
+        should_reject, reason = self._check_regex(query)
+        if should_reject:
+            return True, reason
+        
+        return await self._acheck_llm(query)
+    
+    def should_reject_batch(self, queries: List[str], use_llm: bool = True, max_concurrency: int = 8) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Screen many queries at once, e.g. logged queries offline.
+        
+        Regex screening runs on every query; only queries it allows are sent
+        to the LLM check, batched with bounded concurrency.
+        
+        Args:
+            queries: User queries to check
+            use_llm: Also run the LLM check on queries the regex allowed
+            max_concurrency: Maximum number of guardrail LLM calls in flight
+            
+        Returns:
+            List of (should_reject, reason) tuples in the same order as queries
+        """
+        results = [self._check_regex(query) for query in queries]
+        
+        if use_llm and self.llm:
+            pending = [idx for idx, (rejected, _) in enumerate(results) if not rejected]
+            llm_results = self._check_llm_batch([queries[idx] for idx in pending], max_concurrency=max_concurrency)
+            for idx, result in zip(pending, llm_results):
+                results[idx] = result
+        
+        return results
@@ -0,0 +1,120 @@
+import os
+import json
+import atexit
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional TTL, hit/miss counters and JSON persistence.
+
+    With persist_path, entries are written every save_every puts and at
+    interpreter exit (or on an explicit save()), not on every put.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None, persist_path: Optional[str] = None, save_every: int = 100):
+        """
+        Args:
+            max_size: Maximum number of entries before the least recently used is evicted
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+            persist_path: JSON file to load entries from and save them to (values must be JSON-serializable)
+            save_every: With persist_path, save after this many puts
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.time()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, counting a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries past max_size."""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            due = self.persist_path is not None and self._unsaved >= self.save_every
+        if due:
+            self.save()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._unsaved += 1
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+    def save(self) -> None:
+        """Write unexpired entries to persist_path atomically."""
+        if self.persist_path is None:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            payload = [[key, value, expires_at] for key, (value, expires_at) in self._entries.items() if not self._expired(expires_at)]
+            unsaved, self._unsaved = self._unsaved, 0
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_name(f"{self.persist_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.persist_path)
+        except (OSError, TypeError) as e:
+            logging.warning(f"Could not persist cache to {self.persist_path}: {e}")
+            with self._lock:
+                self._unsaved += unsaved
+
+    def _load(self) -> None:
+        try:
+            with self.persist_path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, value, expires_at in payload[-self.max_size:]:
+            if not self._expired(expires_at):
+                self._entries[key] = (value, expires_at)
@@ -0,0 +1,83 @@
+import builtins
+from typing import Optional
+
+import pandas as pd
+
+# About 1,000 tokens of tool output per call
+DEFAULT_MAX_OUTPUT_CHARS = 4000
+SUMMARY_ROWS = 5
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(chars: int) -> int:
+    """Rough token count for a number of characters of English text or tables."""
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def summarize_frame(obj, head_rows: int = SUMMARY_ROWS) -> str:
+    """
+    Shape, first and last rows, and summary statistics of a DataFrame or Series.
+    """
+    frame = obj.to_frame() if isinstance(obj, pd.Series) else obj
+    kind = type(obj).__name__
+    parts = [
+        f"[{kind} with {frame.shape[0]} rows x {frame.shape[1]} columns, summarized: "
+        f"first and last {head_rows} rows and statistics. Filter or aggregate to see specific rows.]",
+        str(frame.head(head_rows)),
+        "...",
+        str(frame.tail(head_rows)),
+    ]
+    try:
+        parts += ["", "Statistics:", str(frame.describe())]
+    except ValueError:
+        pass
+    return "\n".join(parts)
+
+
+def truncate_output(text: str, max_chars: Optional[int]) -> str:
+    """
+    Cut text to max_chars, keeping its start and end around an explicit marker.
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    marker = (
+        f"\n... [output truncated: {len(text) - max_chars} of {len(text)} characters omitted. "
+        "Filter, aggregate or print fewer rows/columns to see the rest.] ...\n"
+    )
+    # The marker counts against the budget
+    keep = max(max_chars - len(marker), 0)
+    head = keep * 3 // 4
+    tail = keep - head
+    return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+class OutputShaper:
+    """
+    print() replacement for tool code: DataFrames and Series whose text exceeds
+    max_chars are printed as a summary instead of in full (no shaping when
+    max_chars is None). So are those too long for pandas to print every row
+    (display.max_rows), whose abbreviated view would hide rows anyway. Anything
+    else is printed as usual. Counts what it summarized and the change in
+    printed size (negative when a summary is longer than pandas' abbreviated view).
+    """
+
+    def __init__(self, max_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS):
+        self.max_chars = max_chars
+        self.summarized = 0
+        self.chars_saved = 0
+
+    def _shape(self, value):
+        if not self.max_chars or not isinstance(value, (pd.DataFrame, pd.Series)):
+            return value
+        # Bounded by pandas' display options, so cheap even for large frames
+        text = str(value)
+        max_rows = pd.get_option("display.max_rows")
+        if len(text) <= self.max_chars and (not max_rows or len(value) <= max_rows):
+            return text
+        summary = summarize_frame(value)
+        self.summarized += 1
+        self.chars_saved += len(text) - len(summary)
+        return summary
+
+    def print(self, *args, **kwargs) -> None:
+        builtins.print(*(self._shape(arg) for arg in args), **kwargs)
@@ -0,0 +1,282 @@
+from typing import Dict, List, Literal, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+STRUCTURED_QUERY_TOOL_NAME = "structured_query"
+# Contact details are never returned by the structured query tool
+PROTECTED_COLUMNS = {"primary_contact"}
+# Computed on demand when a query references them
+DERIVED_COLUMNS = {
+    # Rounded half up (45/80 -> 56.3), like the metrics tool
+    "seat_utilization_pct": lambda df: np.floor(df['seats_used'] / df['seats_purchased'] * 1000 + 0.5) / 10,
+}
+
+# Rows (or groups) returned when a spec gives no limit, and the most it may ask for;
+# row_count still reports every match
+DEFAULT_QUERY_LIMIT = 50
+MAX_QUERY_LIMIT = 500
+
+Scalar = Union[bool, int, float, str]
+
+
+class Filter(BaseModel):
+    column: str = Field(description="Column to filter on")
+    op: Literal["eq", "ne", "gt", "gte", "lt", "lte", "in", "not_in", "contains", "not_contains", "is_null", "not_null"] = Field(
+        description="Comparison. Text comparisons ignore case; 'contains' matches a substring (e.g. one of the custom_features)"
+    )
+    value: Optional[Union[Scalar, List[Scalar]]] = Field(default=None, description="Value to compare with (a list for 'in'/'not_in')")
+
+
+class Aggregation(BaseModel):
+    column: str = Field(description="Column to aggregate")
+    func: Literal["count", "sum", "mean", "median", "min", "max", "nunique", "list"] = Field(description="Aggregate function")
+    alias: Optional[str] = Field(default=None, description="Output name (default '<func>_<column>')")
+
+    @property
+    def name(self) -> str:
+        return self.alias or f"{self.func}_{self.column}"
+
+
+class SortKey(BaseModel):
+    column: str = Field(description="Column (or aggregation output name, when grouping) to sort by")
+    descending: bool = False
+
+
+class QuerySpec(BaseModel):
+    """
+    A query over the subscription DataFrame.
+
+    Without group_by, returns the matching rows (select columns) and, if
+    aggregations are given, their totals. With group_by, returns one row per
+    group with the aggregations.
+    """
+    filters: List[Filter] = Field(default_factory=list, description="Row filters")
+    match: Literal["all", "any"] = Field(default="all", description="Combine filters with AND ('all') or OR ('any')")
+    select: List[str] = Field(default_factory=list, description="Columns to return for matching rows (ignored with group_by)")
+    group_by: List[str] = Field(default_factory=list, description="Columns to group by")
+    aggregations: List[Aggregation] = Field(default_factory=list, description="Aggregations over the matching rows or each group")
+    sort: List[SortKey] = Field(default_factory=list, description="Sort order of the returned rows")
+    limit: Optional[int] = Field(
+        default=DEFAULT_QUERY_LIMIT, ge=1, le=MAX_QUERY_LIMIT,
+        description=f"Maximum number of rows (or groups, or values per 'list' aggregation) to return, at most {MAX_QUERY_LIMIT}",
+    )
+
+
+def _check_columns(df: pd.DataFrame, spec: QuerySpec) -> None:
+    referenced = (
+        [f.column for f in spec.filters] + spec.select + spec.group_by + [a.column for a in spec.aggregations]
+        + [s.column for s in spec.sort if not (spec.group_by and s.column in {a.name for a in spec.aggregations})]
+    )
+    available = set(df.columns) | set(DERIVED_COLUMNS)
+    unknown = sorted({col for col in referenced if col not in available})
+    if unknown:
+        allowed = sorted(available - PROTECTED_COLUMNS)
+        raise ValueError(f"Unknown column(s) {unknown}. Available columns: {allowed}")
+    protected = sorted({col for col in referenced if col in PROTECTED_COLUMNS})
+    if protected:
+        raise ValueError(f"Column(s) {protected} contain contact details and cannot be queried")
+
+
+def _coerce(series: pd.Series, value, column: str):
+    """
+    Convert a filter value to the column's type ("5000" -> 5000.0 for a number
+    column), raising ValueError when it cannot be.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        try:
+            return pd.to_datetime(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter on {column} needs a date (YYYY-MM-DD), got {value!r}") from None
+    if pd.api.types.is_bool_dtype(series.dtype):
+        if isinstance(value, bool):
+            return value
+        if str(value).casefold() in ("true", "false"):
+            return str(value).casefold() == "true"
+        raise ValueError(f"Filter on {column} needs true or false, got {value!r}")
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        if isinstance(value, bool):
+            raise ValueError(f"Filter on {column} needs a number, got {value!r}")
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter on {column} needs a number, got {value!r}") from None
+    return value
+
+
+def _is_text(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _text_isin(series: pd.Series, values: List[str]) -> np.ndarray:
+    """
+    Case-insensitive membership test; categorical columns compare their few
+    categories instead of every row.
+    """
+    wanted = [str(v).casefold() for v in values]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str).str.casefold()
+        return np.isin(series.cat.codes.to_numpy(), np.flatnonzero(categories.isin(wanted)))
+    return series.str.casefold().isin(wanted).to_numpy(dtype=bool, na_value=False)
+
+
+def _mask(series: pd.Series, condition: Filter) -> np.ndarray:
+    op, value = condition.op, condition.value
+    if op == "is_null":
+        return series.isna().to_numpy()
+    if op == "not_null":
+        return series.notna().to_numpy()
+    if value is None:
+        raise ValueError(f"Filter '{op}' on {condition.column} needs a value")
+
+    if _is_text(series):
+        if op in ("contains", "not_contains"):
+            found = series.astype(str).str.casefold().str.contains(str(value).casefold(), regex=False).to_numpy(dtype=bool, na_value=False) & series.notna().to_numpy()
+            return found if op == "contains" else ~found
+        if op in ("eq", "ne", "in", "not_in"):
+            found = _text_isin(series, value if isinstance(value, list) else [value])
+            return found if op in ("eq", "in") else ~found
+        series, value = series.astype(str).str.casefold(), str(value).casefold()
+    elif op in ("contains", "not_contains"):
+        raise ValueError(f"'{op}' only applies to text columns, not {condition.column}")
+    elif op in ("in", "not_in"):
+        values = [_coerce(series, v, condition.column) for v in (value if isinstance(value, list) else [value])]
+        found = series.isin(values).to_numpy()
+        return found if op == "in" else ~found
+    elif isinstance(value, list):
+        raise ValueError(f"Filter '{op}' on {condition.column} needs a single value, not a list")
+    else:
+        value = _coerce(series, value, condition.column)
+
+    if op == "eq":
+        result = series == value
+    elif op == "ne":
+        result = series != value
+    elif op == "gt":
+        result = series > value
+    elif op == "gte":
+        result = series >= value
+    elif op == "lt":
+        result = series < value
+    else:
+        result = series <= value
+    return result.to_numpy(dtype=bool, na_value=False)
+
+
+def _json_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        return None if value != value else round(value, 2)
+    if value is None or isinstance(value, (list, str, bool, int)):
+        return value
+    return None if pd.isna(value) else str(value)
+
+
+def _json_list(series: pd.Series) -> list:
+    """
+    A column as JSON-ready Python values (dates as YYYY-MM-DD, floats to 2 decimals, NaN as None).
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return [None if pd.isna(v) else v for v in series.dt.strftime("%Y-%m-%d").tolist()]
+    values = series.tolist()
+    if pd.api.types.is_float_dtype(series.dtype):
+        return [None if v != v else round(v, 2) for v in values]
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(series.dtype):
+        return [None if not isinstance(v, str) and pd.isna(v) else v for v in values]
+    return values
+
+
+def _records(columns: Dict[str, pd.Series]) -> List[dict]:
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(_json_list(series) for series in columns.values()))]
+
+
+def _aggregate(series: pd.Series, func: str, limit: int):
+    if func == "count":
+        return int(series.size)
+    if func == "list":
+        return _json_list(series.head(limit))
+    return _json_value(getattr(series, func)())
+
+
+def run_query(df: pd.DataFrame, spec: QuerySpec) -> Dict:
+    """
+    Run a query spec against the DataFrame with vectorized pandas operations.
+
+    Only the columns the spec references are touched: filters build one numpy
+    mask, and selected, sorted and aggregated columns are taken at the
+    matching positions only.
+
+    At most spec.limit rows (DEFAULT_QUERY_LIMIT when unset) are returned;
+    'truncated' is set when more matched.
+
+    Returns:
+        Dict with 'row_count' (matching rows, or groups when grouping),
+        'rows', 'totals' when aggregating without group_by, and 'truncated'
+
+    Raises:
+        ValueError: Unknown or protected columns, or an invalid filter
+    """
+    _check_columns(df, spec)
+    limit = min(spec.limit or DEFAULT_QUERY_LIMIT, MAX_QUERY_LIMIT)
+    aggregate_names = {a.name for a in spec.aggregations} if spec.group_by else set()
+    referenced = dict.fromkeys(
+        [f.column for f in spec.filters] + spec.select + spec.group_by + [a.column for a in spec.aggregations]
+        + [s.column for s in spec.sort if s.column not in aggregate_names]
+    )
+    source = {col: DERIVED_COLUMNS[col](df) if col in DERIVED_COLUMNS else df[col] for col in referenced}
+
+    positions = None
+    if spec.filters:
+        masks = [_mask(source[condition.column], condition) for condition in spec.filters]
+        combined = np.logical_and.reduce(masks) if spec.match == "all" else np.logical_or.reduce(masks)
+        positions = np.flatnonzero(combined)
+
+    def column(name: str) -> pd.Series:
+        return source[name] if positions is None else source[name].iloc[positions]
+
+    sort_columns = [s.column for s in spec.sort]
+    ascending = [not s.descending for s in spec.sort]
+
+    if spec.group_by:
+        count_column = next((col for col in referenced if col not in spec.group_by), spec.group_by[0])
+        aggregations = spec.aggregations or [Aggregation(column=count_column, func="count", alias="count")]
+        frame = pd.DataFrame({col: column(col) for col in referenced}).reset_index(drop=True)
+        grouped = frame.groupby(spec.group_by, observed=True, sort=True).agg(
+            **{
+                a.name: (a.column, "size" if a.func == "count" else (lambda values: values.head(limit).tolist()) if a.func == "list" else a.func)
+                for a in aggregations
+            }
+        ).reset_index()
+        if sort_columns:
+            grouped = grouped.sort_values(sort_columns, ascending=ascending, kind="stable")
+        row_count = len(grouped)
+        grouped = grouped.head(limit)
+        return {
+            "row_count": row_count,
+            "rows": [{k: _json_value(v) for k, v in row.items()} for row in grouped.to_dict("records")],
+            "truncated": row_count > limit,
+        }
+
+    result = {"row_count": len(df) if positions is None else len(positions)}
+    if spec.aggregations:
+        result["totals"] = {a.name: _aggregate(column(a.column), a.func, limit) for a in spec.aggregations}
+
+    if spec.select or not spec.aggregations:
+        selected = spec.select or [col for col in df.columns if col not in PROTECTED_COLUMNS]
+        if positions is None:
+            positions = np.arange(len(df))
+        if sort_columns:
+            order = pd.DataFrame({f"k{i}": column(col).to_numpy() for i, col in enumerate(sort_columns)})
+            order = order.sort_values(list(order.columns), ascending=ascending, kind="stable").index.to_numpy()
+            positions = positions[order]
+        result["truncated"] = len(positions) > limit
+        positions = positions[:limit]
+        result["rows"] = _records({
+            col: (source[col] if col in source else df[col]).iloc[positions] for col in selected
+        })
+    return result
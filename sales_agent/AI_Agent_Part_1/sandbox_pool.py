@@ -0,0 +1,359 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing
+from io import StringIO
+from pathlib import Path
+from datetime import datetime
+from contextlib import redirect_stdout
+from typing import Optional, Tuple
+CURRENT_DIR = Path(__file__).resolve().parent
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+from output_budget import DEFAULT_MAX_OUTPUT_CHARS
+
+POLL_INTERVAL_SECONDS = 0.02
+STARTUP_TIMEOUT_SECONDS = 120.0
+
+
+def _worker_main(conn, csv_path: str, data_version: Optional[str], max_output_chars: Optional[int] = None) -> None:
+    """
+    Worker process loop: load the typed DataFrame once, then run snippets
+    sent over the pipe and reply with their output.
+    """
+    import pandas as pd
+    from langchain_experimental.utilities import PythonREPL
+    from data_cache import copy_on_write, load_subscription_dataframe
+    from output_budget import OutputShaper
+
+    df = load_subscription_dataframe(csv_path)
+    conn.send(("ready", None))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        if message[0] == "load":
+            # The CSV changed since this worker loaded it, or the next query is for another dataset
+            _, data_version, csv_path = message
+            try:
+                df = load_subscription_dataframe(csv_path)
+                conn.send(("loaded", None))
+            except BaseException as e:
+                conn.send(("error", repr(e)))
+            continue
+        buffer = StringIO()
+        try:
+            with copy_on_write(), redirect_stdout(buffer):
+                namespace = {'pd': pd, 'json': json, 'datetime': datetime, 'df': df.copy(deep=False), 'print': OutputShaper(max_output_chars).print}
+                exec(PythonREPL.sanitize_input(message[1]), namespace)
+            conn.send(("done", buffer.getvalue()))
+        except BaseException as e:
+            conn.send(("error", repr(e)))
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, where /proc is available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Worker:
+
+    def __init__(self, context, csv_path: str, data_version: Optional[str], max_output_chars: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, csv_path, data_version, max_output_chars), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.csv_path = csv_path
+        self.data_version = data_version
+
+    def wait_ready(self, timeout: float) -> None:
+        try:
+            if self.conn.poll(timeout):
+                self.conn.recv()
+                return
+        except (EOFError, OSError):
+            pass
+        self.kill()
+        raise RuntimeError("Sandbox worker failed to start")
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of warm worker processes that run LLM-generated pandas code.
+
+    Each worker holds its own typed copy of the DataFrame and runs one snippet
+    at a time, so tool calls run in parallel across cores. A snippet that
+    exceeds the wall-clock timeout or the RSS limit gets its worker killed and
+    replaced; the agent keeps running. Workers are also recycled after
+    max_tasks executions to shed leaked state and memory. A worker holding
+    other data reloads it before the snippet's timeout starts, and
+    replacements start on the most recently used data.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        size: int = 2,
+        timeout: float = 30.0,
+        max_rss_mb: Optional[float] = 2048,
+        max_tasks: int = 200,
+        data_version: Optional[str] = None,
+        max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS,
+        acquire_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            csv_path: Path to the subscription data CSV file
+            size: Number of worker processes
+            timeout: Wall-clock limit per snippet, in seconds
+            max_rss_mb: Resident memory limit per worker, in MB (None for no limit; needs /proc)
+            max_tasks: Executions after which a worker is replaced
+            data_version: Content hash of the CSV the workers start with
+            max_output_chars: Print budget for DataFrames/Series (see output_budget.OutputShaper)
+            acquire_timeout: How long a snippet waits for a free worker, in seconds
+                (default: timeout plus the worker startup limit)
+        """
+        self.csv_path = str(csv_path)
+        self.size = size
+        self.timeout = timeout
+        self.max_rss_bytes = int(max_rss_mb * 1024 * 1024) if max_rss_mb else None
+        self.max_tasks = max_tasks
+        self.data_version = data_version
+        self.max_output_chars = max_output_chars
+        self.acquire_timeout = acquire_timeout or timeout + STARTUP_TIMEOUT_SECONDS
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._starting = 0
+        self._start_error: Optional[Exception] = None
+        self.stats = {"executions": 0, "timeouts": 0, "memory_kills": 0, "recycled": 0, "failed_starts": 0}
+
+        workers = [self._spawn() for _ in range(size)]
+        for worker in workers:
+            worker.wait_ready(STARTUP_TIMEOUT_SECONDS)
+            self._idle.put(worker)
+        atexit.register(self.close)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.csv_path, self.data_version, self.max_output_chars)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill() if kill else worker.stop()
+
+    def _replace(self, worker: _Worker, kill: bool) -> None:
+        """Retire a worker and start a warm replacement in the background."""
+        # Counted as starting before the old worker is retired, so waiting callers never see an empty pool
+        with self._lock:
+            replacing = not self._closed
+            if replacing:
+                self._starting += 1
+        self._retire(worker, kill)
+        if not replacing:
+            return
+
+        def start():
+            replacement = None
+            try:
+                replacement = self._spawn()
+                replacement.wait_ready(STARTUP_TIMEOUT_SECONDS)
+                self._idle.put(replacement)
+            except Exception as e:
+                logging.error(f"Could not start a sandbox worker: {e}")
+                with self._lock:
+                    self._start_error = e
+                    self.stats["failed_starts"] += 1
+                    self._workers.discard(replacement)
+            finally:
+                with self._lock:
+                    self._starting -= 1
+
+        threading.Thread(target=start, daemon=True).start()
+
+    def _acquire(self) -> _Worker:
+        """
+        Take an idle worker, waiting up to acquire_timeout for one.
+
+        Raises:
+            RuntimeError: No worker is running or starting (replacements failed),
+                or none became free in time
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                return self._idle.get(timeout=POLL_INTERVAL_SECONDS * 10)
+            except queue.Empty:
+                pass
+            with self._lock:
+                available = len(self._workers) + self._starting
+                start_error = self._start_error
+            if not available:
+                raise RuntimeError(f"No sandbox workers are running: replacement failed to start ({start_error})")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"No sandbox worker became free within {self.acquire_timeout:g} seconds")
+
+    def run(self, code: str, data_version: Optional[str] = None, timeout: Optional[float] = None, csv_path: Optional[str] = None) -> str:
+        """
+        Run code in a worker and return what it printed, or repr() of the
+        exception it raised (the PythonREPL output format).
+
+        Args:
+            code: Python code using the pre-loaded 'df'
+            data_version: Content hash of the data the code should see; workers
+                holding an older version reload the CSV first
+            timeout: Override for the pool's wall-clock limit
+            csv_path: CSV to run against instead of the pool's (e.g. another registry dataset)
+        """
+        return self.execute(code, data_version=data_version, timeout=timeout, csv_path=csv_path)[0]
+
+    def _send(self, worker: _Worker, message) -> bool:
+        """Send a message to a worker; replace the worker and return False if it has exited."""
+        try:
+            if not worker.process.is_alive():
+                raise BrokenPipeError("worker process exited")
+            worker.conn.send(message)
+            return True
+        except (OSError, ValueError) as e:
+            logging.warning(f"Sandbox worker {worker.process.pid} is gone ({e!r}), replacing it")
+            self._replace(worker, kill=True)
+            return False
+
+    def _load(self, worker: _Worker, data_version: Optional[str], csv_path: str):
+        """
+        Have a worker load the given data if it holds other data. Runs before
+        the snippet's deadline starts, with the worker startup limit, so a
+        slow reload never counts as a snippet timeout.
+
+        Returns:
+            True when the worker holds the data, False when the worker was lost
+            (and is being replaced), or an error message when loading failed
+            (the worker keeps its old data and goes back to the pool)
+        """
+        if (worker.data_version, worker.csv_path) == (data_version, csv_path):
+            return True
+        if not self._send(worker, ("load", data_version, csv_path)):
+            return False
+        try:
+            if not worker.conn.poll(STARTUP_TIMEOUT_SECONDS):
+                raise TimeoutError(f"reload exceeded {STARTUP_TIMEOUT_SECONDS:g} seconds")
+            status, output = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            logging.warning(f"Sandbox worker {worker.process.pid} failed to reload {csv_path}: {e!r}")
+            self._replace(worker, kill=True)
+            return False
+        if status != "loaded":
+            self._idle.put(worker)
+            return f"Error: could not load the data: {output}"
+        worker.data_version, worker.csv_path = data_version, csv_path
+        return True
+
+    def execute(self, code: str, data_version: Optional[str] = None, timeout: Optional[float] = None, csv_path: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Like run, but also report whether the code completed without raising,
+        being stopped or crashing its worker.
+
+        Returns:
+            Tuple of (output, ok)
+        """
+        if self._closed:
+            raise RuntimeError("Sandbox pool is closed")
+        timeout = timeout or self.timeout
+        with self._lock:
+            data_version = data_version or self.data_version
+            csv_path = str(csv_path or self.csv_path)
+            # Replacements start on the latest data, so they don't reload it on their first task
+            self.data_version, self.csv_path = data_version, csv_path
+
+        # A worker that exited while idle is replaced, and the code goes to another one
+        for _ in range(self.size + 1):
+            worker = self._acquire()
+            loaded = self._load(worker, data_version, csv_path)
+            if isinstance(loaded, str):
+                return loaded, False
+            if loaded and self._send(worker, ("run", code)):
+                break
+        else:
+            return "Error: the sandbox workers exited before the code could run", False
+        worker.tasks += 1
+        self._count("executions")
+
+        deadline = time.monotonic() + timeout
+        while not worker.conn.poll(POLL_INTERVAL_SECONDS):
+            if not worker.process.is_alive():
+                self._replace(worker, kill=True)
+                return "Error: the code crashed its worker process", False
+            if time.monotonic() > deadline:
+                self._count("timeouts")
+                logging.warning(f"Sandboxed code exceeded {timeout}s, killing worker {worker.process.pid}")
+                self._replace(worker, kill=True)
+                return f"TimeoutError('Execution exceeded {timeout:g} seconds and was stopped')", False
+            rss = _rss_bytes(worker.process.pid) if self.max_rss_bytes else None
+            if rss is not None and rss > self.max_rss_bytes:
+                self._count("memory_kills")
+                logging.warning(f"Sandboxed code exceeded {self.max_rss_bytes // (1024 * 1024)} MB, killing worker {worker.process.pid}")
+                self._replace(worker, kill=True)
+                return f"MemoryError('Execution exceeded the {self.max_rss_bytes // (1024 * 1024)} MB memory limit and was stopped')", False
+
+        try:
+            status, output = worker.conn.recv()
+        except (EOFError, OSError):
+            self._replace(worker, kill=True)
+            return "Error: the code crashed its worker process", False
+
+        if worker.tasks >= self.max_tasks:
+            self._count("recycled")
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put(worker)
+        return output, status == "done"
+
+    def close(self) -> None:
+        """Stop all workers."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,277 @@
+"""
+Local HTTP server in front of a pool of warm SalesSupportAgent workers.
+
+Endpoints:
+    POST /query   {"question": "...", "timeout": 30, "dataset": "emea"}  ->  {"answer": "...", "latency_ms": 812.4}
+    GET  /health  ->  pool status
+
+Usage:
+    python server.py --port 8080 --workers 4 --max-queue 32 --timeout 60
+    python server.py --dataset emea=data/emea.csv --dataset apac=data/apac.csv --max-dataset-mb 4096
+"""
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+CURRENT_DIR = Path(__file__).resolve().parent
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+PROJECT_ROOT = CURRENT_DIR.parent
+from agent import SalesSupportAgent
+from tools import SubscriptionDataStore
+from dataset_registry import DatasetRegistry
+
+
+class PoolFullError(Exception):
+    """Raised when every worker is busy and the request queue is full."""
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query does not finish within its timeout."""
+
+
+class AgentPool:
+    """
+    Fixed pool of pre-initialized agents.
+
+    At most `size` queries run at once. Up to `max_queue` more wait for a free
+    agent; beyond that, new queries are refused immediately (backpressure).
+    A query that times out while running is abandoned and its agent replaced
+    with a new one from agent_factory, so hung runs do not shrink the pool.
+    """
+
+    def __init__(self, agent_factory: Callable[[], SalesSupportAgent], size: int = 2, max_queue: int = 16):
+        """
+        Args:
+            agent_factory: Builds one agent; called `size` times up front and
+                again for each agent abandoned by a timed-out query
+            size: Number of agents (queries running concurrently)
+            max_queue: Number of queries allowed to wait for a free agent
+        """
+        self.size = size
+        self.max_queue = max_queue
+        self._agent_factory = agent_factory
+        self._idle_agents: "queue.Queue[SalesSupportAgent]" = queue.Queue()
+        for _ in range(size):
+            self._idle_agents.put(agent_factory())
+        self._slots = threading.BoundedSemaphore(size + max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"in_flight": 0, "running": 0, "completed": 0, "rejected": 0, "timed_out": 0, "replaced": 0}
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += delta
+
+    def _release_slot(self) -> None:
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _replace(self, agent: SalesSupportAgent) -> SalesSupportAgent:
+        """A new agent to take the place of one still running an abandoned query."""
+        try:
+            replacement = self._agent_factory()
+        except Exception as e:
+            # Without a replacement the pool would shrink for good; the old agent
+            # takes the next query alongside its abandoned run instead
+            logging.error(f"Could not replace a timed-out agent: {e}")
+            return agent
+        self._count("replaced")
+        return replacement
+
+    def query(self, question: str, timeout: Optional[float] = None, dataset_id: Optional[str] = None) -> str:
+        """
+        Run a question on the next free agent, against a named dataset if the
+        agents serve a DatasetRegistry.
+
+        The timeout covers waiting for a free agent and the run itself. The
+        run happens on a daemon thread; if it is still going at the deadline
+        it is left to finish in the background and its agent is replaced.
+
+        Raises:
+            PoolFullError: All agents are busy and the queue is full
+            QueryTimeoutError: The answer did not arrive within timeout seconds
+            ValueError: Unknown dataset
+        """
+        if self._closed or not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise PoolFullError("All agents are busy and the request queue is full")
+        self._count("in_flight")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            try:
+                agent = self._idle_agents.get(timeout=timeout)
+            except queue.Empty:
+                self._count("timed_out")
+                raise QueryTimeoutError(f"Query did not finish within {timeout} seconds") from None
+
+            result: Future = Future()
+
+            def run(agent: SalesSupportAgent) -> None:
+                try:
+                    result.set_result(agent.query(question, dataset_id=dataset_id))
+                except BaseException as e:
+                    result.set_exception(e)
+
+            self._count("running")
+            threading.Thread(target=run, args=(agent,), name="agent-pool", daemon=True).start()
+            try:
+                answer = result.result(timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                self._count("timed_out")
+                if not result.done():
+                    agent = self._replace(agent)
+                raise QueryTimeoutError(f"Query did not finish within {timeout} seconds") from None
+            finally:
+                self._count("running", -1)
+                self._idle_agents.put(agent)
+        finally:
+            self._release_slot()
+        self._count("completed")
+        return answer
+
+    def health(self) -> dict:
+        """Pool status for the health endpoint."""
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            "status": "ok",
+            "workers": self.size,
+            "busy": stats["running"],
+            "queued": stats["in_flight"] - stats["running"],
+            "max_queue": self.max_queue,
+            "completed": stats["completed"],
+            "rejected": stats["rejected"],
+            "timed_out": stats["timed_out"],
+            "replaced": stats["replaced"],
+        }
+
+    def shutdown(self) -> None:
+        """Refuse new queries; runs already in progress finish on their daemon threads."""
+        self._closed = True
+
+
+def make_handler(pool: AgentPool, default_timeout: Optional[float]):
+    """
+    Build the request handler class bound to a pool.
+    """
+
+    class AgentRequestHandler(BaseHTTPRequestHandler):
+
+        def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, pool.health())
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/query":
+                self._send_json(404, {"error": "Not found"})
+                return
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                question = payload["question"]
+                dataset_id = payload.get("dataset")
+                timeout = payload.get("timeout", default_timeout)
+                timeout = float(timeout) if timeout is not None else None
+                if not isinstance(question, str) or not question.strip():
+                    raise ValueError("'question' must be a non-empty string")
+                if dataset_id is not None and not isinstance(dataset_id, str):
+                    raise ValueError("'dataset' must be a string")
+                if timeout is not None and timeout <= 0:
+                    raise ValueError("'timeout' must be positive")
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"Body must be JSON with a 'question' field: {e}"})
+                return
+
+            start = time.perf_counter()
+            try:
+                answer = pool.query(question, timeout=timeout, dataset_id=dataset_id)
+            except PoolFullError as e:
+                self._send_json(429, {"error": str(e)}, headers={"Retry-After": "1"})
+                return
+            except QueryTimeoutError as e:
+                self._send_json(504, {"error": str(e)})
+                return
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            except Exception as e:
+                logging.error(f"Error answering query: {e}")
+                self._send_json(500, {"error": str(e)})
+                return
+
+            self._send_json(200, {"answer": answer, "latency_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+        def log_message(self, format, *args):
+            logging.info("%s - %s", self.address_string(), format % args)
+
+    return AgentRequestHandler
+
+
+def create_server(pool: AgentPool, host: str = "127.0.0.1", port: int = 8080, default_timeout: Optional[float] = 60.0) -> ThreadingHTTPServer:
+    """
+    Create (but don't start) the HTTP server. Port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(pool, default_timeout))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Sales Support Agent over HTTP.")
+    parser.add_argument("--csv", default=str(PROJECT_ROOT / "data" / "subscription_data.csv"), help="Subscription data CSV")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="Number of warm agents")
+    parser.add_argument("--max-queue", type=int, default=32, help="Queries allowed to wait for a free agent")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Default per-request timeout in seconds")
+    parser.add_argument("--dataset", action="append", default=[], metavar="ID=CSV", help="Named dataset to serve (repeatable); requests pick one with 'dataset'")
+    parser.add_argument("--max-dataset-mb", type=float, default=2048, help="Memory ceiling for loaded datasets")
+    args = parser.parse_args()
+
+    print(f"Initializing {args.workers} Sales Support Agents...")
+    if args.dataset:
+        data_store = DatasetRegistry(dict(item.split("=", 1) for item in args.dataset), max_memory_mb=args.max_dataset_mb)
+        args.csv = data_store.csv_path
+    else:
+        data_store = SubscriptionDataStore(args.csv)
+    pool = AgentPool(
+        lambda: SalesSupportAgent(csv_path=args.csv, api_key=os.getenv("COHERE_PROD_API_KEY"), data_store=data_store),
+        size=args.workers,
+        max_queue=args.max_queue,
+    )
+    server = create_server(pool, args.host, args.port, args.timeout)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (POST /query, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
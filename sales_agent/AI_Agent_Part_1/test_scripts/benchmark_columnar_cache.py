@@ -0,0 +1,44 @@
+# benchmark_columnar_cache.py
+"""
+Compare typed DataFrame load time from CSV against the Feather columnar
+cache for 10k, 100k and 1M synthetic subscription rows.
+
+Usage:
+    python benchmark_columnar_cache.py [n_rows ...]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from data_cache import load_subscription_dataframe, read_subscription_csv
+from synthetic_data import write_subscription_csv
+
+
+def timed(func, *args, **kwargs) -> float:
+    """Return the wall time in seconds of one call."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    tmp_dir = Path(tempfile.gettempdir())
+
+    print(f"{'rows':>10} {'csv load':>10} {'cache build':>12} {'cache load':>11} {'speedup':>8}")
+    print("=" * 56)
+    for n_rows in sizes:
+        csv_path = write_subscription_csv(tmp_dir / f"subscriptions_{n_rows}.csv", n_rows)
+        cache_dir = tmp_dir / f"subscriptions_{n_rows}_cache"
+        for stale in cache_dir.glob("*"):
+            stale.unlink()
+
+        csv_time = timed(read_subscription_csv, csv_path)
+        build_time = timed(load_subscription_dataframe, csv_path, cache_dir=cache_dir)
+        cached_time = min(timed(load_subscription_dataframe, csv_path, cache_dir=cache_dir) for _ in range(3))
+        print(f"{n_rows:>10,} {csv_time:>9.3f}s {build_time:>11.3f}s {cached_time:>10.3f}s {csv_time / cached_time:>7.1f}x")
@@ -0,0 +1,81 @@
+# benchmark_fast_path.py
+"""
+Fast-path router: correctness against the golden answers in the evaluation
+set, and latency compared to the full agent loop.
+
+The agent runs on the local fake chat model with zero LLM latency, so its
+time is only graph, guardrail and pandas tool overhead; real Cohere calls
+(one guardrail + two agent calls) come on top of that.
+
+Usage:
+    python benchmark_fast_path.py
+"""
+import re
+import sys
+import json
+import time
+import statistics
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+EVAL_PATH = PROJECT_ROOT.parent / "data" / "evaluation_data (1).json"
+FACT_PATTERN = re.compile(r"\$[\d,]+(?:\.\d+)?|\d+(?:\.\d+)?%|\b\d[\d,]*\b")
+NUMBER_WORDS = {"Two": "2", "Three": "3", "Four": "4", "Five": "5", "Six": "6"}
+
+
+def golden_facts(golden_answer: str, company_names: list) -> set:
+    """Amounts, percentages, counts and company names stated in a golden answer."""
+    for word, digit in NUMBER_WORDS.items():
+        golden_answer = re.sub(rf"\b{word}\b", digit, golden_answer)
+    return set(FACT_PATTERN.findall(golden_answer)) | {name for name in company_names if name in golden_answer}
+
+
+def median_ms(func, question: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(question)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    items = json.loads(EVAL_PATH.read_text())["data"]
+    llm = FakeChatModel(tool_code="print(len(df))")
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=True)
+    slow_agent = SalesSupportAgent(CSV_PATH, llm=FakeChatModel(tool_code="print(len(df))"), fast_path=False)
+    company_names = agent.data_store.current.df['company_name'].tolist()
+
+    print("Correctness against golden answers")
+    print("=" * 60)
+    routed = []
+    for item in items:
+        question = item["question"]
+        result = agent.fast_path.route(question, agent.data_store.current.df)
+        if result is None:
+            continue
+        intent, answer = result
+        missing = golden_facts(item["golden_answer"], company_names) - set(FACT_PATTERN.findall(answer)) - {n for n in company_names if n in answer}
+        routed.append(question)
+        print(f"{'PASS' if not missing else 'FAIL'} {intent:<24} {question}")
+        if missing:
+            print(f"     missing from answer: {sorted(missing)}")
+    print(f"\nRouted {len(routed)} of {len(items)} evaluation questions; the rest fall back to the agent.")
+    assert not llm.guardrail_calls and not llm.agent_calls
+
+    print("\nLatency (median of 20 runs)")
+    print("=" * 60)
+    print(f"{'question':<62} {'fast path':>10} {'agent':>10}")
+    for question in routed:
+        fast = median_ms(agent.query, question, 20)
+        # Distinct wording per run keeps the guardrail verdict cache from hiding its cost
+        slow = median_ms(lambda q: slow_agent.query(f"{q} ({time.perf_counter_ns()})"), question, 20)
+        print(f"{question[:60]:<62} {fast:>8.2f}ms {slow:>8.1f}ms")
+    assert not llm.guardrail_calls and not llm.agent_calls, "fast path made LLM calls"
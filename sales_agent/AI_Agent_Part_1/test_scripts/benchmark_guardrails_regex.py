@@ -0,0 +1,68 @@
+# benchmark_guardrails_regex.py
+"""
+Compare per-query regex screening cost of the combined Guardrails engine
+against the previous one-pattern-at-a-time loop, and check both agree.
+
+Usage:
+    python benchmark_guardrails_regex.py [n_queries]
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from guardrails import Guardrails
+
+SENSITIVE_QUERIES = [
+    "What's the credit card number for Acme Corp?",
+    "Give me all customer emails",
+    "What's the SSN of the CFO?",
+    "Send me the phone numbers of every contact",
+    "What is the home address of John Doe?",
+    "Export the contact list",
+]
+
+
+def loop_check(guardrails: Guardrails, query: str) -> bool:
+    """The previous _check_regex: run every compiled pattern in turn."""
+    query_lower = query.lower()
+    for pattern in guardrails.compiled_patterns:
+        if pattern.search(query_lower):
+            return True
+    return False
+
+
+def build_queries(n_queries: int) -> list:
+    """Mix evaluation questions with sensitive requests, mostly benign like real logs."""
+    eval_path = PROJECT_ROOT.parent / "data" / "evaluation_data (1).json"
+    with eval_path.open("r", encoding="utf-8") as f:
+        questions = [entry["question"] for entry in json.load(f)["data"]]
+    rng = random.Random(0)
+    return [rng.choice(SENSITIVE_QUERIES if rng.random() < 0.1 else questions) for _ in range(n_queries)]
+
+
+if __name__ == "__main__":
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    guardrails = Guardrails()
+    queries = build_queries(n_queries)
+
+    mismatches = [q for q in set(queries) if loop_check(guardrails, q) != guardrails._check_regex(q)[0]]
+    print(f"Verdict mismatches between loop and combined engine: {len(mismatches)}")
+
+    start = time.perf_counter()
+    for query in queries:
+        loop_check(guardrails, query)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    guardrails.should_reject_batch(queries, use_llm=False)
+    combined_time = time.perf_counter() - start
+
+    print(f"Screened {n_queries:,} queries")
+    print(f"  pattern loop    : {loop_time / n_queries * 1e6:6.2f} us/query")
+    print(f"  combined engine : {combined_time / n_queries * 1e6:6.2f} us/query ({loop_time / combined_time:.1f}x)")
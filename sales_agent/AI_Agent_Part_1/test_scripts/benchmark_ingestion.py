@@ -0,0 +1,63 @@
+# benchmark_ingestion.py
+"""
+Compare a plain pd.read_csv of synthetic subscription data with the chunked,
+memory-optimized ingestion (time, DataFrame memory, peak RSS), then print
+the per-column memory report.
+
+Each load runs in its own process so peak RSS is measured independently.
+
+Usage:
+    python benchmark_ingestion.py [n_rows] [memory_budget_mb]
+"""
+import sys
+import resource
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+import pandas as pd
+from data_cache import format_memory_report, ingest_subscription_csv
+from synthetic_data import write_subscription_csv
+
+
+def measure(mode: str, csv_path: str, memory_budget_mb: float) -> None:
+    """Load once and print: seconds, DataFrame MB, peak RSS MB."""
+    start = time.perf_counter()
+    if mode == "plain":
+        df = pd.read_csv(csv_path)
+    else:
+        df, _ = ingest_subscription_csv(csv_path, memory_budget_mb=memory_budget_mb if mode == "budget" else None)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.3f} {df.memory_usage(deep=True).sum() / 2**20:.1f} {peak_mb:.0f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+        sys.exit(0)
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    budget_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 400
+    csv_path = write_subscription_csv(Path(tempfile.gettempdir()) / f"subscriptions_{n_rows}.csv", n_rows)
+
+    print(f"{'load':<28} {'time':>8} {'frame MB':>9} {'peak RSS MB':>12}")
+    print("=" * 60)
+    for mode, label in (("plain", "plain read_csv"), ("chunked", "chunked ingestion"), ("budget", f"chunked, {budget_mb:g} MB budget")):
+        result = subprocess.run(
+            [sys.executable, __file__, "--measure", mode, str(csv_path), str(budget_mb)],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"{label:<28} failed: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        elapsed, frame_mb, peak_mb = result.stdout.split()
+        print(f"{label:<28} {float(elapsed):>7.2f}s {frame_mb:>9} {peak_mb:>12}")
+
+    print()
+    print(format_memory_report(ingest_subscription_csv(csv_path)[1]))
@@ -0,0 +1,155 @@
+# benchmark_query_dsl.py
+"""
+Structured query tool vs. the PythonREPL tool on the evaluation questions.
+
+For each answerable (non-PII) evaluation question there is one JSON spec and
+the equivalent pandas code an LLM would write. Both run through their tools;
+the script checks the spec's result contains the golden facts and compares
+tool-call counts and per-call latency.
+
+Usage:
+    python benchmark_query_dsl.py [repeats]
+"""
+import re
+import sys
+import json
+import time
+import statistics
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from tools import SubscriptionDataStore, get_structured_query_tool, get_subscription_tool
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+EVAL_PATH = PROJECT_ROOT.parent / "data" / "evaluation_data (1).json"
+
+
+def eq(column, value):
+    return {"column": column, "op": "eq", "value": value}
+
+
+# question prefix -> (spec, equivalent REPL code, facts from the golden answer)
+CASES = {
+    "How many customers are currently on the Enterprise plan": (
+        {"filters": [eq("plan_tier", "Enterprise")], "select": ["company_name"], "aggregations": [{"column": "company_name", "func": "count"}]},
+        "r = df[df['plan_tier'] == 'Enterprise']\nprint(len(r), r['company_name'].tolist())",
+        ["6", "Acme Corp", "City Hospital Network"],
+    ),
+    "What is our total Monthly Recurring Revenue": (
+        {"filters": [eq("status", "active")], "select": ["company_name", "monthly_revenue"], "aggregations": [{"column": "monthly_revenue", "func": "sum"}]},
+        "r = df[df['status'] == 'active']\nprint(r['monthly_revenue'].sum(), r[['company_name', 'monthly_revenue']].to_dict('records'))",
+        ["127100"],
+    ),
+    "Which companies have churned": (
+        {"filters": [eq("status", "churned")], "select": ["company_name", "monthly_revenue"], "aggregations": [{"column": "monthly_revenue", "func": "sum"}]},
+        "r = df[df['status'] == 'churned']\nprint(r[['company_name', 'monthly_revenue']].to_dict('records'), r['monthly_revenue'].sum())",
+        ["9200", "HealthPlus Medical", "CloudBase Systems"],
+    ),
+    "List all Healthcare industry customers": (
+        {"filters": [eq("industry", "Healthcare")], "select": ["company_name", "status"]},
+        "print(df[df['industry'] == 'Healthcare'][['company_name', 'status']].to_dict('records'))",
+        ["Pharma Innovations", "pending_renewal"],
+    ),
+    "Which customers have seat utilization below 80%": (
+        {"filters": [{"column": "seat_utilization_pct", "op": "lt", "value": 80}], "select": ["company_name", "seat_utilization_pct"]},
+        "u = df['seats_used'] / df['seats_purchased'] * 100\nprint(df.assign(u=u.round(1))[u < 80][['company_name', 'u']].to_dict('records'))",
+        ["77.3", "60.0", "56.3"],
+    ),
+    "What custom features does Global Finance Ltd": (
+        {"filters": [eq("company_name", "Global Finance Ltd")], "select": ["custom_features"]},
+        "print(df[df['company_name'] == 'Global Finance Ltd']['custom_features'].iloc[0])",
+        ["Dedicated Instance"],
+    ),
+    "How many customers are pending renewal": (
+        {"filters": [eq("status", "pending_renewal")], "select": ["company_name", "outstanding_balance"], "aggregations": [{"column": "outstanding_balance", "func": "sum"}]},
+        "r = df[df['status'] == 'pending_renewal']\nprint(len(r), r['company_name'].tolist(), r['outstanding_balance'].sum())",
+        ["40000", "Legal Partners LLP"],
+    ),
+    "Which Technology companies": (
+        {"filters": [eq("industry", "Technology")], "select": ["company_name", "plan_tier", "status"]},
+        "print(df[df['industry'] == 'Technology'][['company_name', 'plan_tier', 'status']].to_dict('records'))",
+        ["SmallBiz Tools", "Basic"],
+    ),
+    "What is the average monthly cost for Professional": (
+        {"filters": [eq("plan_tier", "Professional")], "aggregations": [{"column": "monthly_revenue", "func": "mean"}]},
+        "print(round(df[df['plan_tier'] == 'Professional']['monthly_revenue'].mean(), 2))",
+        ["3533.33"],
+    ),
+    "Which customer has the most seats purchased": (
+        {"sort": [{"column": "seats_purchased", "descending": True}], "limit": 1, "select": ["company_name", "seats_purchased", "seats_used", "seat_utilization_pct"]},
+        "r = df.loc[df['seats_purchased'].idxmax()]\nprint(r['company_name'], r['seats_purchased'], r['seats_used'], round(r['seats_used'] / r['seats_purchased'] * 100, 1))",
+        ["MegaCorp International", "2000", "1834", "91.7"],
+    ),
+    "How much revenue are we at risk": (
+        {"filters": [eq("status", "pending_renewal"), eq("auto_renew", False)], "match": "any", "select": ["company_name", "status", "auto_renew", "monthly_revenue"]},
+        "r = df[(df['status'] == 'pending_renewal') | (~df['auto_renew'])]\nprint(r[['company_name', 'status', 'auto_renew', 'monthly_revenue']].to_dict('records'))",
+        ["18000", "22000"],
+    ),
+    "Show me companies that are not using": (
+        {"filters": [{"column": "seat_utilization_pct", "op": "lt", "value": 80}], "select": ["company_name", "status", "seat_utilization_pct"], "sort": [{"column": "seat_utilization_pct"}]},
+        "u = df['seats_used'] / df['seats_purchased'] * 100\nprint(df.assign(u=u.round(1))[u < 80].sort_values('u')[['company_name', 'status', 'u']].to_dict('records'))",
+        ["CloudBase Systems", "Startup Accelerator", "HealthPlus Medical"],
+    ),
+    "How many customers use wire transfer": (
+        {"filters": [eq("payment_method", "wire_transfer")], "select": ["company_name"], "aggregations": [{"column": "company_name", "func": "count"}]},
+        "r = df[df['payment_method'] == 'wire_transfer']\nprint(len(r), r['company_name'].tolist())",
+        ["6", "MegaCorp International"],
+    ),
+    "What is the total annual contract value": (
+        {"filters": [eq("status", "active"), eq("plan_tier", "Enterprise")], "aggregations": [{"column": "annual_revenue", "func": "sum"}]},
+        "print(df[(df['status'] == 'active') & (df['plan_tier'] == 'Enterprise')]['annual_revenue'].sum())",
+        [],
+    ),
+    "Which customers have HIPAA Compliance": (
+        {"filters": [{"column": "custom_features", "op": "contains", "value": "HIPAA Compliance"}], "select": ["company_name"]},
+        "print(df[df['custom_features'].str.contains('HIPAA Compliance', na=False)]['company_name'].tolist())",
+        ["HealthPlus Medical", "Pharma Innovations", "City Hospital Network"],
+    ),
+    "Which customers should our sales team prioritize": (
+        {"filters": [eq("status", "active")], "select": ["company_name", "plan_tier", "seat_utilization_pct", "monthly_revenue"], "sort": [{"column": "seat_utilization_pct", "descending": True}], "limit": 5},
+        "u = (df['seats_used'] / df['seats_purchased'] * 100).round(1)\nprint(df.assign(u=u)[df['status'] == 'active'].sort_values('u', ascending=False).head(5)[['company_name', 'plan_tier', 'u', 'monthly_revenue']].to_dict('records'))",
+        [],
+    ),
+}
+
+
+def median_ms(tool, payload, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        tool.invoke(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    store = SubscriptionDataStore(CSV_PATH)
+    dsl_tool = get_structured_query_tool(store)
+    repl_tool = get_subscription_tool(CSV_PATH, data_store=store)
+    questions = [item["question"] for item in json.loads(EVAL_PATH.read_text())["data"]]
+
+    print(f"{'question':<52} {'facts':>6} {'DSL ms':>8} {'REPL ms':>8}")
+    print("=" * 78)
+    covered, dsl_total, repl_total = 0, [], []
+    for question in questions:
+        case = next((value for prefix, value in CASES.items() if question.startswith(prefix)), None)
+        if case is None:
+            print(f"{question[:50]:<52} {'n/a':>6}   (refused by guardrails / not a data query)")
+            continue
+        spec, code, facts = case
+        output = dsl_tool.invoke(spec)
+        flat = re.sub(r'[",\[\]{}]', " ", output)
+        ok = all(fact in flat for fact in facts) and not output.startswith("Error")
+        covered += ok
+        dsl_ms, repl_ms = median_ms(dsl_tool, spec, repeats), median_ms(repl_tool, {"code": code}, repeats)
+        dsl_total.append(dsl_ms)
+        repl_total.append(repl_ms)
+        print(f"{question[:50]:<52} {'PASS' if ok else 'FAIL':>6} {dsl_ms:>8.2f} {repl_ms:>8.2f}")
+
+    print("=" * 78)
+    print(f"Answered in one structured_query call: {covered} of {len(dsl_total)} data questions")
+    print(f"Median per-call latency: DSL {statistics.median(dsl_total):.2f} ms, REPL {statistics.median(repl_total):.2f} ms")
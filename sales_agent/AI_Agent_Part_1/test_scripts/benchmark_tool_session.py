@@ -0,0 +1,55 @@
+# benchmark_tool_session.py
+"""
+Compare query_subscription_data latency with and without session mode
+on a 1M-row synthetic subscription file.
+
+Usage:
+    python benchmark_tool_session.py [n_rows]
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from tools import create_python_repl_tool
+from synthetic_data import write_subscription_csv
+
+logging.getLogger("langchain_experimental.utilities.python").setLevel(logging.ERROR)
+
+SNIPPETS = [
+    "print(df[df['plan_tier'] == 'Enterprise'].shape[0])",
+    "print(df[df['status'] == 'active']['monthly_revenue'].sum())",
+    "print(df.groupby('industry')['monthly_revenue'].sum())",
+]
+
+
+def time_calls(tool, repeats: int = 3) -> float:
+    """Return the mean latency in seconds of one tool call."""
+    timings = []
+    for _ in range(repeats):
+        for code in SNIPPETS:
+            start = time.perf_counter()
+            tool.func(code)
+            timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings)
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    csv_path = write_subscription_csv(Path(tempfile.gettempdir()) / f"subscriptions_{n_rows}.csv", n_rows)
+
+    print(f"Benchmarking tool calls on {n_rows:,} rows ({csv_path})")
+    print("=" * 60)
+
+    for session in (False, True):
+        start = time.perf_counter()
+        tool = create_python_repl_tool(str(csv_path), session=session)
+        build = time.perf_counter() - start
+        per_call = time_calls(tool)
+        label = "session" if session else "per-call reload"
+        print(f"{label:<16} tool build: {build:7.2f}s   mean call: {per_call * 1000:9.1f} ms")
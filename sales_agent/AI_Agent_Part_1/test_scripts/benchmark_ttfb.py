@@ -0,0 +1,58 @@
+# benchmark_ttfb.py
+"""
+Time-to-first-byte of the blocking query() against stream_query(), using a
+fake chat model with simulated LLM and per-token latency.
+
+Usage:
+    python benchmark_ttfb.py
+"""
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+# Tool output becomes a 40-word answer, streamed one word at a time
+TOOL_CODE = "print(' '.join(df['company_name'].str.split().str[0].tolist() * 3)[:300])"
+
+
+def make_agent(speculative: bool = False) -> SalesSupportAgent:
+    llm = FakeChatModel(guardrail_delay=0.4, agent_delay=0.4, token_delay=0.03, tool_code=TOOL_CODE)
+    return SalesSupportAgent(CSV_PATH, llm=llm, speculative_guardrails=speculative)
+
+
+def measure_blocking(agent: SalesSupportAgent, question: str):
+    start = time.perf_counter()
+    agent.query(question)
+    total = time.perf_counter() - start
+    return total, total, total
+
+
+def measure_streaming(agent: SalesSupportAgent, question: str):
+    start = time.perf_counter()
+    first_event = first_token = None
+    for event in agent.stream_query(question):
+        now = time.perf_counter() - start
+        first_event = first_event or now
+        if event["type"] == "token" and first_token is None:
+            first_token = now
+    return first_event, first_token, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'mode':<22} {'first event':>12} {'first token':>12} {'total':>8}")
+    print("=" * 58)
+    runs = [
+        ("query()", measure_blocking, make_agent()),
+        ("stream_query()", measure_streaming, make_agent()),
+        ("stream_query() spec.", measure_streaming, make_agent(speculative=True)),
+    ]
+    for idx, (label, measure, agent) in enumerate(runs):
+        first_event, first_token, total = measure(agent, f"List our customers (run {idx})")
+        print(f"{label:<22} {first_event:>11.2f}s {first_token:>11.2f}s {total:>7.2f}s")
@@ -0,0 +1,106 @@
+# fake_chat_model.py
+"""
+Local stand-in for ChatCohere so the agent can be exercised without an API key.
+
+The model answers guardrail prompts with a fixed verdict. For agent turns it
+first calls query_subscription_data with tool_code (or tool_name with
+tool_args), then answers with the tool output. Every call sleeps for a
+configurable delay to simulate latency; when streamed, text answers arrive
+word by word with token_delay between them.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted chat model with simulated latency."""
+
+    guardrail_verdict: str = "ALLOW"
+    guardrail_delay: float = 0.0
+    agent_delay: float = 0.0
+    token_delay: float = 0.0
+    tool_code: Optional[str] = "print(len(df))"
+    tool_name: str = "query_subscription_data"
+    tool_args: Optional[dict] = None
+    guardrail_calls: List[str] = Field(default_factory=list)
+    agent_calls: List[List[BaseMessage]] = Field(default_factory=list)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _is_guardrail(self, messages: List[BaseMessage]) -> bool:
+        return len(messages) == 1 and "REJECT" in str(messages[0].content)
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        if self._is_guardrail(messages):
+            with self._lock:
+                self.guardrail_calls.append(str(messages[0].content))
+            return AIMessage(content=self.guardrail_verdict)
+
+        with self._lock:
+            self.agent_calls.append(list(messages))
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=f"Answer: {str(last.content).strip()}")
+        if self.tool_code is None:
+            return AIMessage(content="Answer: no tool needed")
+        return AIMessage(
+            content="",
+            tool_calls=[{
+                "name": self.tool_name,
+                "args": self.tool_args if self.tool_args is not None else {"code": self.tool_code},
+                "id": f"call_{len(self.agent_calls)}",
+            }],
+        )
+
+    def _delay_for(self, messages: List[BaseMessage]) -> float:
+        return self.guardrail_delay if self._is_guardrail(messages) else self.agent_delay
+
+    def _generation_time(self, message: AIMessage) -> float:
+        # Non-streamed text answers still take as long to generate as streamed ones
+        return self.token_delay * max(len(message.content.split(" ")) - 1, 0) if message.content else 0.0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay_for(messages))
+        message = self._reply(messages)
+        time.sleep(self._generation_time(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay_for(messages))
+        message = self._reply(messages)
+        await asyncio.sleep(self._generation_time(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay_for(messages))
+        message = self._reply(messages)
+        if message.tool_calls:
+            chunk = AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+                for call in message.tool_calls
+            ])
+            yield ChatGenerationChunk(message=chunk)
+            return
+        words = message.content.split(" ")
+        for idx, word in enumerate(words):
+            if idx:
+                time.sleep(self.token_delay)
+            text = word if idx == len(words) - 1 else word + " "
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
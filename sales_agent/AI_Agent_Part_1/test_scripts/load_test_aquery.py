@@ -0,0 +1,59 @@
+# load_test_aquery.py
+"""
+Load test for SalesSupportAgent.aquery against a local fake chat model.
+
+Each question costs one guardrail call and two agent calls of simulated LLM
+latency plus one pandas tool call; throughput should grow with concurrency
+because all of them share one event loop.
+
+Usage:
+    python load_test_aquery.py [n_questions] [llm_delay_seconds]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+
+
+async def run_load(agent: SalesSupportAgent, questions: list, concurrency: int) -> float:
+    """Answer all questions with at most `concurrency` in flight; return questions/second."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ask(question: str) -> str:
+        async with semaphore:
+            return await agent.aquery(question)
+
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(ask(q) for q in questions))
+    elapsed = time.perf_counter() - start
+
+    assert all(answer == "Answer: 127100" for answer in answers), set(answers)
+    return len(questions) / elapsed
+
+
+async def main(n_questions: int, delay: float) -> None:
+    print(f"Load testing aquery: {n_questions} questions, {delay * 1000:.0f} ms per fake LLM call")
+    print("=" * 60)
+    for concurrency in (1, 4, 16, 64):
+        llm = FakeChatModel(guardrail_delay=delay, agent_delay=delay, tool_code=TOOL_CODE)
+        agent = SalesSupportAgent(CSV_PATH, llm=llm)
+        # Distinct questions, so the guardrail verdict cache doesn't hide LLM latency
+        questions = [f"What is our active MRR? (request {i})" for i in range(n_questions)]
+        throughput = await run_load(agent, questions, concurrency)
+        print(f"concurrency {concurrency:>3}: {throughput:7.1f} questions/s")
+
+
+if __name__ == "__main__":
+    n_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    asyncio.run(main(n_questions, delay))
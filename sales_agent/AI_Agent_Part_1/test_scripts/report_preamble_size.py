@@ -0,0 +1,61 @@
+# report_preamble_size.py
+"""
+Prompt size of the full schema preamble (system prompt + tool input schema)
+vs. the compact, token-budgeted preamble (system prompt only), per model call.
+
+Usage:
+    python report_preamble_size.py [extra_columns]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from prompt import SYSTEM_PROMPT_V3
+from output_budget import estimate_tokens
+from tools import SubscriptionDataStore
+from synthetic_data import make_subscription_frame
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+def write_wide_export(path: Path, extra_columns: int) -> Path:
+    """Synthetic export with extra numeric, categorical and free-text columns."""
+    df = make_subscription_frame(5000)
+    rng = np.random.default_rng(0)
+    for i in range(extra_columns):
+        kind = i % 3
+        if kind == 0:
+            df[f"usage_metric_{i}"] = rng.integers(0, 100000, len(df))
+        elif kind == 1:
+            df[f"segment_{i}"] = rng.choice(["north", "south", "east", "west"], len(df))
+        else:
+            df[f"note_{i}"] = [f"note {i}-{j}" for j in range(len(df))]
+    df.to_csv(path, index=False)
+    return path
+
+
+def prompt_tokens(csv_path, preamble_tokens):
+    snapshot = SubscriptionDataStore(csv_path, preamble_tokens=preamble_tokens).current
+    schema_text = snapshot.args_schema.model_fields["code"].description
+    return estimate_tokens(len(SYSTEM_PROMPT_V3) + len(snapshot.preamble) + len(schema_text))
+
+
+if __name__ == "__main__":
+    extra_columns = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    with tempfile.TemporaryDirectory() as tmp:
+        datasets = {
+            "sample (19 columns)": CSV_PATH,
+            f"wide export ({19 + extra_columns} columns)": write_wide_export(Path(tmp) / "wide.csv", extra_columns),
+        }
+        print(f"{'dataset':<28} {'full':>8} {'compact':>8} {'saved':>8}")
+        print("=" * 56)
+        for name, path in datasets.items():
+            full, compact = prompt_tokens(path, None), prompt_tokens(path, 800)
+            print(f"{name:<28} {full:>8} {compact:>8} {1 - compact / full:>7.0%}")
+    print("Estimated tokens (4 characters each) sent on every model call: system prompt + preamble + tool schema.")
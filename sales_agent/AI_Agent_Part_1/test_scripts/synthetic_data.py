@@ -0,0 +1,58 @@
+# synthetic_data.py
+"""
+Generate synthetic subscription exports with the same schema as
+data/subscription_data.csv, for benchmarking at larger row counts.
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+PLAN_TIERS = ["Basic", "Professional", "Enterprise"]
+STATUSES = ["active", "churned", "pending_renewal", "trial"]
+INDUSTRIES = ["Manufacturing", "Technology", "Finance", "Healthcare", "Retail", "Education", "Legal"]
+PAYMENT_METHODS = ["credit_card", "wire_transfer", "invoice"]
+SUPPORT_TIERS = ["basic", "standard", "premium"]
+FEATURES = ["SSO", "API Access", "Custom Reports", "Dedicated Instance", "HIPAA Compliance"]
+
+
+def make_subscription_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Build a DataFrame of n_rows synthetic subscriptions."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows)
+
+    start = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 900, n_rows), unit="D")
+    end = start + pd.to_timedelta(365 * rng.integers(1, 4, n_rows), unit="D")
+    monthly = rng.choice([600, 800, 1200, 2800, 3500, 4200, 15000, 25000, 45000], n_rows)
+    seats = rng.integers(5, 1000, n_rows)
+    features = np.array([", ".join(FEATURES[:k]) for k in range(1, len(FEATURES) + 1)])
+
+    return pd.DataFrame({
+        "subscription_id": [f"SUB-{i:07d}" for i in ids],
+        "company_name": [f"Company {i}" for i in ids],
+        "plan_tier": rng.choice(PLAN_TIERS, n_rows),
+        "monthly_revenue": monthly,
+        "annual_revenue": monthly * 12,
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+        "status": rng.choice(STATUSES, n_rows),
+        "seats_purchased": seats,
+        "seats_used": (seats * rng.uniform(0.3, 1.0, n_rows)).astype(int),
+        "industry": rng.choice(INDUSTRIES, n_rows),
+        "primary_contact": [f"contact{i}@company{i}.com" for i in ids],
+        "payment_method": rng.choice(PAYMENT_METHODS, n_rows),
+        "auto_renew": rng.choice(["TRUE", "FALSE"], n_rows),
+        "last_payment_date": (start + pd.to_timedelta(30, unit="D")).strftime("%Y-%m-%d"),
+        "outstanding_balance": rng.choice([0, 0, 0, 600, 4200], n_rows),
+        "support_tier": rng.choice(SUPPORT_TIERS, n_rows),
+        "implementation_date": (start + pd.to_timedelta(5, unit="D")).strftime("%Y-%m-%d"),
+        "custom_features": rng.choice(features, n_rows),
+    })
+
+
+def write_subscription_csv(path: Path, n_rows: int, seed: int = 42) -> Path:
+    """Write a synthetic subscription CSV to path, reusing it if it already exists."""
+    path = Path(path)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        make_subscription_frame(n_rows, seed).to_csv(path, index=False)
+    return path
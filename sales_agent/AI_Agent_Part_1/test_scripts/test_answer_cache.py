@@ -0,0 +1,155 @@
+# test_answer_cache.py
+"""
+Semantic answer cache: paraphrases reuse a cached answer, different questions
+don't, guardrails still run on cache hits, and a data change invalidates it.
+
+Run with: python test_answer_cache.py (or pytest)
+"""
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent, REJECTION_RESPONSE
+from answer_cache import SemanticAnswerCache, is_date_relative, key_terms_from_dataframe
+from data_cache import load_subscription_dataframe
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+
+
+def make_agent(csv_path=CSV_PATH):
+    llm = FakeChatModel(tool_code=TOOL_CODE)
+    return SalesSupportAgent(csv_path, llm=llm, answer_cache=SemanticAnswerCache(), fast_path=False), llm
+
+
+def test_paraphrase_hits_and_modifiers_miss():
+    agent, llm = make_agent()
+    assert agent.query("What is our total MRR from active subscriptions?") == "Answer: 127100"
+    assert len(llm.agent_calls) == 2
+
+    assert agent.query("What's our total MRR from active subscriptions?") == "Answer: 127100"
+    assert agent.query("what is the total MRR from all active subscriptions") == "Answer: 127100"
+    assert len(llm.agent_calls) == 2
+
+    # Same wording, different meaning: ARR instead of MRR, churned instead of active
+    agent.query("What is our total ARR from active subscriptions?")
+    agent.query("What is our total MRR from churned subscriptions?")
+    assert len(llm.agent_calls) == 6
+    assert agent.answer_cache.stats()["hits"] == 2
+
+
+def test_different_questions_never_share_an_answer():
+    key_terms = key_terms_from_dataframe(load_subscription_dataframe(str(CSV_PATH)))
+    pairs = [
+        ("Which industry has the highest MRR?", "Which plan tier has the highest MRR?"),
+        ("Which customers have outstanding balances?", "Which customers have upcoming renewals?"),
+        ("Which subscriptions end this year?", "Which subscriptions started this year?"),
+        ("What is the avg seat utilization by industry?", "What is the avg seat utilization by plan tier?"),
+        ("Which customers renew in the next 30 days?", "Which customers expired in the last 30 days?"),
+    ]
+    # The signature gate alone must keep them apart, whatever the similarity threshold.
+    # Date-relative questions are not cached at all.
+    for threshold in (0.75, 0.0):
+        for cached, asked in pairs:
+            for first, second in ((cached, asked), (asked, cached)):
+                cache = SemanticAnswerCache(threshold=threshold)
+                cache.put(first, "cached answer", "ns", key_terms)
+                assert cache.get(second, "ns", key_terms) is None, (first, second)
+                assert cache.get(first, "ns", key_terms) == (None if is_date_relative(first) else "cached answer")
+
+
+def test_comparison_operators_are_kept():
+    key_terms = key_terms_from_dataframe(load_subscription_dataframe(str(CSV_PATH)))
+    questions = [
+        "How many customers have MRR > 5000?",
+        "How many customers have MRR < 5000?",
+        "How many customers have MRR >= 5000?",
+        "How many customers have MRR <= 5000?",
+        "How many customers have MRR = 5000?",
+    ]
+    for cached in questions:
+        cache = SemanticAnswerCache(threshold=0.0)
+        cache.put(cached, "cached answer", "ns", key_terms)
+        for asked in questions:
+            expected = "cached answer" if asked == cached else None
+            assert cache.get(asked, "ns", key_terms) == expected, (cached, asked)
+
+    # The exact-match path compares signatures too (key terms can change with the data)
+    cache = SemanticAnswerCache()
+    cache.put("How many Enterprise customers?", "cached answer", "ns", key_terms)
+    assert cache.get("How many Enterprise customers?", "ns", frozenset()) is None
+
+
+def test_entries_expire_and_date_relative_questions_are_not_cached():
+    cache = SemanticAnswerCache(ttl_seconds=0.1)
+    cache.put("What is our total MRR from active subscriptions?", "cached answer", "ns")
+    assert cache.get("What is our total MRR from active subscriptions?", "ns") == "cached answer"
+    time.sleep(0.15)
+    assert cache.get("What is our total MRR from active subscriptions?", "ns") is None
+    assert len(cache) == 0
+
+    for question in (
+        "Which customers renew in the next 30 days?",
+        "Which subscriptions end this year?",
+        "Who churned last month?",
+        "Which customers have upcoming renewals?",
+        "How many subscriptions started 2 weeks ago?",
+    ):
+        assert is_date_relative(question), question
+        cache.put(question, "cached answer", "ns")
+        assert cache.get(question, "ns") is None
+    assert not is_date_relative("Which subscriptions end in 2024?")
+
+
+def test_guardrails_run_before_cache():
+    agent, llm = make_agent()
+    agent.query("What is our total MRR from active subscriptions?")
+    llm.guardrail_verdict = "REJECT"
+    assert agent.query("What's our total MRR from active subscriptions") == REJECTION_RESPONSE
+    assert agent.query("What's the credit card number for our total MRR from active subscriptions?") == REJECTION_RESPONSE
+
+
+def test_speculative_answers_cached_only_after_guardrail_allows():
+    # The agent finishes long before the slow LLM guardrail rejects the query
+    llm = FakeChatModel(tool_code=TOOL_CODE, guardrail_verdict="REJECT", guardrail_delay=0.3)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, answer_cache=SemanticAnswerCache(), speculative_guardrails=True, fast_path=False)
+    question = "What is our total MRR from active subscriptions?"
+
+    assert agent.query(question) == REJECTION_RESPONSE
+    assert list(agent.stream_query(question))[-1]["content"] == REJECTION_RESPONSE
+    assert asyncio.run(agent.aquery(question)) == REJECTION_RESPONSE
+    time.sleep(0.2)
+    assert len(agent.answer_cache) == 0
+
+    llm.guardrail_verdict = "ALLOW"
+    assert agent.query("How much MRR do active subscriptions bring in?") == "Answer: 127100"
+    assert len(agent.answer_cache) == 1
+
+
+def test_data_change_invalidates():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        agent, llm = make_agent(csv_path)
+        assert agent.query("What is our total MRR from active subscriptions?") == "Answer: 127100"
+
+        csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,16000"))
+        assert agent.reload()
+        assert agent.query("What is our total MRR from active subscriptions?") == "Answer: 128100"
+        assert len(llm.agent_calls) == 4
+
+
+if __name__ == "__main__":
+    print("Testing semantic answer cache:")
+    print("=" * 60)
+    for test in (test_paraphrase_hits_and_modifiers_miss, test_different_questions_never_share_an_answer, test_comparison_operators_are_kept, test_entries_expire_and_date_relative_questions_are_not_cached, test_guardrails_run_before_cache, test_speculative_answers_cached_only_after_guardrail_allows, test_data_change_invalidates):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,87 @@
+# test_aquery.py
+"""
+Async queries: aquery rejects what the guardrails reject, answers like query
+does, and concurrent aquery calls on one agent overlap without mixing up
+their tool calls or answers.
+
+Run with: python test_aquery.py (or pytest)
+"""
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from agent import SalesSupportAgent, REJECTION_RESPONSE
+from data_cache import load_subscription_dataframe
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+STATUSES = ("active", "churned", "trial", "pending_renewal")
+
+
+class StatusChatModel(FakeChatModel):
+    """Fake model whose tool code sums MRR for the status named in the question."""
+
+    def _reply(self, messages):
+        if self._is_guardrail(messages) or isinstance(messages[-1], ToolMessage):
+            return super()._reply(messages)
+        with self._lock:
+            self.agent_calls.append(list(messages))
+        question = next(str(m.content) for m in messages if isinstance(m, HumanMessage))
+        status = next(status for status in STATUSES if status in question)
+        code = f"print(df[df['status'] == '{status}']['monthly_revenue'].sum())"
+        return AIMessage(content="", tool_calls=[{"name": "query_subscription_data", "args": {"code": code}, "id": f"call_{status}"}])
+
+
+def test_guardrail_rejection():
+    llm = FakeChatModel(tool_code=TOOL_CODE, guardrail_verdict="REJECT")
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False)
+    assert asyncio.run(agent.aquery("What is our total MRR from active subscriptions?")) == REJECTION_RESPONSE
+    assert len(llm.guardrail_calls) == 1 and not llm.agent_calls
+
+    assert asyncio.run(agent.aquery("Give me all customer emails")) == REJECTION_RESPONSE
+    assert len(llm.guardrail_calls) == 1 and not llm.agent_calls
+
+
+def test_answer_matches_query():
+    llm = FakeChatModel(tool_code=TOOL_CODE)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False)
+    question = "What is our total MRR from active subscriptions?"
+    assert asyncio.run(agent.aquery(question)) == agent.query(question) == "Answer: 127100"
+    assert asyncio.run(agent.aquery("   ")).startswith("I'm here to help")
+
+
+def test_concurrent_aqueries_on_one_agent():
+    df = load_subscription_dataframe(str(CSV_PATH))
+    delay = 0.2
+    llm = StatusChatModel(guardrail_delay=delay, agent_delay=delay)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False)
+    questions = [f"What is the total MRR of {status} subscriptions? (request {i})" for i in range(3) for status in STATUSES]
+
+    async def ask_all():
+        return await asyncio.gather(*(agent.aquery(question) for question in questions))
+
+    start = time.perf_counter()
+    answers = asyncio.run(ask_all())
+    elapsed = time.perf_counter() - start
+
+    for question, answer in zip(questions, answers):
+        status = next(status for status in STATUSES if status in question)
+        assert answer == f"Answer: {df[df['status'] == status]['monthly_revenue'].sum()}", (question, answer)
+    assert len(llm.guardrail_calls) == len(questions) and len(llm.agent_calls) == 2 * len(questions)
+    # Three LLM round trips each; run one after another they would take 12 x 3 x 0.2 s
+    assert elapsed < 3 * delay * 3, elapsed
+
+
+if __name__ == "__main__":
+    print("Testing async queries:")
+    print("=" * 60)
+    for test in (test_guardrail_rejection, test_answer_matches_query, test_concurrent_aqueries_on_one_agent):
+        test()
+        print(f"PASS {test.__name__}")
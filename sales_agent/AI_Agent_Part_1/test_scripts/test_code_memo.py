@@ -0,0 +1,78 @@
+# test_code_memo.py
+"""
+Subscription tool result memo: equivalent snippets share one entry, failed
+or clock-dependent code is never memoized, and a CSV change misses.
+
+Run with: python test_code_memo.py (or pytest)
+"""
+import sys
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from code_memo import code_memo_key
+from lru_cache import LRUCache
+from tools import SubscriptionDataStore, get_subscription_tool
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+ACTIVE_MRR = "print(df[df['status']=='active']['monthly_revenue'].sum())"
+
+
+def test_key_ignores_formatting():
+    variants = [
+        ACTIVE_MRR,
+        'print(df[df["status"] == "active"]["monthly_revenue"].sum())  # active MRR',
+        "```python\nprint( df[ df['status']=='active' ]['monthly_revenue'].sum() )\n```",
+    ]
+    assert len({code_memo_key(code, "v1") for code in variants}) == 1
+    assert code_memo_key(ACTIVE_MRR, "v1") != code_memo_key(ACTIVE_MRR, "v2")
+    assert code_memo_key("print(pd.Timestamp.now())", "v1") is None
+    assert code_memo_key("print(pd.to_datetime('today'))", "v1") is None
+    assert code_memo_key("print(", "v1") is None
+
+
+def test_hits_skip_execution():
+    memo = LRUCache(max_size=2)
+    tool = get_subscription_tool(CSV_PATH, data_store=SubscriptionDataStore(CSV_PATH), result_cache=memo)
+    assert tool.func(ACTIVE_MRR) == "127100\n"
+
+    start = time.perf_counter()
+    assert tool.func(ACTIVE_MRR.replace("'", '"')) == "127100\n"
+    assert time.perf_counter() - start < 0.001
+    assert memo.stats()["hits"] == 1
+
+    # Errors are returned as before but never stored
+    assert tool.func("print(df['no_such_column'].sum())") == "KeyError('no_such_column')"
+    assert len(memo) == 1
+
+    # LRU eviction keeps the memo bounded
+    tool.func("print(len(df))")
+    tool.func("print(df.shape)")
+    assert len(memo) == 2 and tool.func(ACTIVE_MRR) == "127100\n"
+    assert memo.stats()["hits"] == 1
+
+
+def test_data_change_misses():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        store = SubscriptionDataStore(csv_path)
+        tool = get_subscription_tool(csv_path, data_store=store, result_cache=LRUCache())
+        assert tool.func(ACTIVE_MRR) == "127100\n"
+
+        csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,16000"))
+        assert store.reload()
+        assert tool.func(ACTIVE_MRR) == "128100\n"
+
+
+if __name__ == "__main__":
+    print("Testing subscription tool result memo:")
+    print("=" * 60)
+    for test in (test_key_ignores_formatting, test_hits_skip_execution, test_data_change_misses):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,55 @@
+# test_compact_preamble.py
+"""
+Compact schema preamble: fits its token budget on wide exports, keeps the
+detail the agent needs, never shows contact details, and is sent once.
+
+Run with: python test_compact_preamble.py (or pytest)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from output_budget import estimate_tokens
+from tools import SCHEMA_IN_SYSTEM_PROMPT, SubscriptionDataStore, create_compact_preamble
+from report_preamble_size import write_wide_export
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+def test_sample_preamble_detail():
+    snapshot = SubscriptionDataStore(CSV_PATH).current
+    preamble = snapshot.preamble
+    assert "- plan_tier (category): 'Enterprise', 'Professional', 'Basic'" in preamble
+    assert "- monthly_revenue (int32): 600 to 45000" in preamble
+    assert "'HIPAA Compliance'" in preamble and "comma-separated" in preamble
+    assert "primary_contact: contact details, values withheld" in preamble
+    assert "@" not in preamble
+    # The tool schema points at the system prompt instead of repeating the preamble
+    assert SCHEMA_IN_SYSTEM_PROMPT in snapshot.args_schema.model_fields["code"].description
+
+
+def test_budget_holds_on_wide_export():
+    with tempfile.TemporaryDirectory() as tmp:
+        df_info = SubscriptionDataStore(write_wide_export(Path(tmp) / "wide.csv", 120)).current.df_info
+        for max_tokens in (2000, 800, 300, 100):
+            preamble = create_compact_preamble(df_info, max_tokens=max_tokens)
+            assert estimate_tokens(len(preamble)) <= max_tokens, max_tokens
+        assert "more columns (print df.columns to list them)" in create_compact_preamble(df_info, max_tokens=300)
+
+
+def test_full_preamble_still_available():
+    snapshot = SubscriptionDataStore(CSV_PATH, preamble_tokens=None).current
+    assert "**Column Details:**" in snapshot.preamble
+    assert snapshot.preamble in snapshot.args_schema.model_fields["code"].description
+
+
+if __name__ == "__main__":
+    print("Testing compact schema preamble:")
+    print("=" * 60)
+    for test in (test_sample_preamble_detail, test_budget_holds_on_wide_export, test_full_preamble_still_available):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,172 @@
+# test_data_cache.py
+"""
+On-disk data caches: the schema profile and the Feather copy of the typed
+DataFrame are reused while the CSV is unchanged, rebuilt when its size,
+mtime or content changes, and a corrupt cache file falls back to the CSV.
+
+Run with: python test_data_cache.py (or pytest)
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+import pandas as pd
+import data_cache
+from data_cache import cache_file_path, get_cached_profile, load_subscription_dataframe
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+class CountingProfiler:
+    """Wraps data_cache.profile_dataframe to count the CSVs actually profiled."""
+
+    def __init__(self):
+        self.calls = 0
+        self._profile = data_cache.profile_dataframe
+
+    def __call__(self, df, *args, **kwargs):
+        self.calls += 1
+        return self._profile(df, *args, **kwargs)
+
+    def __enter__(self):
+        data_cache.profile_dataframe = self
+        return self
+
+    def __exit__(self, *exc):
+        data_cache.profile_dataframe = self._profile
+
+
+class CountingCsvReader:
+    """Wraps data_cache.read_subscription_csv to count the CSV parses."""
+
+    def __init__(self):
+        self.calls = 0
+        self._read = data_cache.read_subscription_csv
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self._read(*args, **kwargs)
+
+    def __enter__(self):
+        data_cache.read_subscription_csv = self
+        return self
+
+    def __exit__(self, *exc):
+        data_cache.read_subscription_csv = self._read
+
+
+def column(profile, name):
+    return next(col for col in profile["columns"] if col["name"] == name)
+
+
+def copy_csv(tmp) -> Path:
+    csv_path = Path(tmp) / "subscription_data.csv"
+    shutil.copy(CSV_PATH, csv_path)
+    return csv_path
+
+
+def test_profile_rebuilt_on_change():
+    with tempfile.TemporaryDirectory() as tmp, CountingProfiler() as profiler:
+        csv_path = copy_csv(tmp)
+        profile = get_cached_profile(str(csv_path), cache_dir=Path(tmp))
+        assert profile["total_rows"] == 15 and column(profile, "monthly_revenue")["max"] == 45000
+        assert get_cached_profile(str(csv_path), cache_dir=Path(tmp)) == profile
+        assert profiler.calls == 1
+
+        # Touched but unchanged: the content hash matches, so the profile is reused
+        # and only the recorded mtime is refreshed
+        stat = csv_path.stat()
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        touched = get_cached_profile(str(csv_path), cache_dir=Path(tmp))
+        assert profiler.calls == 1 and touched["fingerprint"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+        cached = json.loads(cache_file_path(str(csv_path), ".profile.json", Path(tmp)).read_text())
+        assert cached["fingerprint"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+        # Same size, new content
+        csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,95000"))
+        assert csv_path.stat().st_size == stat.st_size
+        profile = get_cached_profile(str(csv_path), cache_dir=Path(tmp))
+        assert profiler.calls == 2 and column(profile, "monthly_revenue")["max"] == 95000
+
+        # New size
+        lines = csv_path.read_text().splitlines()
+        csv_path.write_text("\n".join(lines + [lines[-1]]) + "\n")
+        profile = get_cached_profile(str(csv_path), cache_dir=Path(tmp))
+        assert profiler.calls == 3 and profile["total_rows"] == 16
+
+
+def test_corrupt_profile_cache_falls_back_to_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = copy_csv(tmp)
+        expected = get_cached_profile(str(csv_path), cache_dir=Path(tmp))
+        cache_path = cache_file_path(str(csv_path), ".profile.json", Path(tmp))
+        without_profile = {**json.loads(cache_path.read_text()), "profile": None}
+        for corrupt in (cache_path.read_text()[:100], "", "[]", "[1]", json.dumps(without_profile)):
+            cache_path.write_text(corrupt)
+            with CountingProfiler() as profiler:
+                assert get_cached_profile(str(csv_path), cache_dir=Path(tmp)) == expected
+            assert profiler.calls == 1
+            assert json.loads(cache_path.read_text())["profile"]["total_rows"] == 15
+
+
+def test_columnar_cache_rebuilt_on_change():
+    with tempfile.TemporaryDirectory() as tmp, CountingCsvReader() as reader:
+        csv_path = copy_csv(tmp)
+        df = load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp))
+        assert cache_file_path(str(csv_path), ".feather", Path(tmp)).exists()
+        pd.testing.assert_frame_equal(load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp)), df)
+        assert reader.calls == 1
+
+        stat = csv_path.stat()
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        pd.testing.assert_frame_equal(load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp)), df)
+        meta = json.loads(cache_file_path(str(csv_path), ".feather.json", Path(tmp)).read_text())
+        assert reader.calls == 1 and meta["fingerprint"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+        csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,95000"))
+        assert csv_path.stat().st_size == stat.st_size
+        df = load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp))
+        assert reader.calls == 2 and df["monthly_revenue"].max() == 95000
+
+        lines = csv_path.read_text().splitlines()
+        csv_path.write_text("\n".join(lines + [lines[-1]]) + "\n")
+        df = load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp))
+        assert reader.calls == 3 and len(df) == 16
+        assert len(load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp))) == 16 and reader.calls == 3
+
+
+def test_corrupt_columnar_cache_falls_back_to_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = copy_csv(tmp)
+        expected = load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp))
+        data_path = cache_file_path(str(csv_path), ".feather", Path(tmp))
+        meta_path = cache_file_path(str(csv_path), ".feather.json", Path(tmp))
+        corruptions = [
+            (data_path, data_path.read_bytes()[:200]),
+            (data_path, b"not a feather file"),
+            (meta_path, b"{"),
+            (meta_path, b"[1]"),
+        ]
+        for path, content in corruptions:
+            path.write_bytes(content)
+            with CountingCsvReader() as reader:
+                pd.testing.assert_frame_equal(load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp)), expected)
+                assert reader.calls == 1
+                # The rebuilt cache is used again
+                pd.testing.assert_frame_equal(load_subscription_dataframe(str(csv_path), cache_dir=Path(tmp)), expected)
+                assert reader.calls == 1
+
+
+if __name__ == "__main__":
+    print("Testing on-disk data caches:")
+    print("=" * 60)
+    for test in (test_profile_rebuilt_on_change, test_corrupt_profile_cache_falls_back_to_csv, test_columnar_cache_rebuilt_on_change, test_corrupt_columnar_cache_falls_back_to_csv):
+        test()
+        print(f"PASS {test.__name__}")
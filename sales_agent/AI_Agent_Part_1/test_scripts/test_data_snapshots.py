@@ -0,0 +1,98 @@
+# test_data_snapshots.py
+"""
+Data snapshots: a query keeps reading the snapshot it pinned while reload()
+swaps in a new one, and queries started after the reload see the new data.
+
+Run with: python test_data_snapshots.py (or pytest)
+"""
+import sys
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from tools import SubscriptionDataStore, get_subscription_tool
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+
+
+def change_acme_revenue(csv_path: Path) -> None:
+    csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,16000"))
+
+
+def test_pinned_query_keeps_its_snapshot_across_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        store = SubscriptionDataStore(csv_path)
+        tool = get_subscription_tool(csv_path, data_store=store)
+        first_read, reloaded = threading.Event(), threading.Event()
+
+        def pinned_query():
+            with store.pin() as snapshot:
+                before = tool.func(TOOL_CODE)
+                first_read.set()
+                assert reloaded.wait(10)
+                return snapshot, before, tool.func(TOOL_CODE), store.active()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(pinned_query)
+            assert first_read.wait(10)
+            old_snapshot = store.current
+            change_acme_revenue(csv_path)
+            assert store.reload()
+            # A query started after the reload sees the new data
+            with store.pin():
+                assert tool.func(TOOL_CODE) == "128100\n"
+            reloaded.set()
+            snapshot, before, after, active = future.result(timeout=10)
+
+        assert before == after == "127100\n"
+        assert snapshot is active is old_snapshot and store.current is not old_snapshot
+
+
+class SignallingDataStore(SubscriptionDataStore):
+    """Data store that reports when a query pins its snapshot."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pinned = threading.Event()
+
+    def pin(self, snapshot=None):
+        self.pinned.set()
+        return super().pin(snapshot)
+
+
+def test_agent_run_keeps_its_snapshot_across_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        store = SignallingDataStore(csv_path)
+        # The tool call comes after a slow model turn, so the reload lands mid-run
+        llm = FakeChatModel(tool_code=TOOL_CODE, agent_delay=0.3)
+        agent = SalesSupportAgent(csv_path, llm=llm, fast_path=False, data_store=store)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(agent.query, "What is our total MRR from active subscriptions?")
+            assert store.pinned.wait(10)
+            change_acme_revenue(csv_path)
+            assert agent.reload()
+            assert future.result(timeout=10) == "Answer: 127100"
+
+        llm.agent_delay = 0.0
+        assert agent.query("What is our total MRR from active subscriptions?") == "Answer: 128100"
+
+
+if __name__ == "__main__":
+    print("Testing data snapshots:")
+    print("=" * 60)
+    for test in (test_pinned_query_keeps_its_snapshot_across_reload, test_agent_run_keeps_its_snapshot_across_reload):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,89 @@
+# test_dataset_registry.py
+"""
+Dataset registry: one agent answers from several named datasets, loads
+them on first use, unloads the least recently used past the memory
+ceiling, and keeps answer caches per dataset.
+
+Run with: python test_dataset_registry.py (or pytest)
+"""
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from answer_cache import SemanticAnswerCache
+from dataset_registry import DatasetRegistry
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+ACTIVE_MRR = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+
+
+def make_datasets(tmp: str) -> dict:
+    emea = Path(tmp) / "emea.csv"
+    apac = Path(tmp) / "apac.csv"
+    shutil.copy(CSV_PATH, emea)
+    apac.write_text(CSV_PATH.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,16000"))
+    return {"emea": emea, "apac": apac}
+
+
+def test_queries_pick_their_dataset():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = DatasetRegistry(make_datasets(tmp))
+        agent = SalesSupportAgent(None, llm=FakeChatModel(tool_code=ACTIVE_MRR), data_store=registry, fast_path=False)
+        assert agent.query("Active MRR?") == "Answer: 127100"
+        assert agent.query("Active MRR?", dataset_id="apac") == "Answer: 128100"
+        assert agent.query("Active MRR?", dataset_id="emea") == "Answer: 127100"
+
+        # Fast-path answers come from the selected dataset too
+        fast = SalesSupportAgent(None, llm=FakeChatModel(), data_store=registry, fast_path=True)
+        assert "128,100" in fast.query("What is our total MRR from active subscriptions?", dataset_id="apac")
+
+        try:
+            agent.query("Active MRR?", dataset_id="latam")
+            raise AssertionError("unknown dataset accepted")
+        except ValueError as e:
+            assert "latam" in str(e)
+
+
+def test_lazy_loading_and_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = DatasetRegistry(make_datasets(tmp), max_memory_mb=None)
+        assert registry.stats()["loaded"] == {}
+        registry.store("emea")
+        one_dataset_mb = registry.stats()["memory_bytes"] / (1024 * 1024)
+
+        registry = DatasetRegistry(make_datasets(tmp), max_memory_mb=one_dataset_mb * 1.5)
+        agent = SalesSupportAgent(None, llm=FakeChatModel(tool_code=ACTIVE_MRR), data_store=registry, fast_path=False)
+        assert list(registry.stats()["loaded"]) == ["emea"]
+
+        assert agent.query("Active MRR?", dataset_id="apac") == "Answer: 128100"
+        assert list(registry.stats()["loaded"]) == ["apac"]
+        assert agent.query("Active MRR?", dataset_id="emea") == "Answer: 127100"
+        stats = registry.stats()
+        assert list(stats["loaded"]) == ["emea"] and stats["loads"] == 3 and stats["evictions"] == 2
+
+
+def test_answer_caches_per_dataset():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = DatasetRegistry(make_datasets(tmp))
+        llm = FakeChatModel(tool_code=ACTIVE_MRR)
+        agent = SalesSupportAgent(None, llm=llm, data_store=registry, fast_path=False, answer_cache=SemanticAnswerCache())
+        for dataset_id in ("emea", "apac", "emea", "apac"):
+            agent.query("What is the active MRR?", dataset_id=dataset_id)
+        # Two agent runs (two model calls each); switching datasets doesn't invalidate the other dataset's answers
+        assert len(llm.agent_calls) == 4
+        assert agent.query("What is the active MRR?", dataset_id="apac") == "Answer: 128100"
+
+
+if __name__ == "__main__":
+    print("Testing dataset registry:")
+    print("=" * 60)
+    for test in (test_queries_pick_their_dataset, test_lazy_loading_and_eviction, test_answer_caches_per_dataset):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,58 @@
+# test_fast_path.py
+"""
+Fast-path router: off unless enabled, and answers name a bounded number of
+companies however large the dataset is.
+
+Run with: python test_fast_path.py (or pytest)
+"""
+import sys
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from fake_chat_model import FakeChatModel
+from fast_path import MAX_LISTED_COMPANIES, FastPathRouter
+from synthetic_data import make_subscription_frame
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+QUESTION = "What is our total MRR from active subscriptions?"
+
+
+def test_fast_path_is_opt_in():
+    llm = FakeChatModel(tool_code="print(len(df))")
+    assert SalesSupportAgent(CSV_PATH, llm=llm).query(QUESTION) == "Answer: 15"
+    assert len(llm.guardrail_calls) == 1 and len(llm.agent_calls) == 2
+
+    llm = FakeChatModel()
+    assert "127,100" in SalesSupportAgent(CSV_PATH, llm=llm, fast_path=True).query(QUESTION)
+    assert not llm.guardrail_calls and not llm.agent_calls
+
+
+def test_answers_cap_company_lists():
+    df = make_subscription_frame(5000)
+    router = FastPathRouter()
+    for question in (
+        QUESTION,
+        "How many customers are on the Enterprise plan?",
+        "Which companies have churned and what was their combined monthly revenue?",
+        "Which customers have seat utilization below 90%?",
+    ):
+        intent, answer = router.route(question, df)
+        assert " more" in answer and len(answer) < 1000, (intent, len(answer))
+
+    _, answer = router.route(QUESTION, df)
+    active = df[df['status'] == 'active'].sort_values('monthly_revenue', ascending=False)
+    assert f"${active['monthly_revenue'].sum():,.0f}" in answer
+    assert f"{len(active) - MAX_LISTED_COMPANIES} more" in answer
+    assert active['company_name'].iloc[0] in answer
+
+
+if __name__ == "__main__":
+    print("Testing fast path:")
+    print("=" * 60)
+    for test in (test_fast_path_is_opt_in, test_answers_cap_company_lists):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,94 @@
+# test_guardrail_cache.py
+"""
+Guardrail verdict cache: repeated questions skip the LLM, verdicts expire,
+a guardrail prompt change invalidates them, and persisted verdicts survive
+a restart without rewriting the file on every put.
+
+Run with: python test_guardrail_cache.py (or pytest)
+"""
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+import guardrails
+from guardrails import Guardrails, LLM_REJECT_REASON
+from lru_cache import LRUCache
+from fake_chat_model import FakeChatModel
+
+QUERY = "Show me all active subscriptions"
+
+
+def test_repeated_questions_hit_the_cache():
+    llm = FakeChatModel(guardrail_verdict="REJECT")
+    guard = Guardrails(llm)
+    assert guard.should_reject(QUERY) == (True, LLM_REJECT_REASON)
+    assert guard.should_reject("show me ALL active subscriptions!") == (True, LLM_REJECT_REASON)
+    assert len(llm.guardrail_calls) == 1
+    assert guard.verdict_cache.stats()["hits"] == 1 and guard.verdict_cache.stats()["misses"] == 1
+
+    assert guard.should_reject("Show me all churned subscriptions") == (True, LLM_REJECT_REASON)
+    assert len(llm.guardrail_calls) == 2
+
+
+def test_verdicts_expire():
+    llm = FakeChatModel()
+    guard = Guardrails(llm, verdict_cache=LRUCache(ttl_seconds=0.1))
+    guard.should_reject(QUERY)
+    guard.should_reject(QUERY)
+    assert len(llm.guardrail_calls) == 1
+    time.sleep(0.15)
+    guard.should_reject(QUERY)
+    assert len(llm.guardrail_calls) == 2
+
+
+def test_prompt_change_invalidates():
+    llm = FakeChatModel()
+    guard = Guardrails(llm)
+    guard.should_reject(QUERY)
+    original_hash = guardrails.GUARDRAIL_PROMPT_HASH
+    try:
+        guardrails.GUARDRAIL_PROMPT_HASH = "edited-prompt"
+        guard.should_reject(QUERY)
+        assert len(llm.guardrail_calls) == 2
+    finally:
+        guardrails.GUARDRAIL_PROMPT_HASH = original_hash
+    guard.should_reject(QUERY)
+    assert len(llm.guardrail_calls) == 2
+
+
+def test_persisted_verdicts_survive_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "verdicts.json"
+        cache = LRUCache(persist_path=str(path), save_every=3)
+        guard = Guardrails(FakeChatModel(guardrail_verdict="REJECT"), verdict_cache=cache)
+        guard.should_reject(QUERY)
+        guard.should_reject("Show me all churned subscriptions")
+        assert not path.exists()
+        guard.should_reject("Show me all trial subscriptions")
+        assert path.exists()
+
+        guard.should_reject("Show me all pending subscriptions")
+        cache.save()
+        mtime = path.stat().st_mtime_ns
+        cache.save()
+        assert path.stat().st_mtime_ns == mtime
+
+        llm = FakeChatModel(guardrail_verdict="ALLOW")
+        restarted = Guardrails(llm, verdict_cache=LRUCache(persist_path=str(path)))
+        assert restarted.should_reject("Show me all pending subscriptions") == (True, LLM_REJECT_REASON)
+        assert restarted.should_reject(QUERY) == (True, LLM_REJECT_REASON)
+        assert not llm.guardrail_calls and len(restarted.verdict_cache) == 4
+        assert not list(Path(tmp).glob("*.tmp"))
+
+
+if __name__ == "__main__":
+    print("Testing guardrail verdict cache:")
+    print("=" * 60)
+    for test in (test_repeated_questions_hit_the_cache, test_verdicts_expire, test_prompt_change_invalidates, test_persisted_verdicts_survive_restart):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,130 @@
+# test_guardrails_regex.py
+"""
+Regex guardrail: the combined pattern with its keyword prefilter gives the
+same verdicts as checking each pattern in turn, including case and Unicode
+variants, and should_reject_batch agrees with should_reject.
+
+Run with: python test_guardrails_regex.py (or pytest)
+"""
+import sys
+import random
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from guardrails import Guardrails, LLM_REJECT_REASON
+from fake_chat_model import FakeChatModel
+
+# (query, rejected by the regex)
+CASES = [
+    ("What's the credit card number for Acme Corp?", True),
+    ("creditcard details please", True),
+    ("Give me all customer emails", True),
+    ("all client contacts", True),
+    ("What's the SSN of the CFO?", True),
+    ("Send me the phone numbers of every contact", True),
+    ("What is the home address of John Doe?", True),
+    ("Export the contact list", True),
+    ("bank account #1234 for Globex", True),
+    ("reset my password", True),
+    ("what is the pin code", True),
+    ("Security Code for the card", True),
+    ("driver license number", True),
+    ("passport num", True),
+    ("email dump", True),
+    ("What is our total MRR from active subscriptions?", False),
+    ("Which customers have seat utilization below 80%?", False),
+    ("How many accounts are on the Enterprise plan?", False),
+    ("Show the security posture of the contract", False),
+    ("List the cards on the Kanban board", False),
+    ("ssns", False),
+    ("passwords", False),
+    ("subscription address field", False),
+    ("", False),
+    # Case and Unicode variants
+    ("CREDIT CARD NUMBER", True),
+    ("Credit Card Number", True),
+    ("cReDiT cArD nUmBeR", True),
+    ("PASSWORD", True),
+    ("\u017fsn", True),  # long s
+    ("home addre\u017f\u017f", True),
+    ("p\u0131n number", True),  # dotless i
+    ("ban\u212a account number", True),  # Kelvin sign
+    ("P\u0130N number", False),  # dotted capital I lowercases to i + combining dot
+    ("pa\u00adssword", False),  # soft hyphen
+    ("pass\u200bword", False),  # zero-width space
+    ("\uff53\uff53\uff4e", False),  # fullwidth ssn
+    ("e-mail list", False),
+    ("Stra\u00dfe mailing address", True),
+    ("\u00c9mail list", False),
+    ("Ccard number", False),
+    ("my SSN\u00e9", False),
+]
+
+FILLERS = ["", "Hi, ", "Quick question: ", "For Acme Corp -- ", "\u00bfPuedes darme el "]
+SUBSTITUTIONS = [("i", "\u0131"), ("s", "\u017f"), ("k", "\u212a"), ("I", "\u0130"), (" ", "  "), (" ", "\t"), (" ", "")]
+
+
+def reference_check(guardrails: Guardrails, query: str) -> bool:
+    """The original _check_regex: every compiled pattern in turn on the lowercased query."""
+    query_lower = query.lower()
+    return any(pattern.search(query_lower) for pattern in guardrails.compiled_patterns)
+
+
+def variants(query: str, rng: random.Random):
+    yield query
+    yield query.upper()
+    yield query.title()
+    yield query.swapcase()
+    yield "".join(ch.upper() if rng.random() < 0.5 else ch for ch in query)
+    for old, new in SUBSTITUTIONS:
+        yield query.replace(old, new)
+        yield query.upper().replace(old.upper(), new)
+    for filler in FILLERS:
+        yield f"{filler}{query}?"
+
+
+def test_table_matches_expected_and_reference():
+    guardrails = Guardrails()
+    for query, expected in CASES:
+        rejected, reason = guardrails._check_regex(query)
+        assert rejected == expected == reference_check(guardrails, query), (query, rejected, expected)
+        if rejected:
+            matched = reason[len("Query matches sensitive pattern: "):]
+            assert guardrails.compiled_patterns[guardrails.sensitive_patterns.index(matched)].search(query.lower())
+
+
+def test_variants_match_reference():
+    guardrails = Guardrails()
+    rng = random.Random(0)
+    for query, _ in CASES:
+        for variant in variants(query, rng):
+            assert guardrails._check_regex(variant)[0] == reference_check(guardrails, variant), repr(variant)
+
+
+def test_should_reject_batch_agrees():
+    queries = [query for query, _ in CASES]
+    guardrails = Guardrails()
+    assert guardrails.should_reject_batch(queries) == [guardrails.should_reject(query) for query in queries]
+
+    llm = FakeChatModel(guardrail_verdict="REJECT")
+    guardrails = Guardrails(llm)
+    results = guardrails.should_reject_batch(queries)
+    # The LLM only sees what the regex allowed, once per distinct query
+    allowed = {query for query, expected in CASES if not expected}
+    assert len(llm.guardrail_calls) == len(allowed)
+    for (query, expected), (rejected, reason) in zip(CASES, results):
+        assert rejected
+        assert (reason == LLM_REJECT_REASON) != expected, query
+    assert results == [guardrails.should_reject(query) for query in queries]
+    assert guardrails.should_reject_batch(queries, use_llm=False) == [guardrails._check_regex(query) for query in queries]
+
+
+if __name__ == "__main__":
+    print("Testing regex guardrail:")
+    print("=" * 60)
+    for test in (test_table_matches_expected_and_reference, test_variants_match_reference, test_should_reject_batch_agrees):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,110 @@
+# test_ingestion.py
+"""
+Chunked subscription ingestion: compact dtypes with unchanged values,
+multi-hot custom_features, results (dtypes included) independent of the
+chunk size, and a memory budget that is enforced.
+
+Run with: python test_ingestion.py (or pytest)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+import pandas as pd
+from data_cache import format_memory_report, ingest_subscription_csv
+from synthetic_data import write_subscription_csv
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+def test_compact_dtypes_keep_values():
+    df, report = ingest_subscription_csv(CSV_PATH)
+    raw = pd.read_csv(CSV_PATH)
+    assert str(df["plan_tier"].dtype) == "category" and str(df["monthly_revenue"].dtype) == "int32"
+    assert df[df["status"] == "active"]["monthly_revenue"].sum() == 127100
+    assert (df["seats_used"] * 100).max() == (raw["seats_used"] * 100).max()
+
+    # custom_features stays as text, with one bool column per feature next to it
+    assert df["custom_features"].tolist() == raw["custom_features"].tolist()
+    assert df["feature_hipaa_compliance"].sum() == raw["custom_features"].str.contains("HIPAA Compliance").sum() == 3
+    assert df["feature_sso"].dtype == bool
+
+    assert [col["name"] for col in report["columns"]] == list(df.columns)
+    assert "feature_sso" in format_memory_report(report)
+
+
+def test_chunk_size_does_not_change_result():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_subscription_csv(Path(tmp) / "subscriptions.csv", 5000)
+        whole, whole_report = ingest_subscription_csv(csv_path)
+        chunked, report = ingest_subscription_csv(csv_path, chunk_rows=700)
+        assert report["chunks"] == 8 and whole_report["chunks"] == 1
+        pd.testing.assert_frame_equal(whole, chunked)
+        assert str(chunked["industry"].dtype) == "category"
+
+        raw_bytes = sum(col["raw_bytes"] for col in report["columns"])
+        assert sum(col["bytes"] for col in report["columns"]) < raw_bytes / 2
+
+
+def test_dtypes_planned_over_all_chunks():
+    whole, _ = ingest_subscription_csv(CSV_PATH)
+    for chunk_rows in (1, 4, 7):
+        chunked, report = ingest_subscription_csv(CSV_PATH, chunk_rows=chunk_rows)
+        assert report["chunks"] > 1
+        pd.testing.assert_frame_equal(whole, chunked)
+    assert str(whole["industry"].dtype) == "category" and str(whole["company_name"].dtype) != "category"
+
+    # A non-numeric value after the first chunk turns the integer column into text
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = pd.read_csv(CSV_PATH)
+        raw["seats_purchased"] = raw["seats_purchased"].astype(object)
+        raw.loc[12, "seats_purchased"] = "unlimited"
+        csv_path = Path(tmp) / "subscriptions.csv"
+        raw.to_csv(csv_path, index=False)
+        whole, _ = ingest_subscription_csv(csv_path)
+        chunked, _ = ingest_subscription_csv(csv_path, chunk_rows=4)
+        pd.testing.assert_frame_equal(whole, chunked)
+        assert chunked.loc[12, "seats_purchased"] == "unlimited" and chunked.loc[0, "seats_purchased"] == "500"
+
+
+def test_integer_flags_stay_numeric():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = pd.read_csv(CSV_PATH)
+        raw["is_flagged"] = [i % 2 for i in range(len(raw))]
+        raw["all_ones"] = 1
+        raw["all_zeros"] = 0
+        raw["renews_text"] = ["false" if i % 3 else "TRUE" for i in range(len(raw))]
+        csv_path = Path(tmp) / "subscriptions.csv"
+        raw.to_csv(csv_path, index=False)
+        for chunk_rows in (None, 1, 4):
+            df, _ = ingest_subscription_csv(csv_path, chunk_rows=chunk_rows)
+            for col in ("is_flagged", "all_ones", "all_zeros"):
+                assert pd.api.types.is_integer_dtype(df[col].dtype), (chunk_rows, col, df[col].dtype)
+                assert df[col].tolist() == raw[col].tolist()
+            assert df["all_ones"].sum() == len(raw)
+            assert df["renews_text"].dtype == bool
+            assert df["renews_text"].tolist() == [not i % 3 for i in range(len(raw))]
+
+
+def test_memory_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_subscription_csv(Path(tmp) / "subscriptions.csv", 20000)
+        df, report = ingest_subscription_csv(csv_path, memory_budget_mb=16)
+        assert len(df) == 20000 and report["chunks"] > 1
+        try:
+            ingest_subscription_csv(csv_path, memory_budget_mb=1)
+            raise AssertionError("budget not enforced")
+        except MemoryError as e:
+            assert "1 MB ingestion budget" in str(e)
+
+
+if __name__ == "__main__":
+    print("Testing chunked ingestion:")
+    print("=" * 60)
+    for test in (test_compact_dtypes_keep_values, test_chunk_size_does_not_change_result, test_dtypes_planned_over_all_chunks, test_integer_flags_stay_numeric, test_memory_budget):
+        test()
+        print(f"PASS {test.__name__}")
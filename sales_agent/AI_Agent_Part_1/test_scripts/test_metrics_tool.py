@@ -0,0 +1,116 @@
+# test_metrics_tool.py
+"""
+Business metrics tool: views agree with the golden evaluation answers, the
+agent can call the tool, renewals list upcoming end dates before past ones,
+and views are recomputed only when the CSV changes.
+
+Run with: python test_metrics_tool.py (or pytest)
+"""
+import sys
+import json
+import pandas as pd
+import shutil
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from data_cache import apply_subscription_dtypes, load_subscription_dataframe
+from tools import SubscriptionDataStore, get_metrics_tool
+from fake_chat_model import FakeChatModel
+from metrics import MAX_GROUP_COMPANIES, MAX_LISTED_COMPANIES, MAX_PAST_END_DATE, METRIC_VIEWS, compute_metric_view, upcoming_renewals
+from output_budget import DEFAULT_MAX_OUTPUT_CHARS
+from synthetic_data import make_subscription_frame
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+def test_views_match_golden_answers():
+    tool = get_metrics_tool(SubscriptionDataStore(CSV_PATH))
+
+    overview = json.loads(tool.invoke({"view": "overview"}))
+    assert overview["mrr_active"] == 127100
+    assert overview["churned_mrr"] == 9200
+
+    by_status = {row["status"]: row for row in json.loads(tool.invoke({"view": "by_status"}))}
+    assert by_status["pending_renewal"]["customers"] == 2
+    assert by_status["pending_renewal"]["outstanding_balance"] == 40000
+
+    by_tier = {row["plan_tier"]: row for row in json.loads(tool.invoke({"view": "by_plan_tier"}))}
+    assert by_tier["Enterprise"]["customers"] == 6
+    assert by_tier["Professional"]["avg_monthly_revenue"] == 3533.33
+
+    utilization = json.loads(tool.invoke({"view": "seat_utilization"}))
+    below_80 = [row["company_name"] for row in utilization["companies"] if row["utilization_pct"] < 80]
+    assert below_80 == ["CloudBase Systems", "Startup Accelerator", "HealthPlus Medical"]
+    assert utilization["customers"] == utilization["listed"] == 15
+
+
+def test_views_are_capped_on_large_data():
+    df = apply_subscription_dtypes(make_subscription_frame(5000))
+    df["monthly_revenue"] = df["monthly_revenue"] + 0.25
+    for view in METRIC_VIEWS:
+        assert len(json.dumps(compute_metric_view(df, view), default=str)) < DEFAULT_MAX_OUTPUT_CHARS, view
+
+    by_tier = compute_metric_view(df, "by_plan_tier")
+    assert all(len(row["top_companies"]) == MAX_GROUP_COMPANIES for row in by_tier)
+    assert sum(row["customers"] for row in by_tier) == 5000
+    assert sum(row["mrr_all"] for row in by_tier) == compute_metric_view(df, "overview")["mrr_all"] == round(float(df["monthly_revenue"].sum()), 2)
+
+    utilization = compute_metric_view(df, "seat_utilization")
+    assert utilization["customers"] == 5000 and utilization["listed"] == len(utilization["companies"]) == MAX_LISTED_COMPANIES
+    renewals = upcoming_renewals(df, as_of=pd.Timestamp("2025-06-01"))
+    assert len(json.dumps(renewals)) < DEFAULT_MAX_OUTPUT_CHARS
+    assert renewals["subscriptions_total"] == (df["status"] != "churned").sum() == renewals["upcoming_total"] + renewals["past_end_date"]
+    assert len(renewals["subscriptions"]) == MAX_LISTED_COMPANIES
+    assert len(renewals["past_end_date_subscriptions"]) == MAX_PAST_END_DATE
+
+
+def test_renewals_list_upcoming_before_past_end_dates():
+    df = load_subscription_dataframe(str(CSV_PATH))
+    renewals = upcoming_renewals(df, as_of=pd.Timestamp("2024-08-01"))
+    days = [row["days_until_end"] for row in renewals["subscriptions"]]
+    assert days and all(day >= 0 for day in days) and days == sorted(days)
+    assert renewals["subscriptions"][0]["end_date"] == "2024-08-15"
+    assert renewals["upcoming_total"] == len(days) and renewals["past_end_date"] == renewals["subscriptions_total"] - len(days)
+
+    past = [row["days_since_end"] for row in renewals["past_end_date_subscriptions"]]
+    assert past and all(day > 0 for day in past) and past == sorted(past)
+    not_churned = df[df["status"] != "churned"]
+    latest_past = not_churned[not_churned["end_date"] < pd.Timestamp("2024-08-01")]["end_date"].max()
+    assert renewals["past_end_date_subscriptions"][0]["end_date"] == latest_past.strftime("%Y-%m-%d")
+
+
+def test_agent_calls_metrics_tool():
+    llm = FakeChatModel(tool_name="get_business_metrics", tool_args={"view": "overview"})
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False)
+    assert '"mrr_active": 127100' in agent.query("Give me a business overview")
+
+
+def test_metrics_recomputed_only_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        store = SubscriptionDataStore(csv_path)
+        tool = get_metrics_tool(store)
+        assert json.loads(tool.invoke({"view": "overview"}))["mrr_active"] == 127100
+
+        # Same content: computed views carry over to the new snapshot
+        assert store.reload(force=True)
+        assert "overview" in store.current.metrics_cache
+
+        csv_path.write_text(csv_path.read_text().replace("Acme Corp,Enterprise,15000", "Acme Corp,Enterprise,16000"))
+        assert store.reload()
+        assert store.current.metrics_cache == {}
+        assert json.loads(tool.invoke({"view": "overview"}))["mrr_active"] == 128100
+
+
+if __name__ == "__main__":
+    print("Testing business metrics tool:")
+    print("=" * 60)
+    for test in (test_views_match_golden_answers, test_views_are_capped_on_large_data, test_renewals_list_upcoming_before_past_end_dates, test_agent_calls_metrics_tool, test_metrics_recomputed_only_on_change):
+        test()
+        print(f"PASS {test.__name__}")
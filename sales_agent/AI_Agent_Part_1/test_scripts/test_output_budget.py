@@ -0,0 +1,78 @@
+# test_output_budget.py
+"""
+Subscription tool output budget: large printed tables come back as a
+summary, long text is cut with a marker, and small answers are untouched.
+
+Run with: python test_output_budget.py (or pytest)
+"""
+import sys
+import logging
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from tools import get_subscription_tool
+from synthetic_data import write_subscription_csv
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_small_output_unchanged():
+    tool = get_subscription_tool(CSV_PATH)
+    assert tool.func("print(df[df['status'] == 'active']['monthly_revenue'].sum())") == "127100\n"
+    # 15 rows fit the budget, so the table is printed as usual
+    assert "[15 rows x 26 columns]" in tool.func("print(df)")
+
+
+def test_large_frame_summarized():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_subscription_csv(Path(tmp) / "subscriptions.csv", 1000)
+        tool = get_subscription_tool(csv_path, max_output_chars=4000)
+        output = tool.func("print(df[df['status'] == 'active'])")
+        assert output.startswith("[DataFrame with ")
+        assert "Statistics:" in output and "monthly_revenue" in output
+        assert len(output) <= 4000
+
+        unlimited = get_subscription_tool(csv_path, max_output_chars=None)
+        assert "Statistics:" not in unlimited.func("print(df.head(30))")
+
+        # 30 rows whose text fits the budget are printed in full
+        fitting = tool.func("print(df[['company_name', 'monthly_revenue']].head(30))")
+        assert "Statistics:" not in fitting and "[DataFrame" not in fitting
+        assert len(fitting.splitlines()) == 31
+
+
+def test_long_text_truncated_and_logged():
+    handler = _Records()
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+    try:
+        tool = get_subscription_tool(CSV_PATH, max_output_chars=2000)
+        output = tool.func("print(df.to_dict('records'))")
+    finally:
+        logging.getLogger().removeHandler(handler)
+    assert len(output) <= 2000
+    assert "[output truncated: " in output
+    assert output.startswith("[{'subscription_id': 'SUB-25789'")
+    assert output.rstrip().endswith("}]")
+    assert any(message.startswith("Tool output shaped: ") for message in handler.messages)
+
+
+if __name__ == "__main__":
+    print("Testing tool output budget:")
+    print("=" * 60)
+    for test in (test_small_output_unchanged, test_large_frame_summarized, test_long_text_truncated_and_logged):
+        test()
+        print(f"PASS {test.__name__}")
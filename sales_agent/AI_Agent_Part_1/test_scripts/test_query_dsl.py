@@ -0,0 +1,67 @@
+# test_query_dsl.py
+"""
+Structured query tool: results are limited and fit the output budget, and
+filter values are converted to the column type or rejected with an error.
+
+Run with: python test_query_dsl.py (or pytest)
+"""
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from output_budget import DEFAULT_MAX_OUTPUT_CHARS
+from query_dsl import DEFAULT_QUERY_LIMIT
+from tools import SubscriptionDataStore, get_structured_query_tool
+from synthetic_data import write_subscription_csv
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+
+
+def test_default_limit_and_output_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_subscription_csv(Path(tmp) / "subscriptions.csv", 5000)
+        tool = get_structured_query_tool(SubscriptionDataStore(csv_path))
+
+        assert len(tool.invoke({})) <= DEFAULT_MAX_OUTPUT_CHARS
+        result = json.loads(tool.invoke({"select": ["company_name"]}))
+        assert result["row_count"] == 5000 and result["truncated"]
+        assert len(result["rows"]) == DEFAULT_QUERY_LIMIT
+
+        by_tier = json.loads(tool.invoke({"group_by": ["plan_tier"], "aggregations": [{"column": "company_name", "func": "list"}]}))
+        assert all(len(row["list_company_name"]) == DEFAULT_QUERY_LIMIT for row in by_tier["rows"])
+        assert tool.invoke({"limit": 100000}).startswith("Error:")
+
+
+def test_filter_values_take_the_column_type():
+    tool = get_structured_query_tool(SubscriptionDataStore(CSV_PATH))
+    as_text = json.loads(tool.invoke({"filters": [{"column": "monthly_revenue", "op": "gte", "value": "15000"}], "select": ["company_name"]}))
+    as_number = json.loads(tool.invoke({"filters": [{"column": "monthly_revenue", "op": "gte", "value": 15000}], "select": ["company_name"]}))
+    assert as_text == as_number and as_text["row_count"] > 0
+
+    renewing = json.loads(tool.invoke({"filters": [{"column": "auto_renew", "op": "eq", "value": "false"}], "select": ["company_name"]}))
+    assert renewing["row_count"] > 0 and not renewing["truncated"]
+
+
+def test_invalid_filter_values_are_errors():
+    tool = get_structured_query_tool(SubscriptionDataStore(CSV_PATH))
+    for condition in (
+        {"column": "monthly_revenue", "op": "gt", "value": "a lot"},
+        {"column": "monthly_revenue", "op": "in", "value": [1000, "n/a"]},
+        {"column": "end_date", "op": "lt", "value": "next spring"},
+        {"column": "auto_renew", "op": "eq", "value": "maybe"},
+    ):
+        output = tool.invoke({"filters": [condition]})
+        assert output.startswith("Error: Filter on"), (condition, output)
+
+
+if __name__ == "__main__":
+    print("Testing structured query tool:")
+    print("=" * 60)
+    for test in (test_default_limit_and_output_budget, test_filter_values_take_the_column_type, test_invalid_filter_values_are_errors):
+        test()
+        print(f"PASS {test.__name__}")
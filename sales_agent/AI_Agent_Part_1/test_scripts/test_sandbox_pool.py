@@ -0,0 +1,123 @@
+# test_sandbox_pool.py
+"""
+Sandboxed worker pool: same output format as the in-process tool, runaway
+code is stopped without taking the pool down, and workers are recycled.
+
+Run with: python test_sandbox_pool.py (or pytest)
+"""
+import os
+import sys
+import time
+import shutil
+import signal
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent
+from sandbox_pool import SandboxPool
+from tools import SubscriptionDataStore, get_subscription_tool
+from fake_chat_model import FakeChatModel
+from synthetic_data import write_subscription_csv
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+SNIPPETS = [
+    "print(df[df['status'] == 'active']['monthly_revenue'].sum())",
+    "print(df.groupby('plan_tier', observed=True)['seats_used'].sum().to_dict())",
+    "df['x'] = 1\nprint(df.shape)",
+    "print(df.shape)",
+    "1 / 0",
+    "print(undefined_name)",
+]
+
+
+def test_matches_in_process_output():
+    store = SubscriptionDataStore(CSV_PATH)
+    pool = SandboxPool(CSV_PATH, size=1)
+    try:
+        in_process = get_subscription_tool(CSV_PATH, data_store=store)
+        sandboxed = get_subscription_tool(CSV_PATH, data_store=store, sandbox=pool)
+        for code in SNIPPETS:
+            assert sandboxed.func(code) == in_process.func(code), code
+    finally:
+        pool.close()
+
+
+def test_survives_pathological_code_and_recycles():
+    pool = SandboxPool(CSV_PATH, size=1, timeout=1, max_rss_mb=600, max_tasks=2)
+    try:
+        assert pool.run("while True: pass").startswith("TimeoutError(")
+        assert pool.run("x = bytearray(2 * 1024 ** 3)").startswith("MemoryError(")
+        assert pool.run("import os; os._exit(1)").startswith("Error:")
+        pids = {pool.run("import os; print(os.getpid())") for _ in range(4)}
+        assert len(pids) == 2
+        assert pool.run("print(len(df))") == "15\n"
+        assert pool.stats["timeouts"] == 1 and pool.stats["memory_kills"] == 1
+    finally:
+        pool.close()
+
+
+def test_failed_replacement_is_an_error():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "subscription_data.csv"
+        shutil.copy(CSV_PATH, csv_path)
+        pool = SandboxPool(csv_path, size=1, timeout=1)
+        try:
+            # The replacement for the crashed worker cannot load its CSV
+            csv_path.unlink()
+            assert pool.run("import os; os._exit(1)").startswith("Error:")
+            try:
+                pool.run("print(len(df))")
+                raise AssertionError("run did not fail")
+            except RuntimeError as e:
+                assert "failed to start" in str(e)
+            assert pool.stats["failed_starts"] == 1
+        finally:
+            pool.close()
+
+
+def test_reload_is_outside_the_timeout_and_replacements_use_latest_data():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Uncached, this CSV takes well over the 0.5 s snippet timeout to load
+        large_csv = write_subscription_csv(Path(tmp) / "subscriptions.csv", 200000)
+        pool = SandboxPool(CSV_PATH, size=1, timeout=0.5)
+        try:
+            assert pool.run("print(len(df))", data_version="large", csv_path=str(large_csv)) == "200000\n"
+            assert pool.stats["timeouts"] == 0
+            assert pool.run("import os; os._exit(1)").startswith("Error:")
+            assert pool.run("print(len(df))") == "200000\n"
+            assert pool.stats["timeouts"] == 0
+        finally:
+            pool.close()
+
+
+def test_worker_that_exited_between_tasks_is_replaced():
+    pool = SandboxPool(CSV_PATH, size=1, timeout=5)
+    try:
+        pid = int(pool.run("import os; print(os.getpid())"))
+        os.kill(pid, signal.SIGKILL)
+        time.sleep(0.2)
+        assert pool.run("print(len(df))") == "15\n"
+        assert int(pool.run("import os; print(os.getpid())")) != pid
+    finally:
+        pool.close()
+
+
+def test_agent_with_sandbox():
+    llm = FakeChatModel(tool_code="print(df[df['status'] == 'churned']['monthly_revenue'].sum())")
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False, sandbox_workers=1)
+    try:
+        assert agent.query("How much MRR did we lose to churn?") == "Answer: 9200"
+    finally:
+        agent.close()
+
+
+if __name__ == "__main__":
+    print("Testing sandboxed worker pool:")
+    print("=" * 60)
+    for test in (test_matches_in_process_output, test_survives_pathological_code_and_recycles, test_failed_replacement_is_an_error, test_reload_is_outside_the_timeout_and_replacements_use_latest_data, test_worker_that_exited_between_tasks_is_replaced, test_agent_with_sandbox):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,139 @@
+# test_server.py
+"""
+Tests for the HTTP serving layer, using the fake chat model so no API key is
+needed. Runs under pytest or directly:
+
+    python test_server.py
+"""
+import sys
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+from agent import SalesSupportAgent
+from server import AgentPool, create_server
+from tools import SubscriptionDataStore
+from fake_chat_model import FakeChatModel
+from langchain_core.messages import BaseMessage
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+
+
+def start_server(size: int, max_queue: int, agent_delay: float = 0.0):
+    data_store = SubscriptionDataStore(CSV_PATH)
+    pool = AgentPool(
+        lambda: SalesSupportAgent(CSV_PATH, llm=FakeChatModel(agent_delay=agent_delay, tool_code=TOOL_CODE), data_store=data_store),
+        size=size,
+        max_queue=max_queue,
+    )
+    server = create_server(pool, port=0, default_timeout=30)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, pool, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop_server(server, pool):
+    server.shutdown()
+    server.server_close()
+    pool.shutdown()
+
+
+def post(url: str, payload: dict):
+    request = urllib.request.Request(f"{url}/query", data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_concurrent_queries_and_health():
+    server, pool, url = start_server(size=2, max_queue=8)
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda i: post(url, {"question": f"Active MRR? ({i})"}), range(6)))
+        assert all(status == 200 for status, _ in results), results
+        assert all(body["answer"] == "Answer: 127100" for _, body in results), results
+
+        with urllib.request.urlopen(f"{url}/health") as response:
+            health = json.loads(response.read())
+        assert health["status"] == "ok" and health["workers"] == 2 and health["completed"] == 6, health
+
+        status, body = post(url, {"not_a_question": 1})
+        assert status == 400, body
+        for payload in ({"question": 5}, {"question": "  "}, {"question": "Active MRR?", "dataset": ["emea"]}, ["Active MRR?"]):
+            status, body = post(url, payload)
+            assert status == 400, (payload, body)
+    finally:
+        stop_server(server, pool)
+
+
+def test_backpressure_and_timeout():
+    server, pool, url = start_server(size=1, max_queue=1, agent_delay=0.3)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            statuses = sorted(status for status, _ in executor.map(lambda i: post(url, {"question": f"Active MRR? ({i})"}), range(4)))
+        assert statuses.count(200) >= 1 and statuses.count(429) >= 1, statuses
+
+        status, body = post(url, {"question": "Active MRR? (slow)", "timeout": 0.1})
+        assert status == 504, body
+    finally:
+        stop_server(server, pool)
+
+
+class HangingChatModel(FakeChatModel):
+    """Fake model whose agent turns block until `release` is set."""
+
+    release: threading.Event
+
+    def _reply(self, messages: List[BaseMessage]):
+        if not self._is_guardrail(messages):
+            self.release.wait()
+        return super()._reply(messages)
+
+
+def test_timed_out_agent_is_replaced():
+    data_store = SubscriptionDataStore(CSV_PATH)
+    release = threading.Event()
+    built = []
+
+    def agent_factory():
+        # Only the first agent hangs; replacements answer normally
+        llm = HangingChatModel(tool_code=TOOL_CODE, release=release) if not built else FakeChatModel(tool_code=TOOL_CODE)
+        built.append(llm)
+        return SalesSupportAgent(CSV_PATH, llm=llm, data_store=data_store)
+
+    pool = AgentPool(agent_factory, size=1, max_queue=0)
+    server = create_server(pool, port=0, default_timeout=30)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        status, body = post(url, {"question": "Active MRR? (hangs)", "timeout": 0.2})
+        assert status == 504, body
+        # The hung run still holds the first agent, but a new one serves the next queries
+        for i in range(3):
+            status, body = post(url, {"question": f"Active MRR? ({i})", "timeout": 5})
+            assert status == 200 and body["answer"] == "Answer: 127100", body
+        with urllib.request.urlopen(f"{url}/health") as response:
+            health = json.loads(response.read())
+        assert health["timed_out"] == 1 and health["replaced"] == 1 and health["completed"] == 3, health
+        assert health["busy"] == 0 and health["queued"] == 0 and len(built) == 2, health
+    finally:
+        release.set()
+        stop_server(server, pool)
+
+
+if __name__ == "__main__":
+    for test in (test_concurrent_queries_and_health, test_backpressure_and_timeout, test_timed_out_agent_is_replaced):
+        test()
+        print(f"PASS {test.__name__}")
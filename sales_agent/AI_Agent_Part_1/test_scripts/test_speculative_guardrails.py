@@ -0,0 +1,71 @@
+# test_speculative_guardrails.py
+"""
+Speculative guardrails against a fake slow chat model: allowed queries take
+about max(guardrail, agent) and rejected queries never return agent output.
+
+Run with: python test_speculative_guardrails.py (or pytest)
+"""
+import sys
+import time
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent, REJECTION_RESPONSE
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+QUESTION = "How many subscriptions are there?"
+
+
+def timed_query(agent: SalesSupportAgent, question: str):
+    start = time.perf_counter()
+    response = agent.query(question)
+    return response, time.perf_counter() - start
+
+
+def test_allowed_query_overlaps_guardrail_and_agent():
+    # Guardrail: one 0.4s call. Agent: tool call + answer, two 0.25s calls.
+    def make_agent(speculative):
+        llm = FakeChatModel(guardrail_delay=0.4, agent_delay=0.25)
+        return SalesSupportAgent(CSV_PATH, llm=llm, speculative_guardrails=speculative)
+
+    serial_response, serial_time = timed_query(make_agent(False), QUESTION)
+    speculative_response, speculative_time = timed_query(make_agent(True), QUESTION)
+
+    print(f"  serial: {serial_time:.2f}s  speculative: {speculative_time:.2f}s")
+    assert serial_response == speculative_response == "Answer: 15"
+    assert serial_time >= 0.9
+    assert speculative_time < 0.75
+
+
+def test_rejected_query_drops_agent_output():
+    llm = FakeChatModel(guardrail_verdict="REJECT", guardrail_delay=0.1, agent_delay=0.3)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, speculative_guardrails=True)
+
+    response, elapsed = timed_query(agent, QUESTION)
+    assert response == REJECTION_RESPONSE
+    assert elapsed < 0.3
+
+    # The agent run stops at its next step: no tool call or second model call
+    time.sleep(0.6)
+    assert len(llm.agent_calls) == 1
+
+
+def test_regex_rejection_skips_agent():
+    llm = FakeChatModel(agent_delay=0.1)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, speculative_guardrails=True)
+
+    assert agent.query("What's the credit card number for Acme Corp?") == REJECTION_RESPONSE
+    time.sleep(0.2)
+    assert llm.agent_calls == [] and llm.guardrail_calls == []
+
+
+if __name__ == "__main__":
+    print("Testing speculative guardrails:")
+    print("=" * 60)
+    for test in (test_allowed_query_overlaps_guardrail_and_agent, test_rejected_query_drops_agent_output, test_regex_rejection_skips_agent):
+        test()
+        print(f"PASS {test.__name__}")
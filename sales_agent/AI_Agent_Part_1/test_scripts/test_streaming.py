@@ -0,0 +1,96 @@
+# test_streaming.py
+"""
+Streaming queries: no token or tool event is shown before the guardrail
+allows the query, and a rejected query yields only the rejection, also when
+the agent runs speculatively next to a slow guardrail.
+
+Run with: python test_streaming.py (or pytest)
+"""
+import sys
+import threading
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from agent import SalesSupportAgent, REJECTION_RESPONSE
+from guardrails import LLM_REJECT_REASON
+from fake_chat_model import FakeChatModel
+
+CSV_PATH = PROJECT_ROOT.parent / "data" / "subscription_data.csv"
+QUESTION = "What is our total MRR from active subscriptions?"
+TOOL_CODE = "print(df[df['status'] == 'active']['monthly_revenue'].sum())"
+ANSWER_EVENTS = ("token", "tool_start", "tool_end")
+
+
+class StubGuardrail:
+    """Stands in for the LLM guardrail check with a fixed verdict, recording when it decided."""
+
+    def __init__(self, reject: bool):
+        self.reject = reject
+        self.decided = threading.Event()
+
+    def __call__(self, query):
+        self.decided.set()
+        return (True, LLM_REJECT_REASON) if self.reject else (False, None)
+
+
+def make_agent(reject: bool, **kwargs):
+    llm = FakeChatModel(tool_code=TOOL_CODE, token_delay=0.001)
+    agent = SalesSupportAgent(CSV_PATH, llm=llm, fast_path=False, **kwargs)
+    stub = StubGuardrail(reject)
+    agent.guardrails._check_llm = stub
+    return agent, llm, stub
+
+
+def test_rejected_stream_yields_no_tokens():
+    agent, llm, stub = make_agent(reject=True)
+    events = list(agent.stream_query(QUESTION))
+    assert events == [{"type": "final", "content": REJECTION_RESPONSE}]
+    assert stub.decided.is_set() and not llm.agent_calls
+
+
+def test_regex_rejected_stream_yields_no_tokens():
+    agent, llm, stub = make_agent(reject=False)
+    events = list(agent.stream_query("Give me all customer emails"))
+    assert events == [{"type": "final", "content": REJECTION_RESPONSE}]
+    assert not stub.decided.is_set() and not llm.agent_calls
+
+
+def test_speculative_rejected_stream_yields_no_tokens():
+    # The guardrail decides only after the agent has streamed its whole answer
+    agent, llm, stub = make_agent(reject=True, speculative_guardrails=True)
+    agent_done = threading.Event()
+    stream_agent = agent._stream_agent
+
+    def stream_then_signal(*args):
+        yield from stream_agent(*args)
+        agent_done.set()
+
+    agent._stream_agent = stream_then_signal
+    agent.guardrails._check_llm = lambda query: (agent_done.wait(10), stub(query))[1]
+    events = list(agent.stream_query(QUESTION))
+    assert events == [{"type": "final", "content": REJECTION_RESPONSE}]
+    assert agent_done.is_set() and stub.decided.is_set() and len(llm.agent_calls) == 2
+
+
+def test_allowed_stream_tokens_follow_the_verdict():
+    for speculative in (False, True):
+        agent, llm, stub = make_agent(reject=False, speculative_guardrails=speculative)
+        events = []
+        for event in agent.stream_query(QUESTION):
+            if event["type"] in ANSWER_EVENTS:
+                assert stub.decided.is_set(), event
+            events.append(event)
+        assert any(event["type"] == "token" for event in events)
+        assert [event["type"] for event in events].count("tool_end") == 1
+        assert events[-1] == {"type": "final", "content": "Answer: 127100"}
+
+
+if __name__ == "__main__":
+    print("Testing streaming queries:")
+    print("=" * 60)
+    for test in (test_rejected_stream_yields_no_tokens, test_regex_rejected_stream_yields_no_tokens, test_speculative_rejected_stream_yields_no_tokens, test_allowed_stream_tokens_follow_the_verdict):
+        test()
+        print(f"PASS {test.__name__}")
@@ -1,56 +1,79 @@
 import os
+import re
+import json
 import pandas as pd
+from datetime import datetime
 from pathlib import Path
+import sys
+import asyncio
 import warnings
+import threading
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from langchain_experimental.utilities import PythonREPL
-from langchain_core.tools import Tool
+from langchain_core.tools import StructuredTool, Tool
 from pydantic import BaseModel, Field
+from typing import Literal, Optional, Tuple
 import logging
+from output_budget import CHARS_PER_TOKEN, DEFAULT_MAX_OUTPUT_CHARS, OutputShaper, estimate_tokens, truncate_output
+from code_memo import MAX_MEMO_OUTPUT_CHARS, code_memo_key
+from data_cache import copy_on_write, get_cached_profile, load_subscription_dataframe, resolve_fingerprint
+from metrics import METRICS_TOOL_NAME, METRIC_VIEWS, compute_metric_view, metric_cache_key
+from query_dsl import DEFAULT_QUERY_LIMIT, MAX_QUERY_LIMIT, PROTECTED_COLUMNS, STRUCTURED_QUERY_TOOL_NAME, QuerySpec, run_query
+from lru_cache import LRUCache
+from sandbox_pool import SandboxPool
 warnings.filterwarnings("ignore", message=".*Python REPL can execute arbitrary code.*")
 warnings.filterwarnings("ignore", category=UserWarning, module="langchain_experimental.utilities.python")
 
-def get_dataframe_info(csv_path: str) -> dict:
+SUBSCRIPTION_TOOL_NAME = "query_subscription_data"
+# Token budget of the compact schema preamble (about 4 characters per token)
+DEFAULT_PREAMBLE_TOKENS = 800
+# Columns whose values are never shown to the model
+PII_NAME_HINTS = ("contact", "email", "phone", "address")
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.\w+")
+# (max values to enumerate, examples for other text columns), most detailed first
+PREAMBLE_DETAIL_LEVELS = [(20, 5), (8, 2), (0, 0)]
+SCHEMA_IN_SYSTEM_PROMPT = "The DataFrame schema is described in the system prompt."
+
+def get_dataframe_info(csv_path: str, df: Optional[pd.DataFrame] = None) -> dict:
     """
-    Load DataFrame and extract schema information for debugging and preamble.
+    Extract schema information for debugging and preamble.
+    Uses the cached single-pass profile, so unchanged data is not re-read.
+
+    Args:
+        csv_path: Path to the subscription data CSV file
+        df: Already loaded DataFrame to profile if the cache is stale
     """
     try:
         path = Path(csv_path).resolve()
-        logging.info(f"Loading CSV file from: {path}")
+        logging.info(f"Loading schema profile for: {path}")
         
         if not path.exists():
             raise FileNotFoundError(f"CSV file not found: {path}")
         
-        df = pd.read_csv(path)
-        logging.info(f"CSV loaded successfully, total rows: {len(df)}, columns: {list(df.columns)}")
-        
-        columns_info = []
-        for col in df.columns:
-            dtype = str(df[col].dtype)
-            columns_info.append({'name': col, 'dtype': dtype})
-        
-        return {
-            'columns': columns_info,
-            'total_rows': len(df),
-            'column_names': list(df.columns)
-        }
+        df_info = get_cached_profile(csv_path, df=df)
+        logging.info(f"Schema profile ready, total rows: {df_info['total_rows']}, columns: {df_info['column_names']}")
+        return df_info
     except Exception as e:
         logging.error(f"Error loading DataFrame: {e}")
         return {'error': str(e)}
 
 
-def create_dataframe_preamble(csv_path: str) -> str:
+def create_dataframe_preamble(csv_path: str, df_info: Optional[dict] = None) -> str:
     """
     Generate a preamble describing the DataFrame schema for the model,
     including data types and unique sample values.
     """
-    df_info = get_dataframe_info(csv_path)
+    if df_info is None:
+        df_info = get_dataframe_info(csv_path)
 
     if 'error' in df_info:
         return f"Error loading DataFrame info: {df_info['error']}"
 
-    # Load the actual dataframe to compute unique values
-    df = pd.read_csv(csv_path)
-
     preamble = (
         "You are working with a pandas DataFrame named 'df'.\n"
         "**DataFrame Structure:**\n"
@@ -63,11 +86,11 @@ def create_dataframe_preamble(csv_path: str) -> str:
         col = col_info['name']
         dtype = col_info['dtype']
 
-        # Get unique values (safe & truncated)
-        uniques = df[col].dropna().unique()
-        unique_list = uniques[:10].tolist()  # limit to first 10 unique values
+        # Unique values are already capped by the profiler
+        unique_list = col_info['unique_values']
+        unique_count = col_info['unique_count']
 
-        more = f" (+{len(uniques) - 10} more)" if len(uniques) > 10 else ""
+        more = f" (+{unique_count - len(unique_list)} more)" if unique_count > len(unique_list) else ""
 
         preamble += (
             f"- {col} ({dtype})\n"
@@ -79,56 +102,388 @@ def create_dataframe_preamble(csv_path: str) -> str:
         "- DataFrame 'df' is pre-loaded and ready to use.\n"
         "- Date columns, if any, are converted to datetime.\n"
         "- Boolean columns, if any, are converted to True/False.\n"
+        "- Low-cardinality text columns (dtype 'category') compare to plain strings as usual.\n"
         "- Always return or print the result of your Python code.\n"
     )
 
     return preamble
 
 
-def create_python_repl_tool(csv_path: str) -> Tool:
+def _is_pii_column(col_info: dict) -> bool:
+    name = col_info['name'].lower()
+    if col_info['name'] in PROTECTED_COLUMNS or any(hint in name for hint in PII_NAME_HINTS):
+        return True
+    return any(isinstance(v, str) and EMAIL_PATTERN.fullmatch(v) for v in col_info['unique_values'])
+
+
+def _describe_column(col_info: dict, enum_limit: Optional[int], examples: int) -> str:
+    """
+    One preamble line for a column. enum_limit None gives name and dtype only.
+    """
+    line = f"- {col_info['name']} ({col_info['dtype']})"
+    if _is_pii_column(col_info):
+        return f"- {col_info['name']}: contact details, values withheld"
+    if col_info['null_count']:
+        line += f" [{col_info['null_count']} missing]"
+    if enum_limit is None or col_info['dtype'] == 'bool':
+        return line
+    if 'min' in col_info:
+        return f"{line}: {col_info['min']} to {col_info['max']}"
+
+    values = col_info['unique_values']
+    complete = col_info['unique_count'] <= len(values)
+    if any(isinstance(v, str) and ", " in v for v in values):
+        # Multi-valued text such as custom_features: enumerate the items, not the combinations
+        items = list(dict.fromkeys(item for v in values for item in str(v).split(", ")))
+        if len(items) <= enum_limit:
+            more = ", ..." if not complete else ""
+            return f"{line}: comma-separated list of {', '.join(repr(v) for v in items)}{more}"
+    if complete and col_info['unique_count'] <= enum_limit:
+        return f"{line}: {', '.join(repr(v) for v in values)}"
+    line += f": {col_info['unique_count']} distinct values"
+    if examples:
+        line += f", e.g. {', '.join(repr(v) for v in values[:examples])}"
+    return line
+
+
+def create_compact_preamble(df_info: dict, max_tokens: int = DEFAULT_PREAMBLE_TOKENS) -> str:
+    """
+    Schema preamble that fits a token budget.
+
+    Low-cardinality text columns are enumerated in full, numeric and date
+    columns get their range, other text columns a count and examples, and
+    contact-detail columns only their name. Detail is reduced step by step
+    (shorter enumerations, then ranges and counts only, then names and
+    dtypes, then a column cut-off) until the text fits max_tokens.
+    """
+    header = f"You are working with a pandas DataFrame named 'df' with {df_info['total_rows']} rows.\n**Columns:**\n"
+    footer = (
+        "\n**Instructions:**\n"
+        "- 'df' is pre-loaded: dates are datetime, booleans are True/False, 'category' columns compare to plain strings.\n"
+        "- Always print the result of your Python code.\n"
+    )
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+
+    for enum_limit, examples in PREAMBLE_DETAIL_LEVELS + [(None, 0)]:
+        lines = [_describe_column(col_info, enum_limit, examples) for col_info in df_info['columns']]
+        preamble = header + "\n".join(lines) + "\n" + footer
+        if len(preamble) <= budget_chars:
+            return preamble
+
+    # Still too wide: list as many columns as fit, leaving room for the cut-off line
+    kept, used = [], len(header) + len(footer) + 64
+    for line in lines:
+        if used + len(line) + 1 > budget_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    kept.append(f"- ... {len(lines) - len(kept)} more columns (print df.columns to list them)")
+    return header + "\n".join(kept) + "\n" + footer
+
+
+def create_tool_description(df_info: dict) -> str:
+    """
+    Build the short tool description from the schema profile.
+    """
+    column_list = ', '.join(df_info['column_names'])
+    return f"""Python shell for querying subscription data. DataFrame 'df' has {df_info['total_rows']} rows. Available columns: {column_list}."""
+
+
+def create_tool_input_schema(df_preamble: str) -> type:
+    """
+    Build the tool input schema whose 'code' field carries the DataFrame preamble.
+    """
+    class ToolInput(BaseModel):
+        code: str = Field(
+            description=f"Python code to execute using the 'df' DataFrame.\n\n{df_preamble}"
+        )
+
+    return ToolInput
+
+
+@dataclass(frozen=True)
+class SubscriptionSnapshot:
+    """
+    Immutable view of the subscription data at one point in time, with the
+    prompt text generated from it.
+    """
+    df: pd.DataFrame
+    df_info: dict
+    preamble: str
+    tool_description: str
+    args_schema: type
+    metrics_cache: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def metrics(self, view: str):
+        """
+        A business metrics view of this snapshot, computed on first use.
+        """
+        key = metric_cache_key(view)
+        if key not in self.metrics_cache:
+            self.metrics_cache[key] = compute_metric_view(self.df, view)
+        return self.metrics_cache[key]
+
+
+class SubscriptionDataStore:
+    """
+    Holds the current subscription data snapshot and swaps it atomically on reload.
+
+    Queries pin the snapshot they start with, so a reload in the middle of an
+    agent run does not change the data, preamble or tool description it sees.
+    """
+
+    def __init__(self, csv_path: str, df_info: Optional[dict] = None, preamble_tokens: Optional[int] = DEFAULT_PREAMBLE_TOKENS):
+        """
+        Args:
+            csv_path: Path to the subscription data CSV file
+            df_info: Schema profile to use for the first snapshot, computed if omitted
+            preamble_tokens: Token budget of the compact schema preamble, which is sent
+                once in the system prompt; None keeps the full preamble, repeated in
+                the subscription tool's input schema
+        """
+        self.csv_path = str(csv_path)
+        self.preamble_tokens = preamble_tokens
+        self._lock = threading.Lock()
+        self._pinned = ContextVar(f"subscription_snapshot_{id(self)}", default=None)
+        self._snapshot = self._build_snapshot(df_info)
+
+    def _build_snapshot(self, df_info: Optional[dict] = None, previous: Optional[SubscriptionSnapshot] = None) -> SubscriptionSnapshot:
+        df = load_subscription_dataframe(self.csv_path)
+        if df_info is None:
+            df_info = get_dataframe_info(self.csv_path, df=df)
+        if 'error' in df_info:
+            raise ValueError(f"Error loading DataFrame info: {df_info['error']}")
+        full_preamble = create_dataframe_preamble(self.csv_path, df_info=df_info)
+        if self.preamble_tokens:
+            preamble = create_compact_preamble(df_info, max_tokens=self.preamble_tokens)
+            args_schema = create_tool_input_schema(SCHEMA_IN_SYSTEM_PROMPT)
+            logging.info(
+                f"Schema preamble: ~{estimate_tokens(len(preamble))} tokens once per model call "
+                f"(full preamble ~{estimate_tokens(len(full_preamble))} tokens, sent twice)"
+            )
+        else:
+            preamble = full_preamble
+            args_schema = create_tool_input_schema(preamble)
+        self._fingerprint = df_info.get('fingerprint')
+        # Metrics computed for identical content (e.g. a forced reload) stay valid
+        same_content = previous is not None and (previous.df_info.get('fingerprint') or {}).get('sha256') == (self._fingerprint or {}).get('sha256')
+        return SubscriptionSnapshot(
+            df=df,
+            df_info=df_info,
+            preamble=preamble,
+            tool_description=create_tool_description(df_info),
+            args_schema=args_schema,
+            metrics_cache=dict(previous.metrics_cache) if same_content else {},
+        )
+
+    @property
+    def current(self) -> SubscriptionSnapshot:
+        """The latest loaded snapshot."""
+        return self._snapshot
+
+    def active(self) -> SubscriptionSnapshot:
+        """The snapshot pinned by the running query, or the latest one."""
+        return self._pinned.get() or self._snapshot
+
+    @contextmanager
+    def pin(self, snapshot: Optional[SubscriptionSnapshot] = None):
+        """
+        Pin a snapshot (the current one by default) for the duration of a query.
+        """
+        token = self._pinned.set(snapshot or self._snapshot)
+        try:
+            yield self._pinned.get()
+        finally:
+            self._pinned.reset(token)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load a new snapshot if the CSV changed (or always, with force).
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._lock:
+            if not force:
+                fingerprint, unchanged = resolve_fingerprint(self.csv_path, self._fingerprint)
+                if unchanged:
+                    self._fingerprint = fingerprint
+                    return False
+            snapshot = self._build_snapshot(previous=self._snapshot)
+            self._snapshot = snapshot
+            logging.info(f"Subscription data reloaded, total rows: {snapshot.df_info['total_rows']}")
+            return True
+
+
+class _ThreadLocalStdout:
+    """
+    sys.stdout replacement that routes writes from a capturing thread to that
+    thread's own buffer, so concurrent tool calls don't mix their output.
+    Other threads keep writing to the original stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer: Optional[StringIO]) -> None:
+        self._local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        return (getattr(self._local, 'buffer', None) or self._stream).write(text)
+
+    def flush(self) -> None:
+        (getattr(self._local, 'buffer', None) or self._stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+def _stdout_router() -> _ThreadLocalStdout:
+    """Install the thread-local stdout router if something replaced sys.stdout."""
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        return sys.stdout
+
+
+def execute_captured(code: str, namespace: dict) -> Tuple[str, bool]:
+    """
+    Execute code in namespace. Safe to call from several threads at once.
+
+    Returns:
+        Tuple of (what the code printed, or repr() of the exception it
+        raised, and whether it ran without raising)
+    """
+    router = _stdout_router()
+    buffer = StringIO()
+    router.capture(buffer)
+    try:
+        exec(PythonREPL.sanitize_input(code), namespace)
+        return buffer.getvalue(), True
+    except Exception as e:
+        return repr(e), False
+    finally:
+        router.capture(None)
+
+
+def run_captured(code: str, namespace: dict) -> str:
+    """
+    Execute code in namespace and return what it printed, or repr() of the
+    exception it raised, the same output format as PythonREPL.run.
+    Safe to call from several threads at once.
+    """
+    return execute_captured(code, namespace)[0]
+
+
+def create_python_repl_tool(csv_path: str, session: bool = True, df_info: Optional[dict] = None, data_store: Optional[SubscriptionDataStore] = None, max_workers: int = 4, sandbox: Optional[SandboxPool] = None, result_cache: Optional[LRUCache] = None, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> Tool:
     """
     Create a PythonREPL tool with detailed logging for subscription data.
+
+    Args:
+        csv_path: Path to the subscription data CSV file
+        session: If True, load the typed DataFrame once and give every call
+            an isolated copy-on-write view of it. If False, re-run the init
+            code (CSV read and conversions) on every call.
+        df_info: Schema profile from get_dataframe_info, computed if omitted
+        data_store: Snapshot store to read the DataFrame from in session mode,
+            created from csv_path if omitted
+        max_workers: Size of the thread pool async callers (ainvoke) run code on
+        sandbox: Worker process pool to run code in (with time and memory limits)
+            instead of in-process; session mode only
+        result_cache: Memo of outputs keyed by the normalized code and the data
+            content hash, so repeated snippets skip execution; session mode only.
+            Code that raised, timed out or printed more than MAX_MEMO_OUTPUT_CHARS
+            is not memoized.
+        max_output_chars: Budget for the text returned to the model (None for no limit).
+            Printed DataFrames/Series over this size are summarized, and
+            longer output is cut with an explicit truncation marker.
     """
     path = Path(csv_path).resolve()
-    df_info = get_dataframe_info(csv_path)
-    df_preamble = create_dataframe_preamble(csv_path)
+    if session:
+        data_store = data_store or SubscriptionDataStore(csv_path, df_info=df_info)
+        df_info = data_store.current.df_info
+    elif df_info is None:
+        df_info = get_dataframe_info(csv_path)
+    df_preamble = create_dataframe_preamble(csv_path, df_info=df_info)
     
-    # Initialization code: runs once per execution
+    # Initialization code: runs once per execution when session mode is off
     init_code = f"""import pandas as pd
 import json
 from datetime import datetime
+from data_cache import load_subscription_dataframe
 
-# Load CSV
+# Load CSV (typed, memory-optimized frame: dates, bools, categoricals, downcast integers)
 csv_path = r"{path}"
-df = pd.read_csv(csv_path)
-
-# Convert date columns automatically
-for col in df.columns:
-    if 'date' in col.lower():
-        df[col] = pd.to_datetime(df[col], errors='coerce')
-
-# Convert boolean columns
-for col in df.columns:
-    if df[col].dropna().unique().tolist() == [True, False] or df[col].dropna().unique().tolist() == [False, True]:
-        df[col] = df[col].astype(bool)
+df = load_subscription_dataframe(csv_path)
 
 # Logging for debug
 print("DataFrame loaded successfully with shape:", df.shape)
 """
 
     python_repl = PythonREPL()
-    
+
+    def run_session_code(code: str, shaper: OutputShaper) -> str:
+        """
+        Run user code against a fresh namespace holding a view of the
+        active snapshot's DataFrame, so calls never see each other's state.
+        """
+        snapshot = data_store.active()
+        fingerprint = snapshot.df_info.get('fingerprint') or {}
+        data_version = fingerprint.get('sha256')
+        key = code_memo_key(code, data_version) if result_cache is not None else None
+        if key is not None:
+            cached = result_cache.get(key)
+            if cached is not None:
+                logging.debug("Returning memoized tool output")
+                return cached
+
+        if sandbox is not None:
+            output, ok = sandbox.execute(code, data_version=data_version, csv_path=fingerprint.get('path'))
+        else:
+            # Each call gets a shallow view of the shared DataFrame; copy-on-write
+            # keeps user code from mutating it
+            with copy_on_write():
+                namespace = {
+                    'pd': pd,
+                    'json': json,
+                    'datetime': datetime,
+                    'df': snapshot.df.copy(deep=False),
+                    'print': shaper.print,
+                }
+                output, ok = execute_captured(code, namespace)
+
+        if key is not None and ok and len(output) <= MAX_MEMO_OUTPUT_CHARS:
+            result_cache.put(key, output)
+        return output
+
     def run_python_code(code: str) -> str:
         """
         Run user code in PythonREPL with DataFrame pre-loaded.
         Includes detailed logs for debugging.
         """
         logging.debug("Executing user code...")
-        full_code = init_code + "\n\n" + code
         try:
-            result = python_repl.run(full_code)
+            shaper = OutputShaper(max_output_chars)
+            if session:
+                result = str(run_session_code(code, shaper))
+            else:
+                full_code = init_code + "\n\n" + code
+                result = str(python_repl.run(full_code))
             logging.debug("Execution successful")
-            return str(result)
+            output = truncate_output(result, max_output_chars)
+            printed_chars = len(result) + shaper.chars_saved
+            if output != result or shaper.summarized:
+                logging.info(
+                    f"Tool output shaped: ~{estimate_tokens(printed_chars)} -> ~{estimate_tokens(len(output))} tokens "
+                    f"({printed_chars} -> {len(output)} chars, {shaper.summarized} DataFrame/Series summarized)"
+                )
+            else:
+                logging.info(f"Tool output: {len(output)} chars (~{estimate_tokens(len(output))} tokens)")
+            return output
         except FileNotFoundError as e:
             logging.error(f"CSV file not found at {csv_path}")
             return f"Error: CSV file not found at {csv_path}\nOriginal error: {str(e)}"
@@ -136,31 +491,124 @@ print("DataFrame loaded successfully with shape:", df.shape)
             logging.error(f"Error executing Python code: {e}")
             return f"Error executing Python code: {str(e)}\nCheck your syntax and DataFrame column names."
     
-    # Tool description
-    column_list = ', '.join(df_info['column_names'])
-    tool_description = f"""Python shell for querying subscription data. DataFrame 'df' has {df_info['total_rows']} rows. Available columns: {column_list}."""
-    
-    # Define tool input schema
-    class ToolInput(BaseModel):
-        code: str = Field(
-            description=f"Python code to execute using the 'df' DataFrame.\n\n{df_preamble}"
-        )
+    # Bounded pool for async callers, so pandas work never blocks the event loop
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="subscription-tool")
+
+    async def arun_python_code(code: str) -> str:
+        """
+        Run user code on the tool's thread pool, keeping the caller's context
+        (and so its pinned data snapshot).
+        """
+        context = copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, context.run, run_python_code, code)
     
     python_tool = Tool(
-        name="query_subscription_data",
-        description=tool_description,
-        func=run_python_code
+        name=SUBSCRIPTION_TOOL_NAME,
+        description=create_tool_description(df_info),
+        func=run_python_code,
+        coroutine=arun_python_code
     )
     
-    python_tool.args_schema = ToolInput
+    python_tool.args_schema = create_tool_input_schema(df_preamble)
     return python_tool
 
 
-def get_subscription_tool(csv_path: str) -> Tool:
+def get_subscription_tool(csv_path: str, session: bool = True, df_info: Optional[dict] = None, data_store: Optional[SubscriptionDataStore] = None, max_workers: int = 4, sandbox: Optional[SandboxPool] = None, result_cache: Optional[LRUCache] = None, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> Tool:
     """
     Return the fully configured PythonREPL tool for subscription data.
     """
-    return create_python_repl_tool(csv_path)
+    return create_python_repl_tool(csv_path, session=session, df_info=df_info, data_store=data_store, max_workers=max_workers, sandbox=sandbox, result_cache=result_cache, max_output_chars=max_output_chars)
+
+
+class MetricsInput(BaseModel):
+    view: Literal[METRIC_VIEWS] = Field(
+        description=(
+            "Metrics view to return: 'overview' (customer counts, active MRR/ARR, churn, "
+            "outstanding balances, overall seat utilization); 'by_plan_tier', 'by_industry', "
+            "'by_status', 'by_support_tier' (customers, active/total MRR, active ARR, average "
+            "monthly revenue, outstanding balance, seat utilization and top companies by revenue per group); "
+            "'seat_utilization' (companies with the lowest utilization first); 'upcoming_renewals' "
+            "(non-churned subscriptions by end date with days left and auto_renew). Company lists are "
+            "capped; totals count every customer."
+        )
+    )
+
+
+def create_metrics_tool(data_store: SubscriptionDataStore, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> Tool:
+    """
+    Create the lookup tool for precomputed business metrics.
+
+    Views are computed from the query's pinned data snapshot on first use and
+    kept with that snapshot, so they are recomputed only after the CSV changes.
+    Output is cut to max_output_chars like the subscription tool's.
+    """
+    def get_business_metrics(view: str) -> str:
+        try:
+            return truncate_output(json.dumps(data_store.active().metrics(view), default=str), max_output_chars)
+        except Exception as e:
+            logging.error(f"Error computing metrics view {view}: {e}")
+            return f"Error: {str(e)}"
+
+    metrics_tool = Tool(
+        name=METRICS_TOOL_NAME,
+        description=(
+            "Precomputed subscription business metrics (MRR, ARR, churn, seat utilization, "
+            "outstanding balances, renewals), overall and grouped by plan tier, industry, status "
+            "or support tier. Returns JSON. Faster and more reliable than writing pandas code; "
+            f"use {SUBSCRIPTION_TOOL_NAME} only for questions these views don't answer."
+        ),
+        func=get_business_metrics,
+    )
+    metrics_tool.args_schema = MetricsInput
+    return metrics_tool
+
+
+def get_metrics_tool(data_store: SubscriptionDataStore, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> Tool:
+    """
+    Return the business metrics lookup tool for a data snapshot store.
+    """
+    return create_metrics_tool(data_store, max_output_chars=max_output_chars)
+
+
+def create_structured_query_tool(data_store: SubscriptionDataStore, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> StructuredTool:
+    """
+    Create the structured query tool: a typed JSON spec (filters, group-by,
+    aggregations, sort, limit) run as vectorized pandas on the query's pinned
+    snapshot, with no code execution. Output is cut to max_output_chars.
+    """
+    def structured_query(**spec) -> str:
+        try:
+            result = run_query(data_store.active().df, QuerySpec(**spec))
+            return truncate_output(json.dumps(result, default=str), max_output_chars)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+        except Exception as e:
+            logging.error(f"Error running structured query: {e}")
+            return f"Error running structured query: {str(e)}"
+
+    return StructuredTool.from_function(
+        func=structured_query,
+        name=STRUCTURED_QUERY_TOOL_NAME,
+        description=(
+            "Query subscription data with a JSON spec instead of code: filters (combined with "
+            "'all' or 'any'), select columns, group_by, aggregations (count, sum, mean, median, min, "
+            f"max, nunique, list), sort and limit (default {DEFAULT_QUERY_LIMIT} rows, at most {MAX_QUERY_LIMIT}). "
+            "Also offers the derived column seat_utilization_pct. "
+            "Returns matching rows, their totals, or one row per group as JSON. Prefer this over "
+            f"{SUBSCRIPTION_TOOL_NAME} for filtering, counting and aggregating."
+        ),
+        args_schema=QuerySpec,
+        # Specs that fail validation (unknown op, limit over the maximum) go back to the model as errors
+        handle_validation_error=lambda e: f"Error: {str(e)}",
+    )
+
+
+def get_structured_query_tool(data_store: SubscriptionDataStore, max_output_chars: Optional[int] = DEFAULT_MAX_OUTPUT_CHARS) -> StructuredTool:
+    """
+    Return the structured query tool for a data snapshot store.
+    """
+    return create_structured_query_tool(data_store, max_output_chars=max_output_chars)
 
 
 # # Example usage
@@ -0,0 +1,104 @@
+"""
+Calibrate the fused judge against the separate judges.
+
+Re-scores the data points of evaluation_output/evaluation_results_v1..v3.csv
+with one fused judge call each, then compares the fused scores with the
+scores the four separate judges gave: mean score, mean absolute difference,
+exact agreement, agreement within one score step and rank correlation.
+
+Usage:
+    python calibrate_fused_judge.py [v1 v2 v3]
+"""
+import sys
+import csv
+import time
+from pathlib import Path
+
+import pandas as pd
+from evaluation_pipeline import RagasTest
+from fused_judge import METRICS, SCORE_CHOICES
+from judge_cache import JudgeCallCache
+
+CURRENT_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = CURRENT_DIR / "evaluation_output"
+
+
+def read_rows(csv_path: Path) -> list:
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def compare_scores(separate_rows: list, fused_rows: list, choices=SCORE_CHOICES) -> dict:
+    """
+    Compare fused with separate-judge scores, metric by metric.
+
+    Rows are matched by position; rows without a score on either side are skipped.
+
+    Returns:
+        metric -> {"n", "separate_mean", "fused_mean", "mean_abs_diff",
+        "exact_agreement", "within_one_step", "spearman"}
+    """
+    step = {choice: idx for idx, choice in enumerate(sorted(choices))}
+    report = {}
+    for metric in METRICS:
+        pairs = pd.DataFrame({
+            "separate": pd.to_numeric([row.get(f"{metric}_score") for row in separate_rows], errors="coerce"),
+            "fused": pd.to_numeric([row.get(f"{metric}_score") for row in fused_rows], errors="coerce"),
+        }).dropna()
+        steps_apart = (pairs["separate"].map(step) - pairs["fused"].map(step)).abs()
+        spearman = pairs["separate"].corr(pairs["fused"], method="spearman") if len(pairs) > 1 else float("nan")
+        report[metric] = {
+            "n": len(pairs),
+            "separate_mean": pairs["separate"].mean(),
+            "fused_mean": pairs["fused"].mean(),
+            "mean_abs_diff": (pairs["separate"] - pairs["fused"]).abs().mean(),
+            "exact_agreement": (pairs["separate"] == pairs["fused"]).mean(),
+            "within_one_step": (steps_apart <= 1).mean(),
+            "spearman": spearman,
+        }
+    return report
+
+
+def format_report(reports: dict) -> str:
+    """Markdown table of compare_scores results per version."""
+    lines = [
+        "| Version | Metric | n | Separate mean | Fused mean | Mean abs diff | Exact agreement | Within one step | Spearman |",
+        "|---------|--------|---|---------------|------------|---------------|-----------------|-----------------|----------|",
+    ]
+    for version, report in reports.items():
+        for metric, stats in report.items():
+            spearman = "n/a" if pd.isna(stats["spearman"]) else f"{stats['spearman']:.2f}"
+            lines.append(
+                f"| {version} | {metric} | {stats['n']} | {stats['separate_mean']:.2f} | {stats['fused_mean']:.2f} "
+                f"| {stats['mean_abs_diff']:.2f} | {stats['exact_agreement']:.0%} | {stats['within_one_step']:.0%} | {spearman} |"
+            )
+    return "\n".join(lines)
+
+
+def calibrate(versions, ragas_test: RagasTest = None, output_dir: Path = OUTPUT_DIR) -> dict:
+    """
+    Score each version's data points with the fused judge, save the rows to
+    fused_calibration_<version>.csv and return compare_scores per version.
+    """
+    ragas_test = ragas_test or RagasTest(fused=True, judge_cache=JudgeCallCache())
+    reports = {}
+    for version in versions:
+        separate_rows = read_rows(output_dir / f"evaluation_results_{version}.csv")
+        start = time.perf_counter()
+        fused_rows = ragas_test.evaluate_data_points(separate_rows)
+        print(f"{version}: {len(fused_rows)} fused judge calls instead of {4 * len(fused_rows)} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        with (output_dir / f"fused_calibration_{version}.csv").open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fused_rows[0].keys())
+            writer.writeheader()
+            writer.writerows(fused_rows)
+        reports[version] = compare_scores(separate_rows, fused_rows)
+    return reports
+
+
+if __name__ == "__main__":
+    versions = sys.argv[1:] or ["v1", "v2", "v3"]
+    report = format_report(calibrate(versions))
+    (OUTPUT_DIR / "fused_calibration_report.md").write_text(report + "\n", encoding="utf-8")
+    print(report)
@@ -2,13 +2,20 @@
 For Evaluation of the Agent, first we need to get the response from the agent for each question in the evaluation data.
 We will create new JSON file with the question, the golden answer, evaluation criteria and the response from the agent.
 """
+import argparse
 import json
+import os
+import queue
+import random
 import sys
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from contextvars import copy_context
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-import os
 CURRENT_DIR = Path(__file__).resolve().parent
 # File is at: sales_agent/Eval_Pipeline_Part_2/create_eval/create_model_response.py
 # Go up to sales_agent directory: parent.parent
@@ -18,6 +25,22 @@ if str(PROJECT_ROOT) not in sys.path:
 from AI_Agent_Part_1.agent import SalesSupportAgent 
 load_dotenv()
 
+# Agent answers that report a failure rather than answer the question (see SalesSupportAgent._format_error)
+AGENT_ERROR_PREFIXES = ("I encountered an error:", "I encountered an issue processing your query")
+# Agents answering questions in parallel, each with its own SalesSupportAgent
+DEFAULT_WORKERS = 4
+# Seconds one attempt at a question may take
+DEFAULT_TIMEOUT = 180.0
+# Further attempts after a timeout, an exception or an agent error message
+DEFAULT_RETRIES = 2
+RETRY_BASE_DELAY = 2.0
+# Fields of a result in the {"generated_at", "results"} JSON
+RESULT_FIELDS = ("question", "golden_answer", "evaluation_criteria", "agent_response")
+
+
+class QuestionTimeoutError(Exception):
+    """Raised when the agent does not answer a question within its timeout."""
+
 
 def load_evaluation_data(path: Path) -> List[Dict[str, Any]]:
     """Load evaluation questions and metadata."""
@@ -39,55 +62,329 @@ def write_results(path: Path, results: List[Dict[str, str]]) -> None:
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "results": results,
     }
-    with path.open("w", encoding="utf-8") as f:
+    # Write to a temporary file first, so an interrupted write never leaves a truncated file
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
         json.dump(output_payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def checkpoint_path(output_json: Path) -> Path:
+    """JSONL file collecting response records while a run is in progress."""
+    return output_json.with_suffix(".partial.jsonl")
+
+
+def records_path(output_json: Path) -> Path:
+    """JSONL file of a finished run's response records (with latency and tool-call counts)."""
+    return output_json.with_suffix(".jsonl")
+
+
+def read_records(path: Path) -> List[Dict[str, Any]]:
+    """Records of a JSONL file, skipping a last line cut off by an interruption."""
+    records = []
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def to_result(record: Dict[str, Any]) -> Dict[str, str]:
+    """A response record as an entry of the {"generated_at", "results"} JSON."""
+    return {field: record.get(field, "") for field in RESULT_FIELDS}
+
+
+def convert_records(jsonl_path: Path, output_json: Path) -> List[Dict[str, str]]:
+    """
+    Write the {"generated_at", "results"} JSON from a JSONL file of response
+    records (the latest record of a question wins, in first-seen order).
+    """
+    by_question: Dict[str, Dict[str, Any]] = {}
+    for record in read_records(jsonl_path):
+        by_question[record["question"]] = record
+    results = [to_result(record) for record in by_question.values()]
+    write_results(output_json, results)
+    return results
+
+
+def is_error_result(result: Dict[str, str]) -> bool:
+    """Whether a stored response is an agent failure to retry."""
+    return (
+        bool(result.get("error"))
+        or not result.get("agent_response")
+        or result["agent_response"].startswith(AGENT_ERROR_PREFIXES)
+    )
+
+
+def load_completed_results(output_json: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Successful responses of earlier runs by question: those in the output JSON,
+    overridden by the run's records and then by an interrupted run's checkpoint.
+    """
+    results = []
+    if output_json.exists():
+        with output_json.open("r", encoding="utf-8") as f:
+            results.extend(json.load(f).get("results", []))
+    results.extend(read_records(records_path(output_json)))
+    results.extend(read_records(checkpoint_path(output_json)))
+    completed = {}
+    for result in results:
+        if is_error_result(result):
+            completed.pop(result.get("question"), None)
+        else:
+            completed[result["question"]] = result
+    return completed
+
+
+def ask_agent(agent: Any, question: str, timeout: Optional[float] = None) -> Tuple[str, int]:
+    """
+    Get the agent's answer to a question, counting its tool calls.
+
+    With a timeout, the answer is streamed on a separate daemon thread and
+    waited for with a hard deadline, so a hung LLM or tool call cannot block
+    the caller past it. The abandoned run stops at its next agent event
+    (generated token, tool start or end); until then it keeps the agent
+    busy, so the agent should not be reused (generate_record replaces it).
+
+    Returns:
+        Tuple of (answer, number of tool calls)
+
+    Raises:
+        QuestionTimeoutError: No answer within timeout seconds
+    """
+    abandoned = threading.Event()
+
+    def stream_answer() -> Tuple[str, int]:
+        response, tool_calls = "", 0
+        events = agent.stream_query(question)
+        try:
+            for event in events:
+                if abandoned.is_set():
+                    break
+                if event["type"] == "final":
+                    response = event["content"]
+                elif event["type"] == "tool_start":
+                    tool_calls += 1
+        finally:
+            events.close()
+        return response, tool_calls
+
+    if not timeout:
+        return stream_answer()
+
+    result: Future = Future()
+
+    def run() -> None:
+        try:
+            result.set_result(stream_answer())
+        except BaseException as e:
+            result.set_exception(e)
+
+    # A daemon thread, so a run that never returns does not hold up interpreter exit
+    threading.Thread(target=copy_context().run, args=(run,), name="ask-agent", daemon=True).start()
+    try:
+        return result.result(timeout=timeout)
+    except FutureTimeoutError:
+        abandoned.set()
+        raise QuestionTimeoutError(f"No answer within {timeout:g}s") from None
+
+
+def generate_record(
+    agents: "queue.Queue",
+    entry: Dict[str, Any],
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    retry_delay: float = RETRY_BASE_DELAY,
+    agent_factory: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Answer one evaluation question on the next free agent.
+
+    Timeouts, exceptions and agent error messages are retried with jittered
+    exponential backoff. After a timeout the agent may still be running the
+    abandoned attempt, so it is replaced with a new one from agent_factory
+    (without a factory, the same agent is reused).
+
+    Returns:
+        Record with the result fields plus latency_seconds (of the last attempt),
+        tool_calls, attempts, and error when every attempt failed
+    """
+    question = entry["question"].strip()
+    agent = agents.get()
+    try:
+        for attempt in range(1, retries + 2):
+            start = time.perf_counter()
+            try:
+                response, tool_calls = ask_agent(agent, question, timeout)
+                error = response if response.startswith(AGENT_ERROR_PREFIXES) else None
+            except QuestionTimeoutError as e:
+                response, tool_calls, error = "", 0, f"{type(e).__name__}: {e}"
+                if agent_factory is not None:
+                    agent = agent_factory()
+            except Exception as e:
+                response, tool_calls, error = "", 0, f"{type(e).__name__}: {e}"
+            latency = time.perf_counter() - start
+            if error is None or attempt > retries:
+                break
+            print(f"  ↻ Attempt {attempt} failed ({error[:80]}), retrying: {question[:60]}")
+            time.sleep(random.uniform(0, retry_delay * 2 ** (attempt - 1)))
+    finally:
+        agents.put(agent)
+
+    record = {
+        "question": question,
+        "golden_answer": entry.get("golden_answer", ""),
+        "evaluation_criteria": entry.get("evaluation_criteria", ""),
+        "agent_response": response,
+        "latency_seconds": round(latency, 3),
+        "tool_calls": tool_calls,
+        "attempts": attempt,
+    }
+    if error is not None:
+        record["error"] = error
+    return record
 
 
 def run_evaluation(
     evaluation_json: Path,
     subscription_csv: Path,
     output_json: Path,
+    resume: bool = False,
+    agent: Any = None,
+    workers: int = DEFAULT_WORKERS,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    agent_factory: Optional[Callable[[], Any]] = None,
+    retry_delay: float = RETRY_BASE_DELAY,
 ) -> None:
-    """Pass evaluation questions to the agent and store the responses."""
+    """
+    Pass evaluation questions to a pool of agents and store the responses.
+
+    Questions are answered in parallel, one per agent. Each response record
+    (result fields plus latency_seconds, tool_calls and attempts) is appended
+    and flushed to a checkpoint (<output>.partial.jsonl) as soon as it
+    arrives. When the run ends, the records are saved in question order to
+    <output>.jsonl, the output JSON ({"generated_at", "results"}) is written
+    and the checkpoint removed.
+
+    Args:
+        evaluation_json: Evaluation questions, golden answers and criteria
+        subscription_csv: Subscription data the agents answer from
+        output_json: Output file ({"generated_at", "results"})
+        resume: Reuse successful responses from the output JSON, records and an
+            interrupted run's checkpoint, and ask only the remaining and failed questions
+        agent: Single agent to query (instead of a pool)
+        workers: Number of agents answering in parallel
+        timeout: Seconds one attempt at a question may take, enforced as a hard deadline;
+            a timed-out pool agent is replaced (None for no limit)
+        retries: Further attempts after a timeout, an exception or an agent error message
+        agent_factory: Builds each pool agent (a SalesSupportAgent on subscription_csv by default)
+        retry_delay: Base of the jittered exponential backoff between attempts
+    """
     print(f"Loading evaluation data from {evaluation_json} ...")
     evaluation_data = load_evaluation_data(evaluation_json)
 
-    print("Initializing Sales Support Agent...")
-    agent = SalesSupportAgent(csv_path=str(subscription_csv),api_key=os.getenv("COHERE_PROD_API_KEY"))
-    print("Agent initialized. Processing questions...\n")
+    checkpoint = checkpoint_path(output_json)
+    completed = load_completed_results(output_json) if resume else {}
+    if resume:
+        print(f"Resuming: {len(completed)} questions already answered.")
+    elif checkpoint.exists():
+        checkpoint.unlink()
 
-    results: List[Dict[str, str]] = []
+    entries = []
     for idx, entry in enumerate(evaluation_data, start=1):
-        question = entry.get("question", "").strip()
-        if not question:
+        if not entry.get("question", "").strip():
             print(f"Skipping entry #{idx}: missing question.")
             continue
+        entries.append(entry)
+    pending = [idx for idx, entry in enumerate(entries) if entry["question"].strip() not in completed]
 
-        print(f"[{idx}/{len(evaluation_data)}] Question: {question}")
-        response = agent.query(question)
-        print(f"Response: {response}\n")
+    agents: "queue.Queue" = queue.Queue()
+    if agent is not None:
+        agents.put(agent)
+    elif pending:
+        print(f"Initializing {workers} Sales Support Agents...")
+        agent_factory = agent_factory or (
+            lambda: SalesSupportAgent(
+                csv_path=str(subscription_csv), api_key=os.getenv("COHERE_PROD_API_KEY"), fast_path=False
+            )
+        )
+        for _ in range(workers):
+            agents.put(agent_factory())
+        print("Agents initialized. Processing questions...\n")
 
-        results.append(
-            {
-                "question": question,
-                "golden_answer": entry.get("golden_answer", ""),
-                "evaluation_criteria": entry.get("evaluation_criteria", ""),
-                "agent_response": response,
+    records: Dict[int, Dict[str, Any]] = {}
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with checkpoint.open("a", encoding="utf-8") as checkpoint_file:
+        executor = ThreadPoolExecutor(max_workers=max(agents.qsize(), 1), thread_name_prefix="agent-response")
+        try:
+            futures = {
+                executor.submit(
+                    generate_record, agents, entries[idx], timeout, retries, retry_delay, None if agent is not None else agent_factory
+                ): idx
+                for idx in pending
             }
-        )
+            # Save records in the order they complete
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                records[futures[future]] = record
+                checkpoint_file.write(json.dumps(record) + "\n")
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+                status = f"✗ {record['error'][:80]}" if "error" in record else "✓"
+                print(f"[{done}/{len(pending)}] {status} {record['latency_seconds']:.1f}s, "
+                      f"{record['tool_calls']} tool calls: {record['question']}")
+        finally:
+            executor.shutdown(cancel_futures=True)
 
+    ordered = [records.get(idx) or completed[entry["question"].strip()] for idx, entry in enumerate(entries)]
     print(f"Writing results to {output_json} ...")
-    write_results(output_json, results)
-    print("Evaluation complete.")
+    records_file = records_path(output_json)
+    tmp_path = records_file.with_name(f"{records_file.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.writelines(json.dumps(record) + "\n" for record in ordered)
+    os.replace(tmp_path, records_file)
+    write_results(output_json, [to_result(record) for record in ordered])
+    checkpoint.unlink()
 
+    if records:
+        latencies = [record["latency_seconds"] for record in records.values()]
+        print(f"Answered {len(records)} questions in {time.perf_counter() - start:.1f}s "
+              f"({max(agents.qsize(), 1)} agents, mean latency {sum(latencies) / len(latencies):.1f}s, "
+              f"{sum(record['tool_calls'] for record in records.values())} tool calls)")
+    failed = sum(is_error_result(record) for record in ordered)
+    if failed:
+        print(f"{failed} questions failed; run again with --resume to retry them.")
+    print("Evaluation complete.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate agent responses for the evaluation questions")
+    parser.add_argument("--resume", action="store_true", help="Reuse successful responses of an earlier or interrupted run")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Agents answering in parallel")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds one attempt at a question may take; a hung attempt is abandoned and its agent replaced")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Further attempts after a failure")
+    parser.add_argument("--convert", nargs=2, metavar=("RECORDS_JSONL", "OUTPUT_JSON"),
+                        help="Only convert a JSONL file of response records to the results JSON")
+    args = parser.parse_args()
+
     evaluation_path = PROJECT_ROOT / "data" / "evaluation_data (1).json"
     subscription_data_path = PROJECT_ROOT / "data" / "subscription_data.csv"
     output_path = CURRENT_DIR.parent / "agent_responses" / "evaluation_dataset_v3.json"
 
-    run_evaluation(
-        evaluation_json=evaluation_path,
-        subscription_csv=subscription_data_path,
-        output_json=output_path,
-    )
+    if args.convert:
+        converted = convert_records(Path(args.convert[0]), Path(args.convert[1]))
+        print(f"Wrote {len(converted)} results to {args.convert[1]}")
+    else:
+        run_evaluation(
+            evaluation_json=evaluation_path,
+            subscription_csv=subscription_data_path,
+            output_json=output_path,
+            resume=args.resume,
+            workers=args.workers,
+            timeout=args.timeout,
+            retries=args.retries,
+        )
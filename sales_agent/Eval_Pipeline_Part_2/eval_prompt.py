@@ -10,4 +10,45 @@ System Response:
 
 Return a score of 1 (True) if the response fully meets the criteria, or 0 (False) otherwise.
 Provide a brief reason for your decision.
-"""
\ No newline at end of file
+"""
+
+FUSED_JUDGE_PROMPT = """
+You are an expert data labeler. Score the system's response on four independent metrics.
+Judge each metric on its own rubric only; a flaw under one metric must not lower another.
+
+<Metrics>
+  correctness: Accurate and complete compared with the reference answer. Penalize factual
+  errors, missing key information, partial answers, misleading statements and logical
+  inconsistencies. Judge correctness of information, not style or verbosity.
+
+  conciseness: Contains only the information requested, in as few words as needed. Deduct for
+  introductory phrases, hedging, unrequested explanations or context, restatements, follow-up
+  offers and pleasantries.
+
+  hallucination: Every claim is supported by the reference answer, which serves as the context.
+  Penalize unsupported, speculative or contradictory details, especially in dates, numbers and
+  names. A shorter factual response scores higher than a longer one with unsupported claims.
+  A score of 1.0 means no hallucinations.
+
+  criteria_adherence: How fully the response satisfies the evaluation criteria below.
+</Metrics>
+
+<input>
+{inputs}
+</input>
+
+<output>
+{outputs}
+</output>
+
+<reference_outputs>
+{reference_outputs}
+</reference_outputs>
+
+<evaluation_criteria>
+{criteria}
+</evaluation_criteria>
+
+For each metric, first explain your reasoning in one or two sentences, then give a score from
+the allowed choices, where 1.0 is best.
+"""
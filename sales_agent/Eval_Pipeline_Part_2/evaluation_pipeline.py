@@ -1,6 +1,9 @@
 import os
+import sys
 import json
 import csv
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 from openevals.llm import create_llm_as_judge
@@ -9,17 +12,60 @@ from openevals.prompts import (
     CONCISENESS_PROMPT,
     HALLUCINATION_PROMPT
 )
-from eval_prompt import CUSTOM_CRITERIA_PROMPT
+from eval_prompt import CUSTOM_CRITERIA_PROMPT, FUSED_JUDGE_PROMPT
+from fused_judge import FUSED_KEY, METRICS, create_fused_evaluator, fused_score_schema
+from judge_cache import JudgeCallCache, judge_identity
+from rate_limit import DEFAULT_REQUESTS_PER_MINUTE, RateLimitedCaller
 from langchain_cohere import ChatCohere
 load_dotenv()
 
+# Judge calls in flight at once (4 per data point)
+DEFAULT_MAX_CONCURRENCY = 8
+CSV_FIELDNAMES = ["question", "golden_answer", "agent_response", "evaluation_criteria"] + [
+    f"{metric}_{part}" for metric in METRICS for part in ("score", "comment")
+]
+
+
+def result_key(row):
+    """Identifies a data point's result across runs: its (question, agent response) pair."""
+    return (row.get("question", ""), row.get("agent_response", ""))
+
+
+def is_completed_row(row):
+    """Whether an output row holds every score (error and half-written rows do not)."""
+    return all(row.get(f"{metric}_score") not in (None, "") for metric in METRICS)
+
+
+def read_completed_rows(output_csv_path: Path):
+    """Completed rows of an existing output CSV, by result_key."""
+    if not output_csv_path.exists():
+        return {}
+    with output_csv_path.open("r", newline="", encoding="utf-8") as f:
+        return {result_key(row): row for row in csv.DictReader(f) if is_completed_row(row)}
+
+
 class RagasTest:
-    def __init__(self):
-        self.cohere_judge = ChatCohere(
+    def __init__(self, judge=None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE, max_retries: int = 5,
+                 fused: bool = False, judge_cache: JudgeCallCache = None):
+        """
+        Args:
+            judge: Chat model used as judge (Cohere command-a by default)
+            max_concurrency: Judge calls run in parallel by evaluate_dataset
+            requests_per_minute: Judge API quota shared by all calls (None for no limit)
+            max_retries: Retries of a judge call on 429/5xx errors
+            fused: Score all four metrics in one judge call per data point (see fused_judge.py)
+            judge_cache: Disk cache of judge results shared across runs (None to always call the judge)
+        """
+        self.cohere_judge = judge or ChatCohere(
             model="command-a-03-2025", 
             temperature=0.0,
             cohere_api_key=os.getenv("COHERE_PROD_API_KEY")
         )
+        self.max_concurrency = max_concurrency
+        self.caller = RateLimitedCaller(requests_per_minute, max_retries=max_retries)
+        self.fused = fused
+        self.judge_cache = judge_cache
 
     def initialize_evaluators(self):
         self.correctness_evaluator = create_llm_as_judge(
@@ -46,47 +92,195 @@ class RagasTest:
             feedback_key="criteria_adherence",
             choices=[0.0,0.5,0.8,1.0]
         )
+        self.fused_evaluator = create_fused_evaluator(self.cohere_judge, choices=[0.0,0.5,0.8,1.0])
+
+        # Everything besides the call arguments that decides a verdict (judge cache keys)
+        judge = judge_identity(self.cohere_judge)
+        self.evaluator_specs = {
+            'correctness': dict(judge, prompt=CORRECTNESS_PROMPT, choices=[0.0,0.5,0.8,1.0]),
+            'conciseness': dict(judge, prompt=CONCISENESS_PROMPT, choices=[0.0,0.5,0.8,1.0]),
+            'hallucination': dict(judge, prompt=HALLUCINATION_PROMPT, choices=[0.0,0.5,0.8,1.0]),
+            'criteria_adherence': dict(judge, prompt=CUSTOM_CRITERIA_PROMPT, choices=[0.0,0.5,0.8,1.0]),
+            FUSED_KEY: dict(judge, prompt=FUSED_JUDGE_PROMPT, schema=fused_score_schema([0.0,0.5,0.8,1.0])),
+        }
+
+    def call_judge(self, metric, evaluator, kwargs):
+        """
+        Run one judge call: from the judge cache when it has the same call,
+        otherwise under the rate limit (and then cached).
+        """
+        if self.judge_cache is None:
+            return self.caller.call(evaluator, **kwargs)
+        key = self.judge_cache.key(dict(self.evaluator_specs[metric], feedback_key=metric), kwargs)
+        cached = self.judge_cache.get(key)
+        if cached is not None:
+            return cached
+        result = self.caller.call(evaluator, **kwargs)
+        self.judge_cache.put(key, result)
+        return result
+
+    def evaluator_calls(self, data_point):
+        """Metric name -> (evaluator, keyword arguments) for the judges of a data point."""
+        if self.fused:
+            # One call scoring all four metrics
+            return {
+                FUSED_KEY: (self.fused_evaluator, dict(
+                    inputs=data_point['question'],
+                    outputs=data_point['agent_response'],
+                    reference_outputs=data_point['golden_answer'],
+                    criteria=data_point['evaluation_criteria']
+                )),
+            }
+        return {
+            # 1. Correctness
+            'correctness': (self.correctness_evaluator, dict(
+                inputs=data_point['question'],
+                outputs=data_point['agent_response'],
+                reference_outputs=data_point['golden_answer']
+            )),
+            # 2. Conciseness
+            'conciseness': (self.conciseness_evaluator, dict(
+                inputs=data_point['question'],
+                outputs=data_point['agent_response'],
+                context=data_point['golden_answer']
+            )),
+            # 3. Hallucination
+            # We pass golden_answer as 'context' to ensure the agent isn't making things up 
+            # relative to the ground truth.
+            'hallucination': (self.hallucination_evaluator, dict(
+                inputs=data_point['question'],
+                outputs=data_point['agent_response'],
+                context=data_point['golden_answer'],
+                reference_outputs=""
+            )),
+            # 4. Custom Criteria
+            'criteria_adherence': (self.criteria_evaluator, dict(
+                inputs=data_point['question'], 
+                outputs=data_point['agent_response'],
+                criteria=data_point['evaluation_criteria']
+            )),
+        }
+
+    @staticmethod
+    def merge_results(results):
+        """Expand a fused judge result into one entry per metric."""
+        results = dict(results)
+        results.update(results.pop(FUSED_KEY, {}))
+        return results
 
     def run_evaluation(self, data_point):
         print(f"--- Evaluating: {data_point['question']} ---")
-        
-        results = {}
+        return self.merge_results({
+            metric: self.call_judge(metric, evaluator, kwargs)
+            for metric, (evaluator, kwargs) in self.evaluator_calls(data_point).items()
+        })
 
-        # 1. Run Correctness
-        results['correctness'] = self.correctness_evaluator(
-            inputs=data_point['question'],
-            outputs=data_point['agent_response'],
-            reference_outputs =data_point['golden_answer']
-        )
+    @staticmethod
+    def csv_row(data_point, eval_results=None, error=None):
+        """CSV row for a data point: its scores and comments, or the error that stopped it."""
+        eval_results = eval_results or {}
+        row = {
+            "question": data_point.get("question", ""),
+            "golden_answer": data_point.get("golden_answer", ""),
+            "agent_response": data_point.get("agent_response", ""),
+            "evaluation_criteria": data_point.get("evaluation_criteria", ""),
+        }
+        for metric in METRICS:
+            row[f"{metric}_score"] = eval_results.get(metric, {}).get("score", "")
+            row[f"{metric}_comment"] = eval_results.get(metric, {}).get("comment", "")
+        if error is not None:
+            row["correctness_comment"] = f"Error: {str(error)}"
+        return row
 
-        # 2. Run Conciseness
-        results['conciseness'] = self.conciseness_evaluator(
-            inputs=data_point['question'],
-            outputs=data_point['agent_response'],
-            context=data_point['golden_answer']
-        )
+    def evaluate_data_points(self, data_points, max_concurrency: int = None, on_row=None):
+        """
+        Evaluate data points and return their CSV rows, in the given order.
 
-        # 3. Run Hallucination
-        # We pass golden_answer as 'context' to ensure the agent isn't making things up 
-        # relative to the ground truth.
-        results['hallucination'] = self.hallucination_evaluator(
-            inputs=data_point['question'],
-            outputs=data_point['agent_response'],
-            context=data_point['golden_answer'],
-            reference_outputs=""
-        )
+        All judge calls (four per data point, or one when fused) run on a pool
+        of max_concurrency threads, under the shared rate limit and with
+        retries on 429/5xx. Rows keep dataset order whatever order the calls
+        finish in.
 
-        #4. Run Custom Criteria
-        results['criteria_adherence'] = self.criteria_evaluator(
-            inputs=data_point['question'], 
-            outputs=data_point['agent_response'],
-            criteria=data_point['evaluation_criteria']
-        )
+        Args:
+            data_points: Dicts with question, golden_answer, agent_response and evaluation_criteria
+            max_concurrency: Judge calls in flight at once (default: the instance setting)
+            on_row: Called with each row as soon as its data point is judged, in completion order
+        """
+        # Initialize evaluators
+        print("Initializing evaluators...")
+        self.initialize_evaluators()
+        print("Evaluators initialized.\n")
+        
+        # Prepare CSV data
+        csv_rows = [None] * len(data_points)
+        max_concurrency = max_concurrency or self.max_concurrency
+        calls_before = self.caller.stats()
+        cache_before = self.judge_cache.stats() if self.judge_cache else None
+        start = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            # Submit every judge call up front, data points in order
+            futures = {}
+            remaining = []
+            for idx, data_point in enumerate(data_points):
+                calls = self.evaluator_calls(data_point)
+                remaining.append(len(calls))
+                for metric, (evaluator, kwargs) in calls.items():
+                    futures[executor.submit(self.call_judge, metric, evaluator, kwargs)] = (idx, metric)
+            results = [{} for _ in data_points]
+            errors = [None] * len(data_points)
+            
+            # Build each data point's row once its last judge call finishes
+            done = 0
+            for future in as_completed(futures):
+                idx, metric = futures[future]
+                try:
+                    results[idx][metric] = future.result()
+                except Exception as e:
+                    errors[idx] = errors[idx] or e
+                remaining[idx] -= 1
+                if remaining[idx]:
+                    continue
+                
+                done += 1
+                data_point = data_points[idx]
+                print(f"[{done}/{len(data_points)}] Processing: {data_point['question'][:60]}...")
+                if errors[idx] is None:
+                    csv_rows[idx] = self.csv_row(data_point, self.merge_results(results[idx]))
+                    print(f"  ✓ Completed\n")
+                else:
+                    print(f"  ✗ Error evaluating: {str(errors[idx])}\n")
+                    # Add row with error
+                    csv_rows[idx] = self.csv_row(data_point, error=errors[idx])
+                if on_row is not None:
+                    on_row(csv_rows[idx])
+        
+        elapsed = time.perf_counter() - start
+        stats = {key: value - calls_before[key] for key, value in self.caller.stats().items()}
+        print(f"  Wall time: {elapsed:.1f}s with {max_concurrency} concurrent judge calls "
+              f"({stats['calls']} calls, {stats['retries']} retries, {stats['throttled_seconds']:.2f}s rate limited)")
+        if self.judge_cache is not None:
+            cache_stats = self.judge_cache.stats()
+            print(f"  Judge cache: {cache_stats['hits'] - cache_before['hits']} hits, "
+                  f"{cache_stats['misses'] - cache_before['misses']} misses ({cache_stats['entries']} entries)")
+        return csv_rows
 
-        return results
+    def evaluate_dataset(self, dataset_path: Path, output_csv_path: Path, max_concurrency: int = None,
+                         resume: bool = False):
+        """
+        Load dataset from JSON and evaluate all data points, saving results to CSV.
+
+        Each row is appended and flushed to the CSV as soon as its data point
+        is judged, so a crash or exhausted quota loses no finished work. When
+        the run ends the CSV is rewritten in dataset order.
 
-    def evaluate_dataset(self, dataset_path: Path, output_csv_path: Path):
-        """Load dataset from JSON and evaluate all data points, saving results to CSV."""
+        Args:
+            dataset_path: JSON file with a 'results' list
+            output_csv_path: CSV to write
+            max_concurrency: Judge calls in flight at once
+            resume: Keep the completed rows already in output_csv_path (matched by
+                question and agent response) and judge only the rest, including error rows
+        """
         # Load dataset
         print(f"Loading dataset from {dataset_path}...")
         with dataset_path.open("r", encoding="utf-8") as f:
@@ -98,73 +292,41 @@ class RagasTest:
         
         print(f"Found {len(data_points)} data points to evaluate.\n")
         
-        # Initialize evaluators
-        print("Initializing evaluators...")
-        self.initialize_evaluators()
-        print("Evaluators initialized.\n")
-        
-        # Prepare CSV data
-        csv_rows = []
+        completed = read_completed_rows(output_csv_path) if resume else {}
+        pending = [data_point for data_point in data_points if result_key(data_point) not in completed]
+        if resume:
+            print(f"Resuming: {len(data_points) - len(pending)} data points already evaluated, "
+                  f"{len(pending)} to go.\n")
         
-        # Evaluate each data point
-        for idx, data_point in enumerate(data_points, start=1):
-            print(f"[{idx}/{len(data_points)}] Processing: {data_point['question'][:60]}...")
-            
-            try:
-                eval_results = self.run_evaluation(data_point)
-                
-                # Prepare row for CSV
-                row = {
-                    "question": data_point.get("question", ""),
-                    "golden_answer": data_point.get("golden_answer", ""),
-                    "agent_response": data_point.get("agent_response", ""),
-                    "evaluation_criteria": data_point.get("evaluation_criteria", ""),
-                    "correctness_score": eval_results.get("correctness", {}).get("score", ""),
-                    "correctness_comment": eval_results.get("correctness", {}).get("comment", ""),
-                    "conciseness_score": eval_results.get("conciseness", {}).get("score", ""),
-                    "conciseness_comment": eval_results.get("conciseness", {}).get("comment", ""),
-                    "hallucination_score": eval_results.get("hallucination", {}).get("score", ""),
-                    "hallucination_comment": eval_results.get("hallucination", {}).get("comment", ""),
-                    "criteria_adherence_score": eval_results.get("criteria_adherence", {}).get("score", ""),
-                    "criteria_adherence_comment": eval_results.get("criteria_adherence", {}).get("comment", ""),
-                }
-                csv_rows.append(row)
-                
-                print(f"  ✓ Completed\n")
-                
-            except Exception as e:
-                print(f"  ✗ Error evaluating: {str(e)}\n")
-                # Add row with error
-                row = {
-                    "question": data_point.get("question", ""),
-                    "golden_answer": data_point.get("golden_answer", ""),
-                    "agent_response": data_point.get("agent_response", ""),
-                    "evaluation_criteria": data_point.get("evaluation_criteria", ""),
-                    "correctness_score": "",
-                    "correctness_comment": f"Error: {str(e)}",
-                    "conciseness_score": "",
-                    "conciseness_comment": "",
-                    "hallucination_score": "",
-                    "hallucination_comment": "",
-                    "criteria_adherence_score": "",
-                    "criteria_adherence_comment": "",
-                }
-                csv_rows.append(row)
-        
-        # Write to CSV
+        # Append rows as they finish
         print(f"Writing results to {output_csv_path}...")
         output_csv_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_csv_path.open("w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(completed.values())
+            
+            def append_row(row):
+                writer.writerow(row)
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
+            
+            new_rows = self.evaluate_data_points(pending, max_concurrency, on_row=append_row) if pending else []
         
-        if csv_rows:
-            fieldnames = csv_rows[0].keys()
-            with output_csv_path.open("w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(csv_rows)
+        # Rewrite in dataset order
+        rows_by_key = dict(completed)
+        rows_by_key.update((result_key(row), row) for row in new_rows)
+        csv_rows = [rows_by_key[result_key(data_point)] for data_point in data_points]
+        tmp_path = output_csv_path.with_name(f"{output_csv_path.name}.tmp")
+        with tmp_path.open("w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(csv_rows)
+        os.replace(tmp_path, output_csv_path)
         
         print(f"✓ Evaluation complete! Results saved to {output_csv_path}")
         print(f"  Total evaluations: {len(csv_rows)}")
-
+        return csv_rows
 
 if __name__ == "__main__":
     # Get current directory and file paths
@@ -174,5 +336,7 @@ if __name__ == "__main__":
     # Save CSV results to evaluation_output directory
     output_csv_path = CURRENT_DIR / "evaluation_output" / "evaluation_results_v3.csv"
     # Run evaluation pipeline
-    ragas_test = RagasTest()
-    ragas_test.evaluate_dataset(dataset_path, output_csv_path)
+    # Judge results are cached in evaluation_output/.judge_cache, so unchanged responses are not judged again
+    ragas_test = RagasTest(judge_cache=None if "--no-judge-cache" in sys.argv else JudgeCallCache())
+    # --resume keeps finished rows from an interrupted run and retries only the rest
+    ragas_test.evaluate_dataset(dataset_path, output_csv_path, resume="--resume" in sys.argv)
@@ -0,0 +1,52 @@
+from openevals.llm import create_llm_as_judge
+from eval_prompt import FUSED_JUDGE_PROMPT
+
+METRICS = ("correctness", "conciseness", "hallucination", "criteria_adherence")
+SCORE_CHOICES = [0.0, 0.5, 0.8, 1.0]
+FUSED_KEY = "fused"
+
+
+def fused_score_schema(choices=SCORE_CHOICES) -> dict:
+    """
+    Structured-output schema of the fused judge: reasoning then score for each
+    metric, so the model explains before it scores (as the separate judges do).
+    """
+    properties = {}
+    for metric in METRICS:
+        properties[f"{metric}_reasoning"] = {"type": "string", "description": f"Reasoning for the {metric} score"}
+        properties[f"{metric}_score"] = {"type": "number", "enum": list(choices), "description": f"{metric} score, 1.0 is best"}
+    return {
+        "title": "scores",
+        "description": "Scores of the response on each metric",
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+    }
+
+
+def create_fused_evaluator(judge, choices=SCORE_CHOICES):
+    """
+    Judge correctness, conciseness, hallucination and criteria adherence in one call.
+
+    Args:
+        judge: Chat model used as judge
+        choices: Allowed scores for every metric
+
+    Returns:
+        Evaluator taking inputs, outputs, reference_outputs and criteria, and returning
+        metric -> {"key", "score", "comment"} like the four separate evaluators
+    """
+    evaluator = create_llm_as_judge(prompt=FUSED_JUDGE_PROMPT, judge=judge, output_schema=fused_score_schema(choices))
+
+    def fused_evaluator(**kwargs):
+        response = evaluator(**kwargs)
+        return {
+            metric: {
+                "key": metric,
+                "score": response.get(f"{metric}_score", ""),
+                "comment": response.get(f"{metric}_reasoning", ""),
+            }
+            for metric in METRICS
+        }
+
+    return fused_evaluator
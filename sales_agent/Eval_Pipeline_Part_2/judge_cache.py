@@ -0,0 +1,147 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+CURRENT_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = CURRENT_DIR / "evaluation_output" / ".judge_cache"
+DEFAULT_MAX_ENTRIES = 20_000
+# Eviction deletes down to this share of max_entries, so it runs once per
+# (1 - EVICT_LOW_WATER) * max_entries new entries instead of on every put
+EVICT_LOW_WATER = 0.9
+
+
+def judge_identity(judge) -> dict:
+    """Model settings of a judge that change its verdicts."""
+    return {
+        "judge": type(judge).__name__,
+        "model": getattr(judge, "model", None) or getattr(judge, "model_name", None),
+        "temperature": getattr(judge, "temperature", None),
+    }
+
+
+class JudgeCallCache:
+    """
+    Disk-backed, content-addressed cache of judge results, shared by every
+    evaluation run (and process) that points at the same directory.
+
+    An entry is keyed by the SHA-256 of everything that decides the verdict:
+    evaluator prompt, feedback key, score choices, judge model and
+    temperature, and the call's inputs, outputs and reference/context/criteria.
+    Each entry is one JSON file, written to a temporary file and renamed into
+    place so concurrent writers never expose a partial entry. Past
+    max_entries, the least recently used entries (by file mtime, refreshed
+    on every hit) are deleted down to EVICT_LOW_WATER of max_entries. One
+    thread scans and deletes while the others keep reading and writing.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            cache_dir: Directory holding the entries
+            max_entries: Size cap; least recently used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._evicting = False
+        self._puts = 0
+        self._entries = len(self._entry_paths())
+
+    @staticmethod
+    def key(evaluator_spec: dict, call_kwargs: dict) -> str:
+        """Content address of a judge call."""
+        payload = json.dumps({"evaluator": evaluator_spec, "call": call_kwargs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entry_paths(self) -> list:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached result of a judge call, or None."""
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted meanwhile, or unreadable: treat as a miss
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a judge result atomically."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(value, f, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._entries += 1
+            self._puts += 1
+            over_cap = self._entries > self.max_entries and not self._evicting
+        if over_cap:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries down to EVICT_LOW_WATER of
+        max_entries. A no-op while another thread is already evicting.
+        """
+        with self._lock:
+            if self._evicting:
+                return
+            self._evicting = True
+            puts_before = self._puts
+        try:
+            entries = []
+            for path in self._entry_paths():
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+            entries.sort()
+            low_water = int(self.max_entries * EVICT_LOW_WATER)
+            evicted = 0
+            for _, path in entries[:max(0, len(entries) - low_water)]:
+                try:
+                    path.unlink()
+                    evicted += 1
+                except OSError:
+                    continue
+            with self._lock:
+                self.evictions += evicted
+                # Entries written while scanning were not part of it
+                self._entries = len(entries) - evicted + self._puts - puts_before
+        finally:
+            with self._lock:
+                self._evicting = False
+                over_cap = self._entries > self.max_entries
+        if over_cap:
+            # Writers filled the cache up again while this scan ran
+            self.evict()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._entries,
+            "evictions": self.evictions,
+        }
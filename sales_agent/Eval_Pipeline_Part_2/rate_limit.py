@@ -0,0 +1,124 @@
+import time
+import random
+import threading
+from typing import Callable, Optional
+
+# Cohere production keys allow 500 chat calls per minute (trial keys: 20)
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_MAX_RETRIES = 5
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `burst` calls at once and refills at
+    requests_per_minute, so callers never exceed the API quota.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE, burst: Optional[int] = None):
+        """
+        Args:
+            requests_per_minute: Sustained call rate
+            burst: Calls allowed back to back before the rate applies (default: one second's worth)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, int(self.rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def retryable_status(exc: Exception) -> Optional[int]:
+    """
+    HTTP status of a rate-limit (429) or server (5xx) error, None for anything else.
+    Works with Cohere SDK errors (status_code) and httpx errors (response.status_code).
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return None
+    return status if status == 429 or 500 <= status < 600 else None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header on the error, if the server sent one."""
+    headers = getattr(exc, "headers", None) or getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class RateLimitedCaller:
+    """
+    Runs API calls under a shared token bucket, retrying 429/5xx errors with
+    full-jitter exponential backoff (or the server's Retry-After).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        burst: Optional[int] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = BASE_RETRY_DELAY,
+        max_delay: float = MAX_RETRY_DELAY,
+    ):
+        self.bucket = TokenBucket(requests_per_minute, burst) if requests_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Call func(*args, **kwargs), retrying rate-limit and server errors.
+        Other errors, and the last retryable one, are raised.
+        """
+        for attempt in range(self.max_retries + 1):
+            waited = self.bucket.acquire() if self.bucket else 0.0
+            with self._lock:
+                self.calls += 1
+                self.throttled_seconds += waited
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = retryable_status(e)
+                if status is None or attempt == self.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                with self._lock:
+                    self.retries += 1
+                print(f"  ↻ HTTP {status}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "retries": self.retries, "throttled_seconds": round(self.throttled_seconds, 2)}
@@ -0,0 +1,61 @@
+# fake_judge.py
+"""
+Local stand-in for the Cohere judge: answers openevals' structured-output
+calls (any schema: *score fields get the score, others a reasoning
+text) after an injected latency, can fail with HTTP 429 a given number of
+times, and records how many calls were in flight at once.
+"""
+import time
+import random
+import threading
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeJudge(BaseChatModel):
+    latency: float = 0.0
+    jitter: float = 0.5
+    rate_limit_failures: int = 0
+    score: float = 1.0
+    temperature: float = 0.0
+
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _in_flight: int = PrivateAttr(default=0)
+    max_in_flight: int = 0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-judge"
+
+    def _generate(self, messages: List, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=str(self.score)))])
+
+    def with_structured_output(self, schema, **kwargs):
+        fields = list(schema.get("properties", {})) if isinstance(schema, dict) else []
+        return RunnableLambda(lambda messages: self._judge(messages, fields or ["reasoning", "score"]))
+
+    def _judge(self, messages, fields=("reasoning", "score")) -> dict:
+        with self._lock:
+            self.calls += 1
+            if self.rate_limit_failures > 0:
+                self.rate_limit_failures -= 1
+                raise FakeRateLimitError("429 Too Many Requests")
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            # Random latency, so calls finish out of order
+            time.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+            return {field: self.score if field.endswith("score") else "Fake judgement." for field in fields}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
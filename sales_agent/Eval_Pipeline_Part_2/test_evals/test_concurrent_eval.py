@@ -0,0 +1,94 @@
+# test_concurrent_eval.py
+"""
+Concurrent dataset evaluation against a local fake judge: wall time drops
+with the concurrency, rows keep dataset order, the rate limit holds and
+429s are retried.
+
+Run with: python test_concurrent_eval.py (or pytest)
+"""
+import sys
+import csv
+import json
+import time
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PARENT_DIR = CURRENT_DIR.parent
+if str(PARENT_DIR) not in sys.path:
+    sys.path.insert(0, str(PARENT_DIR))
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+
+from evaluation_pipeline import RagasTest
+from rate_limit import RateLimitedCaller, TokenBucket
+from fake_judge import FakeJudge
+
+DATASET_PATH = PARENT_DIR / "agent_responses" / "evaluation_dataset_v3.json"
+
+
+def evaluate(judge, tmp, n_points=None, **kwargs):
+    dataset = json.loads(DATASET_PATH.read_text())
+    dataset["results"] = dataset["results"][:n_points]
+    dataset_path = Path(tmp) / "dataset.json"
+    dataset_path.write_text(json.dumps(dataset))
+    output_path = Path(tmp) / "results.csv"
+
+    start = time.perf_counter()
+    RagasTest(judge=judge, **kwargs).evaluate_dataset(dataset_path, output_path)
+    with output_path.open(newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return rows, time.perf_counter() - start, [point["question"] for point in dataset["results"]]
+
+
+def test_concurrency_cuts_wall_time_and_keeps_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_rows, serial_time, questions = evaluate(FakeJudge(latency=0.05), tmp, 8, max_concurrency=1, requests_per_minute=None)
+        judge = FakeJudge(latency=0.05)
+        rows, parallel_time, _ = evaluate(judge, tmp, 8, max_concurrency=8, requests_per_minute=None)
+    assert [row["question"] for row in rows] == questions == [row["question"] for row in serial_rows]
+    assert all(row["correctness_score"] == "1.0" and row["criteria_adherence_score"] == "1.0" for row in rows)
+    assert judge.calls == 32 and judge.max_in_flight == 8
+    # 32 calls of ~50ms: ~1.6s serial, ~0.2s with 8 in flight
+    assert serial_time / parallel_time > 4, (serial_time, parallel_time)
+
+
+def test_rate_limit_holds():
+    bucket = TokenBucket(requests_per_minute=1200, burst=2)
+    start = time.perf_counter()
+    for _ in range(12):
+        bucket.acquire()
+    # 2 immediately, then 10 at 20 per second
+    assert time.perf_counter() - start >= 0.45
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _, elapsed, _ = evaluate(FakeJudge(), tmp, 3, max_concurrency=8, requests_per_minute=600)
+    # 12 calls at 10 per second, after a burst of 10
+    assert elapsed >= 0.15
+
+
+def test_rate_limit_errors_retried():
+    caller = RateLimitedCaller(None, max_retries=3, base_delay=0.01)
+    judge = FakeJudge(rate_limit_failures=3)
+    assert caller.call(judge._judge, []) == {"reasoning": "Fake judgement.", "score": 1.0}
+    assert caller.stats()["retries"] == 3
+
+    try:
+        RateLimitedCaller(None, max_retries=1, base_delay=0.01).call(FakeJudge(rate_limit_failures=2)._judge, [])
+        raise AssertionError("429 not raised after the last retry")
+    except Exception as e:
+        assert getattr(e, "status_code", None) == 429
+
+    with tempfile.TemporaryDirectory() as tmp:
+        judge = FakeJudge(rate_limit_failures=4)
+        rows, _, _ = evaluate(judge, tmp, 2, requests_per_minute=None)
+    assert all(row["hallucination_score"] == "1.0" for row in rows)
+    assert judge.calls == 12
+
+
+if __name__ == "__main__":
+    print("Testing concurrent evaluation:")
+    print("=" * 60)
+    for test in (test_concurrency_cuts_wall_time_and_keeps_order, test_rate_limit_holds, test_rate_limit_errors_retried):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,67 @@
+# test_fused_judge.py
+"""
+Fused judge: one call per data point scores all four metrics into the same
+CSV columns as the separate judges, and the calibration report compares
+the two on the stored v1-v3 results.
+
+Run with: python test_fused_judge.py (or pytest)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PARENT_DIR = CURRENT_DIR.parent
+if str(PARENT_DIR) not in sys.path:
+    sys.path.insert(0, str(PARENT_DIR))
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+
+from calibrate_fused_judge import OUTPUT_DIR, calibrate, compare_scores, format_report, read_rows
+from evaluation_pipeline import RagasTest
+from fused_judge import METRICS, fused_score_schema
+from fake_judge import FakeJudge
+
+V3_ROWS = read_rows(OUTPUT_DIR / "evaluation_results_v3.csv")
+
+
+def test_one_call_per_data_point():
+    judge = FakeJudge(score=0.8)
+    fused_rows = RagasTest(judge=judge, fused=True, requests_per_minute=None).evaluate_data_points(V3_ROWS[:5])
+    assert judge.calls == 5
+
+    separate_judge = FakeJudge(score=0.8)
+    separate_rows = RagasTest(judge=separate_judge, requests_per_minute=None).evaluate_data_points(V3_ROWS[:5])
+    assert separate_judge.calls == 20
+    assert [list(row) for row in fused_rows] == [list(row) for row in separate_rows] == [list(V3_ROWS[0])] * 5
+    assert all(row[f"{metric}_score"] == 0.8 and row[f"{metric}_comment"] for row in fused_rows for metric in METRICS)
+
+
+def test_schema_has_every_metric():
+    schema = fused_score_schema()
+    assert schema["required"] == [f"{metric}_{part}" for metric in METRICS for part in ("reasoning", "score")]
+    assert schema["properties"]["hallucination_score"]["enum"] == [0.0, 0.5, 0.8, 1.0]
+
+
+def test_calibration_report():
+    same = compare_scores(V3_ROWS, V3_ROWS)
+    assert all(stats["exact_agreement"] == 1.0 and stats["mean_abs_diff"] == 0 for stats in same.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "evaluation_results_v3.csv").write_bytes((OUTPUT_DIR / "evaluation_results_v3.csv").read_bytes())
+        reports = calibrate(["v3"], RagasTest(judge=FakeJudge(score=1.0), fused=True, requests_per_minute=None), Path(tmp))
+        assert len(read_rows(Path(tmp) / "fused_calibration_v3.csv")) == len(V3_ROWS) == 20
+
+    conciseness = reports["v3"]["conciseness"]
+    # Separate judges gave 1.0 to 18 of 20 responses and 0.8 to the rest
+    assert conciseness["exact_agreement"] == 0.9 and conciseness["within_one_step"] == 1.0 and conciseness["fused_mean"] == 1.0
+    report = format_report(reports)
+    assert "| v3 | correctness | 20 |" in report and "n/a" in report
+
+
+if __name__ == "__main__":
+    print("Testing fused judge:")
+    print("=" * 60)
+    for test in (test_one_call_per_data_point, test_schema_has_every_metric, test_calibration_report):
+        test()
+        print(f"PASS {test.__name__}")
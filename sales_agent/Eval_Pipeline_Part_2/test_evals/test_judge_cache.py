@@ -0,0 +1,120 @@
+# test_judge_cache.py
+"""
+Judge-call cache: re-running an unchanged dataset makes no judge calls,
+changed responses or judge settings miss, and the disk cache stays within
+its size cap under concurrent writers without rescanning on every put.
+
+Run with: python test_judge_cache.py (or pytest)
+"""
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PARENT_DIR = CURRENT_DIR.parent
+if str(PARENT_DIR) not in sys.path:
+    sys.path.insert(0, str(PARENT_DIR))
+if str(CURRENT_DIR) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR))
+
+from evaluation_pipeline import RagasTest
+from judge_cache import EVICT_LOW_WATER, JudgeCallCache
+from fake_judge import FakeJudge
+
+DATASET_PATH = PARENT_DIR / "agent_responses" / "evaluation_dataset_v3.json"
+
+
+def test_unchanged_dataset_makes_no_judge_calls():
+    with tempfile.TemporaryDirectory() as tmp:
+        first_judge, second_judge = FakeJudge(), FakeJudge()
+        first = RagasTest(judge=first_judge, requests_per_minute=None, judge_cache=JudgeCallCache(Path(tmp) / "cache"))
+        first_rows = first.evaluate_dataset(DATASET_PATH, Path(tmp) / "first.csv")
+        # A new process would open the same directory
+        cache = JudgeCallCache(Path(tmp) / "cache")
+        second = RagasTest(judge=second_judge, requests_per_minute=None, judge_cache=cache)
+        second_rows = second.evaluate_dataset(DATASET_PATH, Path(tmp) / "second.csv")
+
+    assert first_judge.calls == 80 and second_judge.calls == 0
+    assert cache.stats()["hits"] == 80 and cache.stats()["misses"] == 0
+    assert second_rows == first_rows
+
+
+def test_changes_miss():
+    data_points = json.loads(DATASET_PATH.read_text())["results"][:3]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = JudgeCallCache(Path(tmp))
+        RagasTest(judge=FakeJudge(), requests_per_minute=None, judge_cache=cache).evaluate_data_points(data_points)
+
+        # One response edited: only its four calls go to the judge
+        edited = [dict(point) for point in data_points]
+        edited[1]["agent_response"] += " Let me know if you need anything else."
+        judge = FakeJudge()
+        RagasTest(judge=judge, requests_per_minute=None, judge_cache=cache).evaluate_data_points(edited)
+        assert judge.calls == 4
+
+        # Different judge temperature or a fused judge: different calls
+        warmer = FakeJudge(temperature=0.7)
+        RagasTest(judge=warmer, requests_per_minute=None, judge_cache=cache).evaluate_data_points(data_points)
+        assert warmer.calls == 12
+        fused_judge = FakeJudge()
+        RagasTest(judge=fused_judge, fused=True, requests_per_minute=None, judge_cache=cache).evaluate_data_points(data_points)
+        assert fused_judge.calls == 3
+
+    spec = {"prompt": "p", "model": "command-a-03-2025", "temperature": 0.0}
+    call = {"inputs": "q", "outputs": "a", "reference_outputs": "r"}
+    assert JudgeCallCache.key(spec, call) == JudgeCallCache.key(dict(reversed(list(spec.items()))), call)
+    assert JudgeCallCache.key(spec, call) != JudgeCallCache.key(dict(spec, temperature=0.7), call)
+
+
+def test_size_cap_and_concurrent_writers():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = JudgeCallCache(Path(tmp), max_entries=10)
+        keys = [JudgeCallCache.key({"prompt": "p"}, {"inputs": str(i)}) for i in range(30)]
+
+        def write(offset):
+            for i in range(offset, 30, 3):
+                cache.put(keys[i], {"score": 1.0, "comment": str(i)})
+                cache.get(keys[i])
+
+        threads = [threading.Thread(target=write, args=(offset,)) for offset in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        files = list(Path(tmp).glob("*/*"))
+        assert len(files) <= 10 and all(path.suffix == ".json" for path in files)
+        assert cache.stats()["evictions"] >= 20
+        # Unreadable entries are misses, not errors
+        files[0].write_text("{not json")
+        assert cache.get(files[0].stem) is None
+
+
+def test_eviction_scans_once_per_low_water_gap():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = JudgeCallCache(Path(tmp), max_entries=100)
+        entry_paths = cache._entry_paths
+        scans = []
+        cache._entry_paths = lambda: scans.append(1) or entry_paths()
+
+        for i in range(101):
+            cache.put(JudgeCallCache.key({"prompt": "p"}, {"inputs": str(i)}), {"score": 1.0})
+        assert len(scans) == 1
+        assert len(list(Path(tmp).glob("*/*.json"))) == int(100 * EVICT_LOW_WATER)
+
+        # The next puts up to the cap don't rescan the directory
+        for i in range(101, 111):
+            cache.put(JudgeCallCache.key({"prompt": "p"}, {"inputs": str(i)}), {"score": 1.0})
+        assert len(scans) == 1 and cache.stats()["entries"] == 100
+        cache.put(JudgeCallCache.key({"prompt": "p"}, {"inputs": "111"}), {"score": 1.0})
+        assert len(scans) == 2
+
+
+if __name__ == "__main__":
+    print("Testing judge-call cache:")
+    print("=" * 60)
+    for test in (test_unchanged_dataset_makes_no_judge_calls, test_changes_miss, test_size_cap_and_concurrent_writers, test_eviction_scans_once_per_low_water_gap):
+        test()
+        print(f"PASS {test.__name__}")
@@ -0,0 +1,135 @@
+# test_parallel_responses.py
+"""
+Parallel agent-response generation: a pool of agents answers faster than
+one, records carry latency and tool-call counts, slow or failing questions
+are timed out and retried, and JSONL records convert to the results JSON.
+
+Run with: python test_parallel_responses.py (or pytest)
+"""
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PARENT_DIR = CURRENT_DIR.parent
+AGENT_DIR = PARENT_DIR.parent / "AI_Agent_Part_1"
+for path in (PARENT_DIR / "create_eval", AGENT_DIR, AGENT_DIR / "test_scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from create_model_response import (
+    PROJECT_ROOT, RESULT_FIELDS, convert_records, read_records, records_path, run_evaluation
+)
+from agent import SalesSupportAgent
+from fake_chat_model import FakeChatModel
+
+EVALUATION_PATH = PROJECT_ROOT / "data" / "evaluation_data (1).json"
+CSV_PATH = PROJECT_ROOT / "data" / "subscription_data.csv"
+QUESTIONS = [entry["question"] for entry in json.loads(EVALUATION_PATH.read_text())["data"]]
+
+
+def make_agent():
+    return SalesSupportAgent(str(CSV_PATH), llm=FakeChatModel(agent_delay=0.05), fast_path=False)
+
+
+class ScriptedAgent:
+    """Answers after `delays[attempt]` seconds, streaming a token event every 10ms."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.attempts = 0
+
+    def stream_query(self, question):
+        delay = self.delays[min(self.attempts, len(self.delays) - 1)]
+        self.attempts += 1
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            yield {"type": "token", "text": "."}
+        yield {"type": "tool_start", "name": "query_subscription_data", "args": {}}
+        yield {"type": "final", "content": f"Answer to: {question}"}
+
+
+class HangingAgent:
+    """Blocks inside one call without yielding any event, like a hung LLM request."""
+
+    def stream_query(self, question):
+        time.sleep(30)
+        yield {"type": "final", "content": "too late"}
+
+
+def timed_run(tmp, name, **kwargs):
+    output_path = Path(tmp) / f"{name}.json"
+    start = time.perf_counter()
+    run_evaluation(EVALUATION_PATH, CSV_PATH, output_path, **kwargs)
+    return output_path, time.perf_counter() - start
+
+
+def test_agent_pool_answers_in_parallel():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, serial_time = timed_run(tmp, "serial", workers=1, agent_factory=make_agent)
+        output_path, parallel_time = timed_run(tmp, "parallel", workers=4, agent_factory=make_agent)
+        results = json.loads(output_path.read_text())["results"]
+        records = read_records(records_path(output_path))
+
+    assert [result["question"] for result in results] == QUESTIONS
+    assert all(set(result) == set(RESULT_FIELDS) for result in results)
+    assert [record["question"] for record in records] == QUESTIONS
+    answered = [record for record in records if record["agent_response"].startswith("Answer: ")]
+    assert answered and all(record["tool_calls"] == 1 and record["latency_seconds"] >= 0.1 for record in answered)
+    assert serial_time / parallel_time > 2.5, (serial_time, parallel_time)
+
+
+def test_timeouts_and_retries():
+    with tempfile.TemporaryDirectory() as tmp:
+        # First attempt is too slow, the retry answers in time
+        output_path, _ = timed_run(tmp, "retried", agent=ScriptedAgent([0.5, 0.0]), timeout=0.2, retry_delay=0.01)
+        records = read_records(records_path(output_path))
+        assert records[0]["attempts"] == 2 and records[0]["tool_calls"] == 1 and "error" not in records[0]
+
+        # Never in time: recorded as failed, left for --resume
+        output_path, elapsed = timed_run(tmp, "failed", agent=ScriptedAgent([10.0]), timeout=0.05, retries=1, retry_delay=0.01)
+        records = read_records(records_path(output_path))
+        assert all(record["attempts"] == 2 and record["error"].startswith("QuestionTimeoutError") for record in records)
+        assert json.loads(output_path.read_text())["results"][0]["agent_response"] == ""
+        assert elapsed < 20 * 2 * 0.05 + 3
+
+        # A call that never returns hits the hard deadline, and its agent is replaced
+        built = []
+
+        def factory():
+            built.append(HangingAgent() if not built else ScriptedAgent([0.0]))
+            return built[-1]
+
+        output_path, elapsed = timed_run(tmp, "hung", workers=1, agent_factory=factory, timeout=0.2, retry_delay=0.01)
+        records = read_records(records_path(output_path))
+        assert records[0]["attempts"] == 2 and all("error" not in record for record in records)
+        assert len(built) == 2 and elapsed < 5
+
+
+def test_records_convert_to_results_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = Path(tmp) / "records.jsonl"
+        record = {"question": "Q1", "golden_answer": "G", "evaluation_criteria": "C", "agent_response": "old",
+                  "latency_seconds": 1.2, "tool_calls": 1, "attempts": 1}
+        lines = [record, dict(record, question="Q2", agent_response="A2"), dict(record, agent_response="new")]
+        jsonl_path.write_text("".join(json.dumps(line) + "\n" for line in lines) + '{"question": "Q3", "agen')
+
+        output_path = Path(tmp) / "results.json"
+        convert_records(jsonl_path, output_path)
+        payload = json.loads(output_path.read_text())
+    assert set(payload) == {"generated_at", "results"}
+    assert payload["results"] == [
+        {"question": "Q1", "golden_answer": "G", "evaluation_criteria": "C", "agent_response": "new"},
+        {"question": "Q2", "golden_answer": "G", "evaluation_criteria": "C", "agent_response": "A2"},
+    ]
+
+
+if __name__ == "__main__":
+    print("Testing parallel agent responses:")
+    print("=" * 60)
+    for test in (test_agent_pool_answers_in_parallel, test_timeouts_and_retries, test_records_convert_to_results_json):
+        test()
+        print(f"PASS {test.__name__}")
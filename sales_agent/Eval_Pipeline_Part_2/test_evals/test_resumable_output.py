@@ -0,0 +1,135 @@
+# test_resumable_output.py
+"""
+Checkpointed evaluation output: rows are on disk as soon as they finish,
+and a resumed run skips finished work and retries only failures, for both
+evaluate_dataset and create_model_response.run_evaluation.
+
+Run with: python test_resumable_output.py (or pytest)
+"""
+import sys
+import csv
+import json
+import tempfile
+from pathlib import Path
+
+CURRENT_DIR = Path(__file__).resolve().parent
+PARENT_DIR = CURRENT_DIR.parent
+for path in (PARENT_DIR, CURRENT_DIR, PARENT_DIR / "create_eval"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from evaluation_pipeline import RagasTest
+from create_model_response import PROJECT_ROOT, checkpoint_path, run_evaluation
+from fake_judge import FakeJudge
+
+DATASET_PATH = PARENT_DIR / "agent_responses" / "evaluation_dataset_v3.json"
+EVALUATION_PATH = PROJECT_ROOT / "data" / "evaluation_data (1).json"
+
+
+class Crash(BaseException):
+    """Stands in for the process dying (not caught like an API error)."""
+
+
+class CrashingJudge(FakeJudge):
+    crash_after: int = 0
+    fail_questions: tuple = ()
+
+    def _judge(self, messages, fields=("reasoning", "score")):
+        if self.calls >= self.crash_after:
+            raise Crash()
+        text = str(messages)
+        if any(question in text for question in self.fail_questions):
+            self.calls += 1
+            raise ValueError("judge returned malformed output")
+        return super()._judge(messages, fields)
+
+
+class FakeAgent:
+    def __init__(self, crash_after=None, fail_questions=()):
+        self.asked = []
+        self.crash_after = crash_after
+        self.fail_questions = fail_questions
+
+    def query(self, question):
+        if self.crash_after is not None and len(self.asked) >= self.crash_after:
+            raise Crash()
+        self.asked.append(question)
+        if question in self.fail_questions:
+            return "I encountered an error: quota exceeded. Please try rephrasing your question or contact support if the issue persists."
+        return f"Answer to: {question}"
+
+    def stream_query(self, question):
+        yield {"type": "final", "content": self.query(question)}
+
+
+def read_csv_rows(path):
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_evaluation_rows_survive_a_crash():
+    questions = [point["question"] for point in json.loads(DATASET_PATH.read_text())["results"]]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "results.csv"
+        try:
+            RagasTest(judge=CrashingJudge(crash_after=22), max_concurrency=1, requests_per_minute=None).evaluate_dataset(DATASET_PATH, output_path)
+            raise AssertionError("crash not raised")
+        except Crash:
+            pass
+        # 5 data points fully judged before the crash, already flushed to disk
+        assert [row["question"] for row in read_csv_rows(output_path)] == questions[:5]
+
+        judge = FakeJudge()
+        rows = RagasTest(judge=judge, requests_per_minute=None).evaluate_dataset(DATASET_PATH, output_path, resume=True)
+        assert judge.calls == 4 * 15
+        assert [row["question"] for row in read_csv_rows(output_path)] == questions == [row["question"] for row in rows]
+
+
+def test_only_error_rows_retried():
+    questions = [point["question"] for point in json.loads(DATASET_PATH.read_text())["results"]]
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "results.csv"
+        failing = CrashingJudge(crash_after=10**6, fail_questions=(questions[3], questions[7]))
+        RagasTest(judge=failing, requests_per_minute=None).evaluate_dataset(DATASET_PATH, output_path)
+        errors = [row["question"] for row in read_csv_rows(output_path) if row["correctness_comment"].startswith("Error:")]
+        assert errors == [questions[3], questions[7]]
+
+        judge = FakeJudge()
+        RagasTest(judge=judge, requests_per_minute=None).evaluate_dataset(DATASET_PATH, output_path, resume=True)
+        rows = read_csv_rows(output_path)
+        assert judge.calls == 8 and len(rows) == 20
+        assert all(row["hallucination_score"] == "1.0" for row in rows)
+
+
+def test_agent_responses_checkpointed_and_resumed():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / "responses.json"
+        try:
+            run_evaluation(EVALUATION_PATH, None, output_path, agent=FakeAgent(crash_after=6))
+            raise AssertionError("crash not raised")
+        except Crash:
+            pass
+        assert not output_path.exists()
+        assert len(checkpoint_path(output_path).read_text().splitlines()) == 6
+
+        questions = [entry["question"] for entry in json.loads(EVALUATION_PATH.read_text())["data"]]
+        first = FakeAgent(fail_questions=(questions[10],))
+        # No in-run retries: the failed answer is left for the next resumed run
+        run_evaluation(EVALUATION_PATH, None, output_path, resume=True, agent=first, retries=0)
+        assert first.asked == questions[6:]
+        assert not checkpoint_path(output_path).exists()
+
+        second = FakeAgent()
+        run_evaluation(EVALUATION_PATH, None, output_path, resume=True, agent=second)
+        assert second.asked == [questions[10]]
+        results = json.loads(output_path.read_text())["results"]
+        assert [result["question"] for result in results] == questions
+        assert all(result["agent_response"] == f"Answer to: {result['question']}" for result in results)
+
+
+if __name__ == "__main__":
+    print("Testing resumable evaluation output:")
+    print("=" * 60)
+    for test in (test_evaluation_rows_survive_a_crash, test_only_error_rows_retried, test_agent_responses_checkpointed_and_resumed):
+        test()
+        print(f"PASS {test.__name__}")